@@ -1,12 +1,20 @@
 import os
+import sys
+import signal
 import argparse
 import configparser
 from datetime import datetime
-from bpi_collector.config import Config
+from bpi_collector.config import Config, DEFAULT_STORAGE_FORMAT
 from bpi_collector.logger import BusinessLogicLogger
 from bpi_collector.collector import BPICollector
 from bpi_collector.emailer import EmailSender
 from bpi_collector.utils import get_price_statistics, validate_smtp_config
+from bpi_collector.scheduler import MISSED_TICK_POLICIES
+from bpi_collector.storage_backends import (
+    DURABILITY_LEVELS,
+    STORAGE_FORMATS,
+    get_backend,
+)
 
 
 def load_smtp_config_from_env():
@@ -73,12 +81,168 @@ def main(argv=None):
         default=int(os.getenv("INTERVAL", "60")),
         help="Interval seconds between samples",
     )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        default=os.getenv("ADAPTIVE_INTERVAL", "").lower() in ("1", "true", "yes"),
+        help="Tighten the interval on large moves/volatility and relax it when quiet (sync engine)",
+    )
+    parser.add_argument(
+        "--min-interval",
+        type=float,
+        default=os.getenv("ADAPTIVE_MIN_SECONDS"),
+        help="Shortest adaptive interval in seconds (default --interval / 4)",
+    )
+    parser.add_argument(
+        "--max-interval",
+        type=float,
+        default=os.getenv("ADAPTIVE_MAX_SECONDS"),
+        help="Longest adaptive interval in seconds (default --interval * 4)",
+    )
+    parser.add_argument(
+        "--request-budget",
+        type=int,
+        default=os.getenv("ADAPTIVE_REQUESTS_PER_HOUR"),
+        help="Maximum API requests per hour the adaptive interval may spend",
+    )
+    parser.add_argument(
+        "--no-align",
+        action="store_true",
+        help="Start the first tick immediately instead of on a wall-clock interval boundary",
+    )
+    parser.add_argument(
+        "--missed-ticks",
+        choices=MISSED_TICK_POLICIES,
+        default=os.getenv("MISSED_TICKS", "skip"),
+        help="What to do with ticks missed because a sample overran the interval",
+    )
     parser.add_argument(
         "--pairs",
         type=str,
         help="Comma-separated currency pairs to sample (e.g. BTC-USD,ETH-USD)",
     )
+    parser.add_argument(
+        "--derive",
+        type=str,
+        default=os.getenv("DERIVED_PAIRS"),
+        help="Comma-separated cross pairs computed from fetched legs instead of fetched (e.g. ETH-BTC)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["sync", "async", "stream"],
+        default=os.getenv("ENGINE", "sync"),
+        help="sync: one loop fetching every pair per tick; async: one coroutine per pair; stream: coalesce a ticker WebSocket feed",
+    )
+    parser.add_argument(
+        "--stream-url",
+        type=str,
+        default=os.getenv("STREAM_URL"),
+        help="Ticker WebSocket feed used by the stream engine",
+    )
+    parser.add_argument(
+        "--schedule",
+        action="append",
+        default=[],
+        metavar="PAIR=INTERVAL[:SAMPLES]",
+        help="Per-pair cadence for the async engine (repeatable)",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=int(os.getenv("SHARDS", "1")),
+        help="Split --pairs across this many collector processes (sync engine only)",
+    )
+    parser.add_argument(
+        "--fetch-workers",
+        type=int,
+        default=int(os.getenv("FETCH_WORKERS", "8")),
+        help="Maximum number of pairs fetched concurrently",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=os.getenv("SAMPLE_DEADLINE"),
+        help="Seconds a sample waits for all pairs; late pairs are recorded as missing",
+    )
+    parser.add_argument(
+        "--storage",
+        choices=STORAGE_FORMATS,
+        default=os.getenv("STORAGE_FORMAT", DEFAULT_STORAGE_FORMAT),
+        help="Run file format (ndjson is append-only, json rewrites the file per sample)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=int(os.getenv("STORAGE_BATCH_SIZE", "1")),
+        help="Group-commit samples to the run file every N samples",
+    )
+    parser.add_argument(
+        "--flush-ms",
+        type=int,
+        default=int(os.getenv("STORAGE_FLUSH_MS", "0")),
+        help="Group-commit pending samples at least every T milliseconds",
+    )
+    parser.add_argument(
+        "--durability",
+        choices=DURABILITY_LEVELS,
+        default=os.getenv("STORAGE_DURABILITY", "flush"),
+        help="fsync never (none), when the run is closed or at sqlite checkpoints (flush), or after each group commit (fsync)",
+    )
+    parser.add_argument(
+        "--rollups",
+        type=str,
+        default=os.getenv("ROLLUPS"),
+        help="Comma-separated OHLC bar sizes kept while collecting (default 1m,5m,1h; empty to disable)",
+    )
+    parser.add_argument(
+        "--stats-window",
+        type=int,
+        default=int(os.getenv("STATS_WINDOW", "60")),
+        metavar="N",
+        help="Track each pair's min/max over its last N prices in the run's .stats.json",
+    )
+    parser.add_argument(
+        "--live-graph",
+        type=int,
+        default=int(os.getenv("LIVE_GRAPH_EVERY", "0")),
+        metavar="N",
+        help="Re-render the run's graph every N samples while collecting (0 = only at the end)",
+    )
+    parser.add_argument(
+        "--render-cache",
+        type=str,
+        default=os.getenv("RENDER_CACHE_DIR", os.path.join("data", "render_cache")),
+        metavar="DIR",
+        help="Reuse rendered graphs and reports of unchanged samples from DIR (empty to disable)",
+    )
+    parser.add_argument(
+        "--render-cache-mb",
+        type=float,
+        default=float(os.getenv("RENDER_CACHE_MB", "64")),
+        help="Evict least recently used render cache entries beyond this size",
+    )
+    parser.add_argument(
+        "--pdf-appendix",
+        action="store_true",
+        default=os.getenv("PDF_APPENDIX", "").lower() in ("1", "true", "yes"),
+        help="Append every sample to the emailed PDF as paginated tables",
+    )
+    parser.add_argument(
+        "--pdf-dpi",
+        type=int,
+        default=int(os.getenv("PDF_IMAGE_DPI", "150")),
+        help="Resolution the graph is embedded at in the PDF (larger PNGs are downsampled)",
+    )
+    parser.add_argument(
+        "--shm-ring",
+        type=str,
+        default=os.getenv("SHM_RING"),
+        help="Publish recent samples to this shared-memory ring for the dashboard",
+    )
     args = parser.parse_args(argv)
+    if args.shards > 1 and args.engine != "sync":
+        parser.error("--shards requires --engine sync")
+    store_ext = get_backend(args.storage).extension
 
     if not args.test and not args.send_test:
         # Use timezone-aware UTC time with Z suffix
@@ -87,23 +251,88 @@ def main(argv=None):
         ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
         data_dir = os.path.join(os.getcwd(), "data")
         os.makedirs(data_dir, exist_ok=True)
-        store_name = f"bpi_data_{ts}.json"
+        store_name = f"bpi_data_{ts}{store_ext}"
         graph_name = f"bpi_graph_{ts}.png"
         cfg = Config(
             samples=args.samples,
             interval_seconds=args.interval,
             store_path=os.path.join("data", store_name),
             graph_path=os.path.join("data", graph_name),
+            storage_format=args.storage,
         )
 
     else:
-        cfg = Config(samples=args.samples, interval_seconds=args.interval)
+        cfg = Config(
+            samples=args.samples,
+            interval_seconds=args.interval,
+            store_path=f"bpi_data{store_ext}",
+            storage_format=args.storage,
+        )
+
+    cfg.align_ticks = not args.no_align
+    cfg.missed_tick_policy = args.missed_ticks
+    cfg.adaptive_interval = args.adaptive
+    cfg.adaptive_min_seconds = args.min_interval
+    cfg.adaptive_max_seconds = args.max_interval
+    cfg.adaptive_requests_per_hour = args.request_budget
+    cfg.fetch_workers = args.fetch_workers
+    cfg.sample_deadline_seconds = args.deadline
+    cfg.storage_batch_size = args.batch_size
+    cfg.storage_flush_ms = args.flush_ms
+    cfg.storage_durability = args.durability
+    cfg.shm_ring_name = args.shm_ring
+    cfg.live_graph_every = args.live_graph
+    cfg.stats_window = args.stats_window
+    cfg.pdf_appendix = args.pdf_appendix
+    cfg.pdf_image_dpi = args.pdf_dpi
+    cfg.render_cache_dir = args.render_cache or None
+    cfg.render_cache_max_bytes = int(args.render_cache_mb * 1024 * 1024)
+    cfg.shards = args.shards
+    if args.stream_url:
+        cfg.stream_url = args.stream_url
+    if args.rollups is not None:
+        cfg.rollup_resolutions = [
+            r.strip() for r in args.rollups.split(",") if r.strip()
+        ]
 
     if args.pairs:
         cfg.currencies = [p.strip() for p in args.pairs.split(",") if p.strip()]
 
+    if args.derive:
+        cfg.derived_pairs = [p.strip() for p in args.derive.split(",") if p.strip()]
+
+    if args.schedule:
+        from bpi_collector.async_collector import parse_schedule
+
+        cfg.pair_schedules = {}
+        for spec in args.schedule:
+            schedule = parse_schedule(spec, cfg.samples)
+            cfg.pair_schedules[schedule.pair] = {
+                "interval_seconds": schedule.interval_seconds,
+                "samples": schedule.samples,
+            }
+
     logger = BusinessLogicLogger().logger
-    collector = BPICollector(cfg, logger)
+    # Engines are imported on demand so the default sync path (and --test)
+    # never loads aiohttp or websockets.
+    if args.engine == "async":
+        from bpi_collector.async_collector import AsyncBPICollector
+
+        collector = AsyncBPICollector(cfg, logger)
+    elif args.engine == "stream":
+        from bpi_collector.streaming import StreamingBPICollector
+
+        collector = StreamingBPICollector(cfg, logger)
+    elif cfg.shards > 1:
+        from bpi_collector.sharding import ShardedCollector
+
+        collector = ShardedCollector(cfg, logger)
+    else:
+        collector = BPICollector(cfg, logger)
+
+    # `docker stop` sends SIGTERM; turn it into SystemExit so buffered samples
+    # are committed by the collector's finally/atexit handlers.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
 
     if args.test:
         prices = collector.run_once()
@@ -115,10 +344,11 @@ def main(argv=None):
 
     if args.send_test:
         prices = collector.run_once()
-        samples = collector.storage.read_all()
+        samples = collector.storage.read_samples()
+        stats = collector.run_stats(samples)
 
         if samples:
-            first_pair, max_price = get_price_statistics(samples, cfg.currencies)
+            first_pair, max_price = get_price_statistics(samples, cfg.currencies, stats)
         else:
             first_pair = next(iter(prices.keys()), "BTC-USD")
             max_price = prices.get(first_pair)
@@ -130,6 +360,9 @@ def main(argv=None):
                 username=smtp_config_env_values["username"],
                 password=smtp_config_env_values["password"],
                 logger=logger,
+                render_cache=collector.render_cache,
+                pdf_appendix=cfg.pdf_appendix,
+                pdf_image_dpi=cfg.pdf_image_dpi,
             )
 
             subject = f"BPI Test Report - Current {first_pair}: ${max_price:.2f}"
@@ -140,6 +373,7 @@ def main(argv=None):
                 to_address=smtp_config_env_values["to"],
                 from_address=smtp_config_env_values["from"],
                 graph_path=cfg.graph_path if os.path.exists(cfg.graph_path) else None,
+                stats=stats,
             )
             print("Email send succeeded" if ok else "Email send failed; check logs")
             return 0
@@ -152,7 +386,8 @@ def main(argv=None):
 
     samples = collector.run_loop()
     if samples:
-        first_pair, max_price = get_price_statistics(samples, cfg.currencies)
+        stats = collector.run_stats(samples)
+        first_pair, max_price = get_price_statistics(samples, cfg.currencies, stats)
 
         if validate_smtp_config(smtp_config_env_values):
             sender = EmailSender(
@@ -161,6 +396,9 @@ def main(argv=None):
                 username=smtp_config_env_values["username"],
                 password=smtp_config_env_values["password"],
                 logger=logger,
+                render_cache=collector.render_cache,
+                pdf_appendix=cfg.pdf_appendix,
+                pdf_image_dpi=cfg.pdf_image_dpi,
             )
             subject = f"BPI Report - Max {first_pair}: ${max_price:.2f}"
 
@@ -171,6 +409,7 @@ def main(argv=None):
                     subject,
                     samples,
                     cfg.graph_path,
+                    stats,
                 )
 
             except Exception as e:
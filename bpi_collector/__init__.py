@@ -1,10 +1,37 @@
 """bpi_collector package init"""
 
-from .collector import BPICollector
-from .config import Config
-from .logger import BusinessLogicLogger
-from .fetcher import DataFetcher
-from .storage import Storage
-from .grapher import GraphGenerator
-from .emailer import EmailSender
-from .utils import get_price_statistics, validate_smtp_config
+import importlib
+
+# Public names resolve on first access so `import bpi_collector` does not pull
+# in aiohttp, websockets, matplotlib or reportlab up front.
+_EXPORTS = {
+    "BPICollector": ".collector",
+    "AsyncBPICollector": ".async_collector",
+    "StreamingBPICollector": ".streaming",
+    "Config": ".config",
+    "BusinessLogicLogger": ".logger",
+    "DataFetcher": ".fetcher",
+    "Storage": ".storage",
+    "GraphGenerator": ".grapher",
+    "RenderCache": ".render_cache",
+    "EmailSender": ".emailer",
+    "compute_stats": ".stats",
+    "RunningStats": ".running_stats",
+    "get_price_statistics": ".utils",
+    "validate_smtp_config": ".utils",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,106 @@
+import asyncio
+import aiohttp
+
+from logging import Logger
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List
+
+from .config import Config
+from .async_engine import AsyncEngine
+
+
+@dataclass
+class PairSchedule:
+    pair: str
+    interval_seconds: float
+    samples: int
+
+
+def parse_schedule(spec: str, default_samples: int) -> PairSchedule:
+    # "BTC-USD=5" or "BTC-USD=5:720" (interval seconds, optional sample budget)
+    pair, _, rest = spec.partition("=")
+    interval, _, samples = rest.partition(":")
+    if not pair.strip() or not interval:
+        raise ValueError(f"Invalid schedule {spec!r}; expected PAIR=INTERVAL[:SAMPLES]")
+    return PairSchedule(
+        pair=pair.strip(),
+        interval_seconds=float(interval),
+        samples=int(samples) if samples else default_samples,
+    )
+
+
+class AsyncBPICollector(AsyncEngine):
+    # Every pair runs as its own coroutine on its own cadence, all sharing one
+    # aiohttp session.
+    def __init__(self, config: Config, logger: Logger):
+        super().__init__(config, logger)
+        self.schedules = self._schedules()
+        if self.cross_rates is not None:
+            # Each coroutine records a single pair, so legs never share a sample.
+            self.logger.warning("Derived pairs are not computed by the async engine")
+            self.cross_rates = None
+
+    def _schedules(self) -> List[PairSchedule]:
+        overrides = self.config.pair_schedules or {}
+        pairs = list(self.config.currencies or ["BTC-USD"])
+        pairs += [p for p in overrides if p not in pairs]
+        schedules = []
+        for pair in pairs:
+            spec = overrides.get(pair, {})
+            schedules.append(
+                PairSchedule(
+                    pair=pair,
+                    interval_seconds=spec.get(
+                        "interval_seconds", self.config.interval_seconds
+                    ),
+                    samples=spec.get("samples", self.config.samples),
+                )
+            )
+        return schedules
+
+    async def _fetch(self, session: aiohttp.ClientSession, pair: str) -> float:
+        url = self.config.api_url_template.format(pair=pair)
+        self.logger.info(f"Fetching price {pair}\n{url}")
+        async with session.get(url) as resp:
+            resp.raise_for_status()
+            data = await resp.json(content_type=None)
+        amount = float(data["data"]["amount"])
+        self.logger.info(f"Fetched price {pair}\nprice:{amount}")
+        return amount
+
+    async def _run_pair(self, session: aiohttp.ClientSession, schedule: PairSchedule):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        for i in range(schedule.samples):
+            try:
+                price = await self._fetch(session, schedule.pair)
+                now = datetime.now(timezone.utc)
+                await loop.run_in_executor(
+                    self._writer, self.record, now, {schedule.pair: price}
+                )
+            except Exception as e:
+                self.logger.error(f"Failed to fetch price {schedule.pair} {e}")
+
+            if i < schedule.samples - 1:
+                next_tick += schedule.interval_seconds
+                await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+    async def run_async(self):
+        self.logger.info(
+            "Starting async collection "
+            + ", ".join(
+                f"{s.pair} every {s.interval_seconds}s x{s.samples}"
+                for s in self.schedules
+            )
+        )
+        timeout = aiohttp.ClientTimeout(total=self.config.fetch_timeout_seconds)
+        connector = aiohttp.TCPConnector(
+            limit=self.config.http_pool_size or len(self.schedules)
+        )
+        async with aiohttp.ClientSession(
+            timeout=timeout, connector=connector
+        ) as session:
+            await asyncio.gather(
+                *(self._run_pair(session, schedule) for schedule in self.schedules)
+            )
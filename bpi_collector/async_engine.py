@@ -0,0 +1,37 @@
+import asyncio
+
+from abc import ABC, abstractmethod
+from logging import Logger
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Union
+
+from .config import Config
+from .collector import BPICollector
+from .storage_backends import SampleColumns
+
+
+class AsyncEngine(BPICollector, ABC):
+    # Base of the asyncio engines: run_async() collects on an event loop.
+    # Storage, rollups and the live ring are not thread-safe and may block on
+    # disk, so every write is handed to a single writer thread and the event
+    # loop only ever waits on the network. These engines pace their own
+    # sampling, so the adaptive interval does not apply.
+    supports_adaptive = False
+
+    def __init__(self, config: Config, logger: Logger):
+        super().__init__(config, logger)
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bpi-store")
+
+    @abstractmethod
+    async def run_async(self):
+        # Collect until the engine's samples are done; writes go through
+        # self._writer.
+        ...
+
+    def collect(self) -> Union[List[Dict[str, Any]], SampleColumns]:
+        try:
+            asyncio.run(self.run_async())
+        finally:
+            self._writer.shutdown(wait=True)
+            self.close()
+        return self.storage.read_samples()
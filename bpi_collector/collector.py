@@ -1,40 +1,199 @@
+import os
 import time
 from .config import Config
 from logging import Logger
 from .storage import Storage
+from .storage_backends import SampleColumns
+from .rollups import RollupStore
+from .running_stats import RunningStats
+from .stats import RunStats, compute_stats
+from .scheduler import DeadlineScheduler, AdaptiveInterval
 from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Union
 from .fetcher import DataFetcher
-from .grapher import GraphGenerator
+from .derived import CrossRates
+from .grapher import GraphGenerator, LiveGraph
+from .render_cache import RenderCache
 
 
 class BPICollector:
+    # False for engines that pace their own sampling; they warn and keep the
+    # fixed interval when adaptive_interval is set.
+    supports_adaptive = True
+
     def __init__(self, config: Config, logger: Logger):
         self.config = config
         self.logger = logger
         self.fetcher = DataFetcher(config, logger)
-        self.storage = Storage(config.store_path, logger)
-        self.grapher = GraphGenerator(config.graph_path, logger)
+        self.storage = Storage(
+            config.store_path,
+            logger,
+            config.storage_format,
+            batch_size=config.storage_batch_size,
+            flush_interval_ms=config.storage_flush_ms,
+            durability=config.storage_durability,
+        )
+        self.rollups = RollupStore(config.store_path, logger, config.rollup_resolutions)
+        self.running_stats = None
+        if config.running_stats:
+            self.running_stats = RunningStats(
+                config.store_path, logger, config.stats_window
+            )
+        self.render_cache = None
+        if config.render_cache_dir:
+            self.render_cache = RenderCache(
+                config.render_cache_dir, logger, config.render_cache_max_bytes
+            )
+        self.grapher = GraphGenerator(
+            config.graph_path, logger, cache=self.render_cache
+        )
+        self.live_graph = None
+        if config.live_graph_every > 0:
+            self.live_graph = LiveGraph(
+                config.graph_path, logger, every=config.live_graph_every
+            )
+        self.adaptive = None
+        if config.adaptive_interval and not self.supports_adaptive:
+            self.logger.warning(
+                "Adaptive interval is only supported by the sync engine"
+            )
+        elif config.adaptive_interval:
+            self.adaptive = AdaptiveInterval(
+                config.interval_seconds,
+                logger,
+                min_seconds=config.adaptive_min_seconds,
+                max_seconds=config.adaptive_max_seconds,
+                move_threshold=config.adaptive_move_threshold,
+                vol_threshold=config.adaptive_vol_threshold,
+                window=config.adaptive_window,
+                requests_per_tick=len(config.currencies or ["BTC-USD"]),
+                requests_per_hour=config.adaptive_requests_per_hour,
+            )
+        self.cross_rates = None
+        if config.derived_pairs:
+            self.cross_rates = CrossRates(
+                config.derived_pairs, config.currencies or ["BTC-USD"]
+            )
+        self.ring = None
+        if config.shm_ring_name:
+            # multiprocessing.shared_memory is only loaded with --shm-ring.
+            from .shm_ring import SampleRingWriter
+
+            self.ring = SampleRingWriter(
+                config.shm_ring_name,
+                logger,
+                run_name=os.path.basename(config.store_path),
+                capacity=config.shm_ring_capacity,
+            )
+
+    def record(self, now: datetime, prices: dict, extra: Optional[dict] = None) -> dict:
+        if self.cross_rates is not None:
+            derived = self.cross_rates.compute(prices)
+            if derived:
+                prices = {**prices, **derived}
+                extra = {**(extra or {}), "derived": list(derived)}
+        if self.adaptive is not None:
+            extra = {**(extra or {}), "interval": self.adaptive.interval}
+        self.storage.append_sample(now, prices, extra)
+        self.rollups.update(now, prices)
+        if self.running_stats is not None:
+            self.running_stats.update(now, prices)
+        if self.ring is not None:
+            self.ring.publish(now, prices, extra)
+        if self.live_graph is not None:
+            try:
+                self.live_graph.add(now, prices)
+            except Exception as e:
+                self.logger.error(f"Live graph update failed\n{e}")
+        return prices
 
-    def run_once(self) -> dict:
+    def run_once(self, scheduled: Optional[datetime] = None) -> dict:
+        started = time.monotonic()
         prices = self.fetcher.fetch_prices()
         # Use timezone-aware UTC time with Z suffix
-        now = datetime.now(timezone.utc)
-        self.storage.append_sample(now, prices)
-        return prices
+        observed = datetime.now(timezone.utc)
+        if scheduled is None:
+            return self.record(observed, prices)
+        # Samples are stamped when the prices were observed; the tick they
+        # were scheduled for, how late they came in and how long the fetch
+        # took are kept next to it.
+        extra = {
+            "scheduled": scheduled.isoformat(),
+            "lag_ms": round((observed - scheduled).total_seconds() * 1000, 1),
+            "fetch_ms": round((time.monotonic() - started) * 1000, 1),
+        }
+        return self.record(observed, prices, extra)
 
-    def run_loop(self):
+    def run_stats(
+        self, samples: Union[List[Dict[str, Any]], SampleColumns]
+    ) -> RunStats:
+        # O(1) from the running accumulators when they cover exactly these
+        # samples, otherwise one pass over them.
+        if self.running_stats is not None and self.running_stats.samples == len(
+            samples
+        ):
+            return self.running_stats.snapshot()
+        return compute_stats(samples)
+
+    def close(self):
+        # Closing (not just flushing) the storage hands every buffered write
+        # to the OS before collect() does its final read of the run.
+        self.storage.close()
+        self.rollups.close()
+        if self.running_stats is not None:
+            self.running_stats.close()
+        self.fetcher.close()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    @staticmethod
+    def _read_new(reader, samples: list) -> list:
+        new_samples = reader.read_new()
+        if reader.rewound:
+            samples = []
+        samples.extend(new_samples)
+        return samples
+
+    def collect(self) -> Union[List[Dict[str, Any]], SampleColumns]:
         self.logger.info(
             f"Starting collection loop {self.config.samples}\n{self.config.interval_seconds}",
         )
-        for i in range(self.config.samples):
-            try:
-                self.run_once()
-            except Exception as e:
-                self.logger.error(f"Sample failed\n{e}")
+        # A columnar run is mapped once at the end instead of being parsed into
+        # dicts tick by tick.
+        reader = None if self.storage.columnar else self.storage.tail_reader()
+        scheduler = DeadlineScheduler(
+            self.adaptive.interval if self.adaptive else self.config.interval_seconds,
+            self.logger,
+            align=self.config.align_ticks,
+            policy=self.config.missed_tick_policy,
+            start_at=self.config.start_at,
+        )
+        samples = []
+        try:
+            for _ in range(self.config.samples):
+                tick = scheduler.wait()
+                self.logger.info(f"Tick {tick.index} lag={tick.lag * 1000:.1f}ms")
+                try:
+                    prices = self.run_once(
+                        datetime.fromtimestamp(tick.wall, timezone.utc)
+                    )
+                    if self.adaptive is not None:
+                        scheduler.set_interval(self.adaptive.observe(prices))
+                except Exception as e:
+                    self.logger.error(f"Sample failed\n{e}")
 
-            if i < self.config.samples - 1:
-                time.sleep(self.config.interval_seconds)
+                if reader is not None:
+                    samples = self._read_new(reader, samples)
+        finally:
+            self.close()
 
-        samples = self.storage.read_all()
+        self.logger.info(f"Tick stats {scheduler.summary()}")
+        if reader is None:
+            return self.storage.read_columns()
+        return self._read_new(reader, samples)
+
+    def run_loop(self):
+        samples = self.collect()
         self.grapher.generate(samples)
         return samples
@@ -1,8 +1,10 @@
 from dataclasses import dataclass
 
 API_URL_TEMPLATE = "https://api.coinbase.com/v2/prices/{pair}/spot"
-DEFAULT_STORE = "bpi_data.json"
+STREAM_URL = "wss://ws-feed.exchange.coinbase.com"
+DEFAULT_STORE = "bpi_data.ndjson"
 DEFAULT_GRAPH = "bpi_graph.png"
+DEFAULT_STORAGE_FORMAT = "ndjson"
 
 
 @dataclass
@@ -12,5 +14,85 @@ class Config:
     graph_path: str = DEFAULT_GRAPH
     interval_seconds: int = 60
     samples: int = 60
+    # run_loop ticks on wall-clock multiples of interval_seconds; ticks that are
+    # a whole interval late are dropped ("skip") or run back to back ("catchup")
+    align_ticks: bool = True
+    missed_tick_policy: str = "skip"
+    # wall-clock time (epoch seconds) of the first tick; set by the sharded
+    # coordinator so every shard samples the same slots
+    start_at: float = None
+    # adaptive sampling for the sync loop: the interval halves (down to
+    # adaptive_min_seconds, default interval/4) when a pair's move or rolling
+    # volatility of log returns over adaptive_window samples crosses its
+    # threshold, and relaxes (up to adaptive_max_seconds, default interval*4)
+    # when quiet; adaptive_requests_per_hour raises the floor to stay in budget.
+    # Each sample records the interval it was taken at.
+    adaptive_interval: bool = False
+    adaptive_min_seconds: float = None
+    adaptive_max_seconds: float = None
+    adaptive_move_threshold: float = 0.002
+    adaptive_vol_threshold: float = 0.001
+    adaptive_window: int = 20
+    adaptive_requests_per_hour: int = None
     # list of currency pairs to fetch, e.g. ["BTC-USD", "ETH-USD"]
     currencies: list[str] = None
+    # pairs computed from fetched legs instead of requested, e.g. ["ETH-BTC"]
+    # (legs inferred via a shared quote currency) or ["ETH-EUR=ETH-USD*USD-EUR"]
+    derived_pairs: list[str] = None
+    # pairs are fetched concurrently; each request has its own timeout and the
+    # whole sample gives up on stragglers after sample_deadline_seconds
+    fetch_workers: int = 8
+    fetch_timeout_seconds: float = 15
+    sample_deadline_seconds: float = None
+    # per-pair cadence for the async engine, e.g.
+    # {"BTC-USD": {"interval_seconds": 5, "samples": 720}}; unlisted pairs use
+    # interval_seconds/samples
+    pair_schedules: dict = None
+    # failed fetches are retried with jittered exponential backoff while the
+    # sample deadline allows; after breaker_failure_threshold consecutive
+    # failures a host is skipped for breaker_reset_seconds
+    fetch_retries: int = 2
+    retry_backoff_seconds: float = 0.5
+    retry_backoff_max_seconds: float = 5
+    breaker_failure_threshold: int = 5
+    breaker_reset_seconds: float = 30
+    # client-side request budget per API host (None = only honour Retry-After)
+    rate_limit_per_second: float = None
+    # keep-alive connections held open to the API (None = one per concurrent fetch)
+    http_pool_size: int = None
+    # ticker feed used by the streaming engine; dropped connections are retried
+    # with jittered backoff starting at retry_backoff_seconds
+    stream_url: str = STREAM_URL
+    stream_reconnect_max_seconds: float = 30
+    # "ndjson" (append-only, one sample per line), "columnar" (mmap-able float64
+    # column per pair), "sqlite" (WAL database, safe for concurrent readers) or
+    # "json" (legacy single array)
+    storage_format: str = DEFAULT_STORAGE_FORMAT
+    # group commit: write every N samples or after T ms, whichever comes first
+    storage_batch_size: int = 1
+    storage_flush_ms: int = 0
+    # every group commit reaches the OS; "fsync" also forces it to disk, and on
+    # sqlite "none"/"flush"/"fsync" map to synchronous OFF/NORMAL/FULL
+    storage_durability: str = "flush"
+    # rendered graph/report artifacts are cached here, keyed by a hash of the
+    # sample range, pairs and render options, and evicted least recently used
+    # past render_cache_max_bytes (None = render every time)
+    render_cache_dir: str = None
+    render_cache_max_bytes: int = 64 * 1024 * 1024
+    # re-render graph_path every N samples while collecting (0 = only at the end)
+    live_graph_every: int = 0
+    # emailed PDF: append every sample as paginated tables, and embed the graph
+    # at pdf_image_dpi for its printed width
+    pdf_appendix: bool = False
+    pdf_image_dpi: int = 150
+    # per-pair count/mean/stddev/min/max/first/last/volatility and min/max over
+    # the last stats_window prices, updated per sample in <run>.stats.json
+    running_stats: bool = True
+    stats_window: int = 60
+    # OHLC bar sizes maintained while collecting (None = 1m/5m/1h, [] = off)
+    rollup_resolutions: list[str] = None
+    # name of a shared-memory ring the last samples are published to (None = off)
+    shm_ring_name: str = None
+    shm_ring_capacity: int = 1024
+    # worker processes the currencies are split across (1 = collect in-process)
+    shards: int = 1
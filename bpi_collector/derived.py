@@ -0,0 +1,93 @@
+import numpy as np
+
+from dataclasses import dataclass
+from typing import List, Dict, Optional
+
+
+@dataclass
+class DerivedPair:
+    pair: str
+    # pair = numerator / denominator, or numerator * denominator when op is "*"
+    numerator: str
+    denominator: str
+    op: str = "/"
+
+
+def _split(pair: str):
+    base, _, quote = pair.partition("-")
+    if not base or not quote:
+        raise ValueError(f"Invalid pair {pair!r}; expected BASE-QUOTE")
+    return base, quote
+
+
+def infer_legs(pair: str, fetched: List[str]) -> Optional[DerivedPair]:
+    # ETH-BTC from ETH-USD / BTC-USD, or ETH-EUR from ETH-USD * USD-EUR.
+    base, quote = _split(pair)
+    available = set(fetched)
+    for leg in fetched:
+        leg_base, via = _split(leg)
+        if leg_base != base:
+            continue
+        if f"{quote}-{via}" in available:
+            return DerivedPair(pair, leg, f"{quote}-{via}", "/")
+        if f"{via}-{quote}" in available:
+            return DerivedPair(pair, leg, f"{via}-{quote}", "*")
+    return None
+
+
+def parse_derived(spec: str, fetched: List[str]) -> DerivedPair:
+    # "ETH-BTC" (legs inferred from the fetched pairs) or an explicit
+    # "ETH-BTC=ETH-USD/BTC-USD" / "ETH-EUR=ETH-USD*USD-EUR".
+    pair, _, formula = spec.partition("=")
+    pair = pair.strip()
+    if not formula:
+        derived = infer_legs(pair, fetched)
+        if derived is None:
+            raise ValueError(
+                f"Cannot derive {pair}: no pair of fetched legs shares a currency"
+            )
+        return derived
+
+    op = "*" if "*" in formula else "/"
+    numerator, _, denominator = formula.partition(op)
+    derived = DerivedPair(pair, numerator.strip(), denominator.strip(), op)
+    for leg in (derived.numerator, derived.denominator):
+        if leg not in fetched:
+            raise ValueError(f"Cannot derive {pair}: leg {leg} is not fetched")
+    return derived
+
+
+class CrossRates:
+    # Computes every derived pair of a sample in one numpy pass: the fetched
+    # prices are laid out in a fixed order and each derived pair is two
+    # gathers plus a divide/multiply. A missing leg propagates NaN and the
+    # derived pair is left out of the sample.
+    def __init__(self, specs: List[str], fetched: List[str]):
+        self.derived = [parse_derived(spec, fetched) for spec in specs]
+        for d in self.derived:
+            if d.pair in fetched:
+                raise ValueError(f"{d.pair} is both fetched and derived")
+        self.legs = list(fetched)
+        index = {pair: i for i, pair in enumerate(self.legs)}
+        self.pairs = [d.pair for d in self.derived]
+        self.numerators = np.array([index[d.numerator] for d in self.derived])
+        self.denominators = np.array([index[d.denominator] for d in self.derived])
+        self.multiply = np.array([d.op == "*" for d in self.derived])
+
+    def compute(self, prices: Dict[str, float]) -> Dict[str, float]:
+        if not self.pairs:
+            return {}
+        values = np.fromiter(
+            (prices.get(pair, np.nan) for pair in self.legs),
+            dtype=np.float64,
+            count=len(self.legs),
+        )
+        a = values[self.numerators]
+        b = values[self.denominators]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = np.where(self.multiply, a * b, a / b)
+        return {
+            pair: value
+            for pair, value in zip(self.pairs, out.tolist())
+            if value == value and value not in (float("inf"), float("-inf"))
+        }
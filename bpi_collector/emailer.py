@@ -8,7 +8,14 @@ from typing import List, Tuple, Dict, Optional
 from logging import Logger
 from email.message import EmailMessage
 
-from .report_generator import ReportGenerator
+from .report_generator import (
+    ReportGenerator,
+    IMAGE_DPI,
+    REPORT_DATE_PLACEHOLDER,
+    stamp_report_date,
+)
+from .render_cache import RenderCache, file_digest
+from .stats import RunStats
 from .report_data.formatting import format_timestamp
 
 
@@ -20,24 +27,71 @@ class EmailSender:
         username: str,
         password: str,
         logger: Logger,
+        render_cache: Optional[RenderCache] = None,
+        pdf_appendix: bool = False,
+        pdf_image_dpi: int = IMAGE_DPI,
     ):
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
         self.username = username
         self.password = password
         self.logger = logger
+        self.render_cache = render_cache
+        self.pdf_appendix = pdf_appendix
+        self.pdf_image_dpi = pdf_image_dpi
+
+    def _generate_html_report(
+        self, samples: list, stats: Optional[RunStats] = None
+    ) -> str:
+        key = None
+        if self.render_cache is not None and samples:
+            key = self.render_cache.key(
+                samples, "html", template=ReportGenerator.html_signature()
+            )
+            cached = self.render_cache.get_text(key, ".html")
+            if cached is not None:
+                return stamp_report_date(cached)
 
-    @staticmethod
-    def _generate_pdf_report(samples: list, graph_path: Optional[str]) -> List[str]:
-        pdf_attachments = []
+        html_content = ReportGenerator("").generate_html_report(
+            samples, stats=stats, report_date=REPORT_DATE_PLACEHOLDER
+        )
+        if key is not None:
+            self.render_cache.put_text(key, ".html", html_content)
+        return stamp_report_date(html_content)
 
-        if samples:
-            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp_pdf:
-                pdf_generator = ReportGenerator(temp_pdf.name)
-                pdf_path = pdf_generator.generate_report(samples, graph_path)
-                pdf_attachments = [pdf_path]
+    def _generate_pdf_report(
+        self,
+        samples: list,
+        graph_path: Optional[str],
+        stats: Optional[RunStats] = None,
+    ) -> Tuple[List[str], List[str]]:
+        # Returns (attachments, temporary files to delete after sending); a
+        # cached PDF is attached straight from the cache.
+        if not samples:
+            return [], []
+
+        key = None
+        if self.render_cache is not None:
+            key = self.render_cache.key(
+                samples,
+                "pdf",
+                graph=file_digest(graph_path),
+                appendix=self.pdf_appendix,
+                dpi=self.pdf_image_dpi,
+            )
+            cached = self.render_cache.get(key, ".pdf")
+            if cached is not None:
+                return [cached], []
+
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp_pdf:
+            pdf_generator = ReportGenerator(
+                temp_pdf.name, self.pdf_appendix, self.pdf_image_dpi
+            )
+            pdf_path = pdf_generator.generate_report(samples, graph_path, stats)
 
-        return pdf_attachments
+        if key is not None:
+            return [self.render_cache.put_file(key, ".pdf", pdf_path, move=True)], []
+        return [pdf_path], [pdf_path]
 
     def _update_email_status(
         self, samples: list, subject: str, to_address: List[str]
@@ -104,8 +158,8 @@ class EmailSender:
             all_attachments.append(graph_path)
         return all_attachments
 
-    def _cleanup_temp_files(self, pdf_attachments: List[str]) -> None:
-        for pdf_file in pdf_attachments:
+    def _cleanup_temp_files(self, temp_files: List[str]) -> None:
+        for pdf_file in temp_files:
             try:
                 os.unlink(pdf_file)
             except Exception as e:
@@ -118,12 +172,16 @@ class EmailSender:
         subject: str,
         samples: list,
         graph_path: str = None,
+        stats: Optional[RunStats] = None,
     ) -> bool:
+        # `stats` (from compute_stats) is shared with the caller's subject line
+        # so the samples are only summarised once per email.
         try:
-            html_generator = ReportGenerator("")
-            html_content = html_generator.generate_html_report(samples)
+            html_content = self._generate_html_report(samples, stats)
 
-            pdf_attachments = self._generate_pdf_report(samples, graph_path)
+            pdf_attachments, temp_files = self._generate_pdf_report(
+                samples, graph_path, stats
+            )
             self._update_email_status(samples, subject, to_address)
             all_attachments = self._collect_attachments(pdf_attachments, graph_path)
 
@@ -135,7 +193,9 @@ class EmailSender:
                 attachments=all_attachments,
             )
 
-            self._cleanup_temp_files(pdf_attachments)
+            self._cleanup_temp_files(temp_files)
+            if self.render_cache is not None:
+                self.logger.info(f"Render cache {self.render_cache.stats()}")
             return result
 
         except Exception as e:
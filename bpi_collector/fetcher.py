@@ -1,30 +1,253 @@
+import time
 import requests
+import threading
 from .config import Config
 from logging import Logger
+from typing import Optional, Tuple, Dict, Set
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from .resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RateLimiter,
+    RateLimitedError,
+    backoff_delay,
+    parse_retry_after,
+)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class CountingAdapter(HTTPAdapter):
+    # Remembers the connection pools it hands out so their request and
+    # connection counters can be read without reaching into urllib3.
+    def __init__(self, *args, **kwargs):
+        self._conn_pools = []
+        self._conn_pools_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def _track(self, conn_pool):
+        with self._conn_pools_lock:
+            if not any(p is conn_pool for p in self._conn_pools):
+                self._conn_pools.append(conn_pool)
+        return conn_pool
+
+    def get_connection_with_tls_context(self, *args, **kwargs):
+        return self._track(super().get_connection_with_tls_context(*args, **kwargs))
+
+    def get_connection(self, *args, **kwargs):
+        # requests < 2.32
+        return self._track(super().get_connection(*args, **kwargs))
+
+    def connection_stats(self) -> Tuple[int, int]:
+        with self._conn_pools_lock:
+            conn_pools = list(self._conn_pools)
+        return (
+            sum(p.num_requests for p in conn_pools),
+            sum(p.num_connections for p in conn_pools),
+        )
 
 
 class DataFetcher:
     def __init__(self, config: Config, logger: Logger):
         self.config = config
         self.logger = logger
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._session: Optional[requests.Session] = None
+        self._adapter: Optional[CountingAdapter] = None
+        self._last_stats: Tuple[int, int] = (0, 0)
+        # Fetches still running after their sample's deadline; each holds a
+        # pool worker until its request times out.
+        self._stragglers: Set[Future] = set()
+        self._stragglers_lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._guards_lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(1, self.config.fetch_workers),
+                thread_name_prefix="bpi-fetch",
+            )
+        return self._executor
+
+    def _http(self) -> requests.Session:
+        # One long-lived session so every pair reuses a kept-alive TCP+TLS
+        # connection instead of handshaking per request. The pool holds as many
+        # connections as requests can be in flight at once.
+        if self._session is None:
+            pairs = self.config.currencies or ["BTC-USD"]
+            pool_size = self.config.http_pool_size or min(
+                len(pairs), max(1, self.config.fetch_workers)
+            )
+            self._adapter = CountingAdapter(pool_connections=1, pool_maxsize=pool_size)
+            self._session = requests.Session()
+            self._session.mount("http://", self._adapter)
+            self._session.mount("https://", self._adapter)
+        return self._session
+
+    def connection_stats(self) -> Tuple[int, int]:
+        # (requests sent, connections opened) across the session's pools
+        if self._adapter is None:
+            return 0, 0
+        return self._adapter.connection_stats()
+
+    def _guards(self, host: str) -> Tuple[CircuitBreaker, RateLimiter]:
+        with self._guards_lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(
+                    self.config.breaker_failure_threshold,
+                    self.config.breaker_reset_seconds,
+                )
+                self._limiters[host] = RateLimiter(
+                    self.config.rate_limit_per_second,
+                    burst=max(1, self.config.fetch_workers),
+                )
+            return self._breakers[host], self._limiters[host]
+
+    def _request(self, url: str, deadline: float) -> float:
+        host = urlsplit(url).netloc
+        breaker, limiter = self._guards(host)
+        # Everything that can fail without touching the upstream happens
+        # before allow(), so a half-open trial is always resolved below.
+        if not limiter.acquire(deadline):
+            raise RateLimitedError("rate limited until after the sample deadline")
+        # The request's own timeout runs out with the sample's deadline, so a
+        # fetch the sample has given up on frees its worker soon after.
+        timeout = min(self.config.fetch_timeout_seconds, deadline - time.monotonic())
+        if timeout <= 0:
+            raise TimeoutError("no time left before the sample deadline")
+        if not breaker.allow():
+            raise CircuitOpenError(f"circuit open for {host}")
+
+        try:
+            resp = self._http().get(url, timeout=timeout)
+        except Exception:
+            breaker.record_failure()
+            raise
+        else:
+            if resp.status_code == 429:
+                # The upstream is healthy, just asking us to slow down.
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                limiter.pause(
+                    retry_after
+                    if retry_after is not None
+                    else self.config.retry_backoff_seconds
+                )
+                breaker.record_success()
+            elif resp.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        resp.raise_for_status()
+
+        data = resp.json()
+        return float(data["data"]["amount"])
+
+    def _fetch_pair(self, pair: str, deadline: float) -> float:
+        # Bounded retries with jittered backoff, but never past the sample's
+        # deadline; an open breaker or a client error is not retried.
+        url = self.config.api_url_template.format(pair=pair)
+        attempt = 0
+        while True:
+            self.logger.info(f"Fetching price {pair}\n{url}")
+            try:
+                amount = self._request(url, deadline)
+                break
+            except (
+                requests.ConnectionError,
+                requests.Timeout,
+                requests.HTTPError,
+            ) as e:
+                status = getattr(e.response, "status_code", None)
+                if status is not None and status not in RETRYABLE_STATUS:
+                    raise
+                if attempt >= self.config.fetch_retries:
+                    raise
+                delay = backoff_delay(
+                    attempt,
+                    self.config.retry_backoff_seconds,
+                    self.config.retry_backoff_max_seconds,
+                )
+                if time.monotonic() + delay >= deadline:
+                    raise
+                self.logger.warning(
+                    f"Retrying price {pair} in {delay:.2f}s after attempt {attempt + 1}\n{e}"
+                )
+                time.sleep(delay)
+                attempt += 1
+
+        self.logger.info(f"Fetched price {pair}\nprice:{amount}")
+        return amount
+
+    def _straggler_done(self, future: Future):
+        with self._stragglers_lock:
+            self._stragglers.discard(future)
+
+    def stragglers(self) -> int:
+        with self._stragglers_lock:
+            return len(self._stragglers)
 
     def fetch_prices(self) -> dict:
         pairs = self.config.currencies or ["BTC-USD"]
-        results = {}
-        for pair in pairs:
-            url = self.config.api_url_template.format(pair=pair)
+        deadline = self.config.sample_deadline_seconds
+        if deadline is None:
+            deadline = self.config.fetch_timeout_seconds
 
-            try:
-                self.logger.info(f"Fetching price {pair}\n{url}")
-                resp = requests.get(url, timeout=15)
-                resp.raise_for_status()
-                data = resp.json()
-                amount = float(data["data"]["amount"])
+        stragglers = self.stragglers()
+        if stragglers:
+            self.logger.warning(
+                f"{stragglers} fetches from earlier samples still hold "
+                f"{min(stragglers, self.config.fetch_workers)} of "
+                f"{self.config.fetch_workers} fetch workers"
+            )
 
-                results[pair] = amount
-                self.logger.info(f"Fetched price {pair}\nprice:{amount}")
+        # All pairs are requested at once so a sample costs max(RTT) rather
+        # than sum(RTT); anything not back by the deadline is left out.
+        deadline_at = time.monotonic() + deadline
+        futures = {
+            self._pool().submit(self._fetch_pair, pair, deadline_at): pair
+            for pair in pairs
+        }
+        done, not_done = wait(futures, timeout=deadline)
 
+        results = {}
+        for future, pair in futures.items():
+            if future in not_done:
+                if not future.cancel():
+                    # Already running; it cannot be stopped, only waited out.
+                    with self._stragglers_lock:
+                        self._stragglers.add(future)
+                    future.add_done_callback(self._straggler_done)
+                self.logger.error(
+                    f"Failed to fetch price {pair} before the {deadline}s sample deadline"
+                )
+                continue
+            try:
+                results[pair] = future.result()
             except Exception as e:
                 self.logger.error(f"Failed to fetch price {pair} {e}")
 
+        # Logged per sample: new connections this tick mean keep-alive failed.
+        stats = self.connection_stats()
+        sent = stats[0] - self._last_stats[0]
+        opened = stats[1] - self._last_stats[1]
+        self._last_stats = stats
+        if sent:
+            self.logger.info(
+                f"HTTP pool requests={sent} connections={opened} "
+                f"reused={max(0, sent - opened) / sent:.0%}"
+            )
         return results
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+            self._adapter = None
+            self._last_stats = (0, 0)
@@ -1,38 +1,109 @@
-import matplotlib
-
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-import matplotlib.ticker as m_tick
-import matplotlib.dates as m_dates
+import os
+import time
+import shutil
+import numpy as np
 
 from logging import Logger
-from typing import List, Dict, Any
-from datetime import datetime, timezone
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Union
+
+from .downsample import lttb
+from .render_cache import RenderCache
+from .storage_backends.columns import SampleColumns
+
+FIGSIZE = (10, 4)
+DPI = 100
+ANNOTATION_THRESHOLD = 20
+# Markers only help while individual points are distinguishable.
+MARKER_THRESHOLD = 120
+
+# matplotlib is imported on first render, and figures are created directly
+# rather than through pyplot, so importing this module (and the collector)
+# stays cheap for short invocations that never draw.
 
 
 class GraphGenerator:
-    def __init__(self, graph_path: str, logger: Logger):
+    def __init__(
+        self,
+        graph_path: str,
+        logger: Logger,
+        max_points: Optional[int] = None,
+        cache: Optional[RenderCache] = None,
+    ):
         self.logger = logger
         self.graph_path = graph_path
+        # Points per line after LTTB; one per horizontal pixel by default.
+        self.max_points = max_points or FIGSIZE[0] * DPI
+        self.cache = cache
 
-    def generate(self, samples: List[Dict[str, Any]]):
-        if not samples:
+    def generate(self, samples: Union[List[Dict[str, Any]], SampleColumns]):
+        columns = (
+            samples
+            if isinstance(samples, SampleColumns)
+            else SampleColumns.from_samples(samples)
+        )
+        if not len(columns):
             self.logger.error("No samples to graph")
             return
 
-        times = [
-            datetime.fromisoformat(s["ts"]).replace(tzinfo=timezone.utc).astimezone()
-            for s in samples
-        ]
-        first_prices = samples[0].get("prices", {}) if samples else {}
-        pairs = list(first_prices.keys())
+        local_tz = datetime.now().astimezone().tzinfo
+        key = None
+        if self.cache is not None:
+            # A hit skips matplotlib entirely.
+            key = self.cache.key(
+                columns,
+                "graph",
+                max_points=self.max_points,
+                figsize=FIGSIZE,
+                dpi=DPI,
+                tz=local_tz,
+            )
+            cached = self.cache.get(key, ".png")
+            if cached is not None:
+                try:
+                    copy_atomic(cached, self.graph_path)
+                    self.logger.info(
+                        f"Graph served from render cache {self.graph_path}"
+                    )
+                    return
+                except FileNotFoundError:
+                    # Evicted by another process since get(); render it again.
+                    pass
+
+        import matplotlib.ticker as m_tick
+        import matplotlib.dates as m_dates
+        from matplotlib.figure import Figure
+
+        # Epoch ns -> matplotlib date numbers in one pass; shown in local time.
+        times = m_dates.date2num(columns.ts.astype("datetime64[ns]"))
+
+        fig = Figure(figsize=FIGSIZE, dpi=DPI)
+        ax = fig.add_subplot()
+        for pair in columns.pairs:
+            mask = columns.valid(pair)
+            x = times[mask]
+            y = np.asarray(columns.prices[pair][mask])
+            kept = lttb(x, y, self.max_points)
+            x, y = x[kept], y[kept]
+            ax.plot(
+                x,
+                y,
+                marker="o" if len(x) <= MARKER_THRESHOLD else None,
+                label=pair,
+            )
 
-        fig, ax = plt.subplots(figsize=(10, 4))
-        for pair in pairs:
-            series = [s["prices"].get(pair, None) for s in samples]
-            ax.plot(times, series, marker="o", label=pair)
+            if len(columns) <= ANNOTATION_THRESHOLD:
+                for xi, yi in zip(x.tolist(), y.tolist()):
+                    ax.annotate(
+                        f"{yi:.2f}",
+                        xy=(xi, yi),
+                        xytext=(0, 6),
+                        textcoords="offset points",
+                        ha="center",
+                        fontsize=8,
+                    )
 
-        ax.set_title("Prices (last {} samples)".format(len(samples)))
+        ax.set_title("Prices (last {} samples)".format(len(columns)))
         ax.set_xlabel("Time")
         ax.set_ylabel("Price")
         ax.grid(True)
@@ -40,32 +111,132 @@ class GraphGenerator:
         ax.ticklabel_format(useOffset=False, style="plain", axis="y")
         ax.yaxis.set_major_formatter(m_tick.StrMethodFormatter("{x:,.2f}"))
 
-        annotation_threshold = 20
-        if len(samples) <= annotation_threshold:
-            for pair in pairs:
-                series = [s["prices"].get(pair, None) for s in samples]
-                for x, y in zip(times, series):
-                    if y is not None:
-                        ax.annotate(
-                            f"{y:.2f}",
-                            xy=(x, y),
-                            xytext=(0, 6),
-                            textcoords="offset points",
-                            ha="center",
-                            fontsize=8,
-                        )
-
-        ax.xaxis.set_major_formatter(m_dates.DateFormatter("%H:%M"))
+        ax.xaxis_date(tz=local_tz)
+        ax.xaxis.set_major_formatter(m_dates.DateFormatter("%H:%M", tz=local_tz))
         max_ticks = 8
         step = max(1, len(times) // max_ticks)
-        tick_positions = [times[i] for i in range(0, len(times), step)]
-        ax.set_xticks(tick_positions)
+        ax.set_xticks(times[::step])
 
-        if pairs:
+        if columns.pairs:
             ax.legend(loc="upper left")
 
         fig.autofmt_xdate(rotation=30)
         fig.tight_layout()
-        fig.savefig(self.graph_path)
-        plt.close(fig)
+        save_png_atomic(fig, self.graph_path)
+        if key is not None:
+            self.cache.put_file(key, ".png", self.graph_path)
         self.logger.info(f"Graph generated {self.graph_path}")
+
+
+def save_png_atomic(fig, path: str):
+    # The dashboard may serve the PNG at any moment; never expose a partial file.
+    tmp_path = f"{path}.tmp"
+    fig.savefig(tmp_path, format="png")
+    os.replace(tmp_path, path)
+
+
+def copy_atomic(src: str, path: str):
+    tmp_path = f"{path}.tmp"
+    shutil.copyfile(src, tmp_path)
+    os.replace(tmp_path, path)
+
+
+class _Series:
+    # Growable float64 buffers so appending a sample is O(1) amortised.
+    def __init__(self, capacity: int = 256):
+        self.x = np.empty(capacity)
+        self.y = np.empty(capacity)
+        self.n = 0
+
+    def append(self, x: float, y: float):
+        if self.n == len(self.x):
+            self.x = np.concatenate([self.x, np.empty_like(self.x)])
+            self.y = np.concatenate([self.y, np.empty_like(self.y)])
+        self.x[self.n] = x
+        self.y[self.n] = y
+        self.n += 1
+
+    def arrays(self):
+        return self.x[: self.n], self.y[: self.n]
+
+
+class LiveGraph:
+    # Mid-run rendering: one figure and one line per pair live for the whole
+    # run. Every `every` samples the lines get their (LTTB-downsampled) data
+    # replaced in place, the axes are rescaled and the PNG is swapped in
+    # atomically, so a render costs a savefig rather than a figure rebuild.
+    def __init__(
+        self,
+        graph_path: str,
+        logger: Logger,
+        every: int = 10,
+        max_points: Optional[int] = None,
+    ):
+        self.graph_path = graph_path
+        self.logger = logger
+        self.every = max(1, every)
+        self.max_points = max_points or FIGSIZE[0] * DPI
+        self.samples = 0
+        self._series: Dict[str, _Series] = {}
+        self._lines = {}
+
+        import matplotlib.ticker as m_tick
+        import matplotlib.dates as m_dates
+        from matplotlib.figure import Figure
+
+        self._date2num = m_dates.date2num
+        local_tz = datetime.now().astimezone().tzinfo
+        self.fig = Figure(figsize=FIGSIZE, dpi=DPI)
+        self.ax = self.fig.add_subplot()
+        self.ax.set_xlabel("Time")
+        self.ax.set_ylabel("Price")
+        self.ax.grid(True)
+        self.ax.ticklabel_format(useOffset=False, style="plain", axis="y")
+        self.ax.yaxis.set_major_formatter(m_tick.StrMethodFormatter("{x:,.2f}"))
+        self.ax.xaxis_date(tz=local_tz)
+        self.ax.xaxis.set_major_locator(m_dates.AutoDateLocator(maxticks=8))
+        self.ax.xaxis.set_major_formatter(m_dates.DateFormatter("%H:%M", tz=local_tz))
+        for label in self.ax.get_xticklabels():
+            label.set_rotation(30)
+            label.set_horizontalalignment("right")
+
+    def add(self, when: datetime, prices: Dict[str, float]):
+        x = self._date2num(when)
+        for pair, price in prices.items():
+            if price is None:
+                continue
+            series = self._series.get(pair)
+            if series is None:
+                series = self._series[pair] = _Series()
+            series.append(x, price)
+        self.samples += 1
+        if self.samples % self.every == 0:
+            self.render()
+
+    def render(self):
+        if not self._series:
+            return
+        started = time.monotonic()
+        added = False
+        for pair, series in self._series.items():
+            x, y = series.arrays()
+            kept = lttb(x, y, self.max_points)
+            line = self._lines.get(pair)
+            if line is None:
+                (line,) = self.ax.plot([], [], label=pair)
+                self._lines[pair] = line
+                added = True
+            line.set_data(x[kept], y[kept])
+            line.set_marker("o" if len(kept) <= MARKER_THRESHOLD else "None")
+
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.ax.set_title("Prices (last {} samples)".format(self.samples))
+        if added:
+            self.ax.legend(loc="upper left")
+            self.fig.tight_layout()
+        save_png_atomic(self.fig, self.graph_path)
+        self.logger.info(
+            f"Live graph updated {self.graph_path} "
+            f"({self.samples} samples, {(time.monotonic() - started) * 1000:.0f}ms)"
+        )
@@ -0,0 +1,112 @@
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+from typing import List, Dict, Set, Tuple
+
+# Only loaded once a graph, PDF or non-default engine is actually used.
+# numpy is not in the list: storage (SampleColumns), the run stats and the
+# scheduler all work on numpy arrays, so every collection loads it before its
+# first sample is written; deferring it would only move ~90ms from import to
+# the first tick.
+HEAVY_MODULES = ["matplotlib", "reportlab", "PIL", "aiohttp", "websockets"]
+DEFAULT_BUDGET_MS = 500
+CLI_SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bpi_collector.py"
+)
+
+
+def import_targets() -> List[Tuple[str, List[str]]]:
+    targets = [
+        ("import bpi_collector", ["-c", "import bpi_collector"]),
+        ("import bpi_collector.collector", ["-c", "import bpi_collector.collector"]),
+        ("import bpi_collector.emailer", ["-c", "import bpi_collector.emailer"]),
+    ]
+    if os.path.exists(CLI_SCRIPT):
+        # --help runs every top-level import of the CLI, i.e. what --test pays
+        # before its single fetch.
+        targets.insert(0, ("bpi_collector.py --help", [CLI_SCRIPT, "--help"]))
+    return targets
+
+
+def _importtime(args: List[str]) -> Dict[str, Tuple[int, int]]:
+    # -X importtime lines: "import time: self [us] | cumulative | name"; a
+    # top-level import has no indentation before its name.
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(CLI_SCRIPT),
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        depth = len(name) - len(name.lstrip()) - 1
+        modules[name.strip()] = (int(cumulative), depth)
+    return modules
+
+
+def measure(args: List[str], baseline: Set[str]) -> Tuple[float, List[str]]:
+    modules = _importtime(args)
+    total_us = sum(
+        cumulative
+        for name, (cumulative, depth) in modules.items()
+        if depth == 0 and name not in baseline
+    )
+    heavy = [m for m in HEAVY_MODULES if m in modules]
+    return total_us / 1000, heavy
+
+
+def run_benchmark(repeat: int, budget_ms: float) -> List[Dict]:
+    baseline = set(_importtime(["-c", "pass"]))
+    results = []
+    for label, args in import_targets():
+        timings = []
+        heavy = []
+        for _ in range(repeat):
+            ms, heavy = measure(args, baseline)
+            timings.append(ms)
+        median = statistics.median(timings)
+        results.append(
+            {
+                "target": label,
+                "median_ms": round(median, 1),
+                "min_ms": round(min(timings), 1),
+                "heavy": heavy,
+                "ok": median <= budget_ms and not heavy,
+            }
+        )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure cold import time of the CLI and package entry points"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help="Fail when a target's median import time exceeds this",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.repeat, args.budget_ms)
+    width = max(len(r["target"]) for r in results)
+    for r in results:
+        status = "ok" if r["ok"] else "FAIL"
+        heavy = f"  loads {', '.join(r['heavy'])}" if r["heavy"] else ""
+        print(
+            f"{r['target'].ljust(width)}  median {r['median_ms']:7.1f}ms  "
+            f"min {r['min_ms']:7.1f}ms  {status}{heavy}"
+        )
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
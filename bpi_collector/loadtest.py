@@ -0,0 +1,113 @@
+import os
+import time
+import logging
+import argparse
+import tempfile
+
+from typing import List
+
+from .config import Config
+from .collector import BPICollector
+from .scheduler import DeadlineScheduler
+from .storage_backends import STORAGE_FORMATS, get_backend
+from .mock_api import add_mock_arguments, mock_from_args
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def run_load_test(args) -> dict:
+    logger = logging.getLogger("bpi_collector.loadtest")
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(logging.INFO if args.verbose else logging.CRITICAL)
+    logger.propagate = False
+
+    api = mock_from_args(args).start()
+    pairs = [f"P{i:04d}-USD" for i in range(args.pairs)]
+
+    with tempfile.TemporaryDirectory(prefix="bpi_loadtest_") as tmp:
+        ext = get_backend(args.storage).extension
+        cfg = Config(
+            api_url_template=api.url_template,
+            store_path=os.path.join(tmp, f"bpi_data_loadtest{ext}"),
+            graph_path=os.path.join(tmp, "bpi_graph_loadtest.png"),
+            interval_seconds=args.interval,
+            samples=args.samples,
+            currencies=pairs,
+            storage_format=args.storage,
+            fetch_workers=args.fetch_workers,
+            fetch_timeout_seconds=args.timeout,
+            sample_deadline_seconds=args.deadline,
+            rollup_resolutions=[],
+        )
+        collector = BPICollector(cfg, logger)
+        scheduler = DeadlineScheduler(args.interval, logger, align=False)
+
+        tick_latencies = []
+        fetched = 0
+        started = time.monotonic()
+        try:
+            for _ in range(args.samples):
+                scheduler.wait()
+                tick_start = time.monotonic()
+                prices = collector.run_once()
+                tick_latencies.append(time.monotonic() - tick_start)
+                fetched += len(prices)
+        finally:
+            collector.close()
+            api.stop()
+        elapsed = time.monotonic() - started
+
+    expected = args.pairs * args.samples
+    return {
+        "pairs": args.pairs,
+        "samples": args.samples,
+        "interval_s": args.interval,
+        "elapsed_s": round(elapsed, 2),
+        "requests_served": api.requests,
+        "requests_per_s": round(api.requests / elapsed, 1) if elapsed else 0.0,
+        "prices_per_s": round(fetched / elapsed, 1) if elapsed else 0.0,
+        "missing_prices": expected - fetched,
+        "missing_rate": round((expected - fetched) / expected, 4) if expected else 0.0,
+        "tick_p50_ms": round(percentile(tick_latencies, 50) * 1000, 1),
+        "tick_p99_ms": round(percentile(tick_latencies, 99) * 1000, 1),
+        "tick_max_ms": round(max(tick_latencies, default=0) * 1000, 1),
+        "overran_interval": sum(1 for t in tick_latencies if t > args.interval),
+        **{f"sched_{k}": v for k, v in scheduler.summary().items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Drive BPICollector against the local mock price API and report tick latency"
+    )
+    parser.add_argument("--pairs", type=int, default=50)
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--fetch-workers", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=15)
+    parser.add_argument("--deadline", type=float, default=None)
+    parser.add_argument("--storage", choices=STORAGE_FORMATS, default="ndjson")
+    parser.add_argument("--verbose", action="store_true")
+    add_mock_arguments(parser)
+    args = parser.parse_args(argv)
+
+    report = run_load_test(args)
+    width = max(len(k) for k in report)
+    for key, value in report.items():
+        print(f"{key.ljust(width)}  {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,375 @@
+import re
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+import threading
+
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+from websockets.exceptions import ConnectionClosed
+from websockets.asyncio.server import serve
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+SPOT_PATH = re.compile(r"^/v2/prices/([A-Za-z0-9]+)-([A-Za-z0-9]+)/spot/?$")
+
+
+class _Server(ThreadingHTTPServer):
+    # The default listen backlog of 5 drops connections (and costs a 1s SYN
+    # retry) as soon as a load test opens more than a handful at once.
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    # fixed:S | uniform:LO,HI | normal:MEAN,SD | lognormal:MEDIAN,SIGMA (seconds)
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed" and len(values) == 1:
+        return lambda: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda: rng.uniform(values[0], values[1])
+    if kind == "normal" and len(values) == 2:
+        return lambda: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal" and len(values) == 2:
+        return lambda: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(
+        f"Invalid latency {spec!r}; use fixed:S, uniform:LO,HI, normal:MEAN,SD or lognormal:MEDIAN,SIGMA"
+    )
+
+
+class RandomWalk:
+    # Independent geometric random walk per pair.
+    def __init__(self, start_price: float, volatility: float, rng: random.Random):
+        self.start_price = start_price
+        self.volatility = volatility
+        self.rng = rng
+        self.prices: Dict[str, float] = {}
+
+    def next(self, pair: str) -> float:
+        price = self.prices.get(pair, self.start_price)
+        price *= math.exp(self.rng.gauss(0, self.volatility))
+        self.prices[pair] = price
+        return price
+
+
+class MockPriceAPI:
+    # Stand-in for the Coinbase /v2/prices/{pair}/spot endpoint. Every pair
+    # gets its own geometric random walk; responses are delayed by a sampled
+    # latency (per pair where pair_latency says so) and a configurable
+    # fraction fail with an error status or hang. Connections, requests and
+    # the peak number of requests in flight are counted.
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: str = "fixed:0",
+        pair_latency: Optional[Dict[str, str]] = None,
+        error_rate: float = 0.0,
+        error_statuses: tuple = (500, 503),
+        hang_rate: float = 0.0,
+        hang_seconds: float = 30.0,
+        start_price: float = 50000.0,
+        volatility: float = 0.001,
+        seed: Optional[int] = None,
+    ):
+        self.rng = random.Random(seed)
+        self.latency = parse_latency(latency, self.rng)
+        self.pair_latency = {
+            pair: parse_latency(spec, self.rng)
+            for pair, spec in (pair_latency or {}).items()
+        }
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.walk = RandomWalk(start_price, volatility, self.rng)
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.server = _Server((host, port), self._handler())
+
+    @property
+    def url_template(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v2/prices/{{pair}}/spot"
+
+    def _respond(self, pair: str):
+        # (status, headers, body, delay) for one request
+        with self._lock:
+            self.requests += 1
+            delay = self.pair_latency.get(pair, self.latency)()
+            roll = self.rng.random()
+            if roll < self.hang_rate:
+                return 504, {}, {"errors": [{"id": "timeout"}]}, self.hang_seconds
+            if roll < self.hang_rate + self.error_rate:
+                status = self.rng.choice(self.error_statuses)
+                headers = {"Retry-After": "1"} if status == 429 else {}
+                return status, headers, {"errors": [{"id": "mock_error"}]}, delay
+            amount = self.walk.next(pair)
+        base, currency = pair.split("-", 1)
+        body = {"data": {"base": base, "currency": currency, "amount": f"{amount:.2f}"}}
+        return 200, {}, body, delay
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with api._lock:
+                    api.connections += 1
+
+            def do_GET(self):
+                with api._lock:
+                    api.in_flight += 1
+                    api.max_in_flight = max(api.max_in_flight, api.in_flight)
+                try:
+                    self._get()
+                finally:
+                    with api._lock:
+                        api.in_flight -= 1
+
+            def _get(self):
+                match = SPOT_PATH.match(self.path)
+                if not match:
+                    status, headers, body, delay = 404, {}, {"errors": []}, 0
+                else:
+                    pair = f"{match.group(1)}-{match.group(2)}".upper()
+                    status, headers, body, delay = api._respond(pair)
+                if delay:
+                    time.sleep(delay)
+
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                try:
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "MockPriceAPI":
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, name="mock-price-api", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class MockTickerFeed:
+    # Stand-in for the Coinbase Exchange WebSocket feed: after a "subscribe"
+    # message every requested product gets a "ticker" message each
+    # tick_seconds. disconnect_after closes a connection after that many
+    # tickers so clients' reconnect logic can be exercised.
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        tick_seconds: float = 0.1,
+        disconnect_after: Optional[int] = None,
+        start_price: float = 50000.0,
+        volatility: float = 0.001,
+        seed: Optional[int] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.tick_seconds = tick_seconds
+        self.disconnect_after = disconnect_after
+        self.walk = RandomWalk(start_price, volatility, random.Random(seed))
+        self.connections = 0
+        self.messages = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def _ticker(self, pair: str) -> str:
+        return json.dumps(
+            {
+                "type": "ticker",
+                "product_id": pair,
+                "price": f"{self.walk.next(pair):.2f}",
+                "time": datetime.now(timezone.utc).isoformat(),
+            }
+        )
+
+    async def _handle(self, ws):
+        self.connections += 1
+        try:
+            request = json.loads(await ws.recv())
+        except (ValueError, ConnectionClosed):
+            return
+        pairs: List[str] = list(request.get("product_ids") or [])
+        await ws.send(
+            json.dumps(
+                {
+                    "type": "subscriptions",
+                    "channels": [{"name": "ticker", "product_ids": pairs}],
+                }
+            )
+        )
+        sent = 0
+        try:
+            while True:
+                for pair in pairs:
+                    await ws.send(self._ticker(pair))
+                    self.messages += 1
+                    sent += 1
+                    if self.disconnect_after and sent >= self.disconnect_after:
+                        await ws.close()
+                        return
+                await asyncio.sleep(self.tick_seconds)
+        except ConnectionClosed:
+            pass
+
+    async def serve(self, ready: Optional[threading.Event] = None):
+        self._stop = asyncio.Event()
+        async with serve(self._handle, self.host, self.port) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            if ready is not None:
+                ready.set()
+            await self._stop.wait()
+
+    def start(self) -> "MockTickerFeed":
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.serve(ready))
+            self._loop.close()
+
+        self._thread = threading.Thread(
+            target=run, name="mock-ticker-feed", daemon=True
+        )
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join()
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--latency", default="fixed:0.05", help="Response latency distribution"
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests answered with an error status",
+    )
+    parser.add_argument(
+        "--error-statuses",
+        default="500,503",
+        help="Comma-separated error statuses to sample from",
+    )
+    parser.add_argument(
+        "--hang-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests that stall for --hang-seconds",
+    )
+    parser.add_argument("--hang-seconds", type=float, default=30.0)
+    parser.add_argument(
+        "--volatility",
+        type=float,
+        default=0.001,
+        help="Per-request log-return stddev of the random walk",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def mock_from_args(args, host: str = "127.0.0.1", port: int = 0) -> MockPriceAPI:
+    return MockPriceAPI(
+        host=host,
+        port=port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_statuses=tuple(int(s) for s in args.error_statuses.split(",") if s),
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        volatility=args.volatility,
+        seed=args.seed,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the spot price API"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--ws-port",
+        type=int,
+        default=None,
+        help="Also serve a ticker WebSocket feed on this port",
+    )
+    parser.add_argument(
+        "--tick-seconds",
+        type=float,
+        default=0.1,
+        help="Delay between ticker rounds on the WebSocket feed",
+    )
+    parser.add_argument(
+        "--disconnect-after",
+        type=int,
+        default=None,
+        help="Drop each WebSocket connection after this many tickers",
+    )
+    add_mock_arguments(parser)
+    args = parser.parse_args(argv)
+
+    api = mock_from_args(args, args.host, args.port)
+    print(f"Serving mock prices at {api.url_template}")
+    feed = None
+    if args.ws_port is not None:
+        feed = MockTickerFeed(
+            host=args.host,
+            port=args.ws_port,
+            tick_seconds=args.tick_seconds,
+            disconnect_after=args.disconnect_after,
+            volatility=args.volatility,
+            seed=args.seed,
+        ).start()
+        print(f"Serving mock ticker feed at {feed.url}")
+    try:
+        api.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.server.server_close()
+        if feed is not None:
+            feed.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
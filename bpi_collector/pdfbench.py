@@ -0,0 +1,154 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import tempfile
+import subprocess
+
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any
+
+# appendix: ReportGenerator with its chunked LongTable appendix
+# naive: the same rows as one Table, for comparison
+# summary: ReportGenerator without an appendix
+MODES = ["appendix", "naive", "summary"]
+
+
+def synthetic_samples(rows: int, pairs: int, seed: int = 1) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    names = [f"P{i:03d}-USD" for i in range(pairs)]
+    prices = [100.0 * (i + 1) for i in range(pairs)]
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    samples = []
+    for i in range(rows):
+        prices = [p * (1 + rng.gauss(0, 0.001)) for p in prices]
+        samples.append(
+            {
+                "ts": (start + timedelta(seconds=i)).isoformat(),
+                "prices": dict(zip(names, prices)),
+            }
+        )
+    return samples
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _build_naive(samples: List[Dict[str, Any]], path: str):
+    from reportlab.lib.pagesizes import letter, landscape
+    from reportlab.platypus import SimpleDocTemplate, Table
+
+    from .report_data.registry import TEMPLATES
+    from .report_generator import appendix_rows
+
+    pairs = list(samples[0]["prices"]) if samples else []
+    table = Table([["Time", *pairs], *appendix_rows(samples, pairs)], repeatRows=1)
+    table.setStyle(TEMPLATES.table_style("appendix_table"))
+    SimpleDocTemplate(path, pagesize=landscape(letter)).build([table])
+
+
+def measure(mode: str, rows: int, pairs: int, graph_path: str = None) -> Dict:
+    from .report_generator import ReportGenerator
+
+    samples = synthetic_samples(rows, pairs)
+    rss_before = _peak_rss_mb()
+    with tempfile.TemporaryDirectory(prefix="bpi_pdfbench_") as tmp:
+        path = os.path.join(tmp, "report.pdf")
+        started = time.perf_counter()
+        if mode == "naive":
+            _build_naive(samples, path)
+        else:
+            generator = ReportGenerator(path, appendix=mode == "appendix")
+            generator.generate_report(samples, graph_path)
+        seconds = time.perf_counter() - started
+        size = os.path.getsize(path)
+    peak = _peak_rss_mb()
+    return {
+        "mode": mode,
+        "rows": rows,
+        "pairs": pairs,
+        "seconds": round(seconds, 2),
+        "peak_rss_mb": round(peak, 1),
+        "build_rss_mb": round(peak - rss_before, 1),
+        "pdf_mb": round(size / (1024 * 1024), 2),
+    }
+
+
+def run_isolated(mode: str, rows: int, pairs: int, graph_path: str, timeout: float):
+    # One process per build so peak RSS is not inherited from earlier runs.
+    args = [sys.executable, "-m", "bpi_collector.pdfbench", "--child", mode]
+    args += ["--rows", str(rows), "--pairs", str(pairs)]
+    if graph_path:
+        args += ["--graph", graph_path]
+    try:
+        result = subprocess.run(
+            args,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+    except subprocess.TimeoutExpired:
+        return {"mode": mode, "rows": rows, "pairs": pairs, "error": "timeout"}
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1:] or ["failed"]
+        return {"mode": mode, "rows": rows, "pairs": pairs, "error": error[0]}
+    return json.loads(result.stdout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Measure PDF build time and peak RSS for full-sample appendices"
+    )
+    parser.add_argument(
+        "--rows",
+        type=str,
+        default="100000",
+        help="Comma-separated sample counts to build (e.g. 1000,10000,100000)",
+    )
+    parser.add_argument("--pairs", type=int, default=3)
+    parser.add_argument(
+        "--modes",
+        type=str,
+        default="appendix",
+        help=f"Comma-separated subset of {','.join(MODES)}",
+    )
+    parser.add_argument("--graph", type=str, help="PNG embedded in the report")
+    parser.add_argument(
+        "--timeout", type=float, default=900, help="Seconds allowed per build"
+    )
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure(args.child, int(args.rows), args.pairs, args.graph)))
+        return 0
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    for mode in modes:
+        if mode not in MODES:
+            parser.error(f"Unknown mode {mode!r}; choose from {', '.join(MODES)}")
+    ok = True
+    for rows in (int(r) for r in args.rows.split(",") if r.strip()):
+        for mode in modes:
+            r = run_isolated(mode, rows, args.pairs, args.graph, args.timeout)
+            if "error" in r:
+                ok = False
+                print(f"{mode:8}  rows {rows:>7}  FAIL {r['error']}")
+                continue
+            print(
+                f"{mode:8}  rows {rows:>7}  {r['seconds']:7.2f}s  "
+                f"peak {r['peak_rss_mb']:7.1f}MB  build +{r['build_rss_mb']:6.1f}MB  "
+                f"pdf {r['pdf_mb']:6.2f}MB"
+            )
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,180 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+
+from logging import Logger
+from typing import List, Dict, Any, Optional, Union
+
+from .storage_backends.columns import SampleColumns, iso_to_epoch_ns
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Part of every key; bump it when a renderer's output changes for the same
+# inputs so stale artifacts are never served.
+RENDER_VERSION = 3
+
+
+def sample_range(samples: Union[List[Dict[str, Any]], SampleColumns]) -> dict:
+    # Runs only ever grow, so first/last timestamp, count and pairs identify
+    # the rendered data; the last row's prices catch a rewritten final sample.
+    # Lists and columns of the same samples give the same range.
+    if isinstance(samples, SampleColumns):
+        if not len(samples):
+            return {"count": 0}
+        first, last = int(samples.ts[0]), int(samples.ts[-1])
+        pairs = samples.pairs
+        tail = {
+            pair: col[-1] for pair, col in samples.prices.items() if col[-1] == col[-1]
+        }
+    else:
+        if not samples:
+            return {"count": 0}
+        first = iso_to_epoch_ns(samples[0]["ts"])
+        last = iso_to_epoch_ns(samples[-1]["ts"])
+        pairs: Dict[str, None] = {}
+        for s in samples:
+            for pair in s.get("prices") or {}:
+                pairs.setdefault(pair)
+        pairs = list(pairs)
+        tail = samples[-1].get("prices") or {}
+    return {
+        "first": first,
+        "last": last,
+        "count": len(samples),
+        "pairs": pairs,
+        "tail": {pair: float(tail[pair]) for pair in sorted(tail)},
+    }
+
+
+def file_digest(path: Optional[str]) -> Optional[str]:
+    # Content hash of an input artifact (e.g. the graph embedded in a PDF).
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class RenderCache:
+    # Content-addressed store for rendered artifacts (graph PNG, report HTML
+    # and PDF). An entry is <key><ext> in cache_dir, where the key hashes the
+    # sample range, pairs and render options, so the CLI, --send-test and the
+    # dashboard share renders of the same data. Reads bump the file's mtime
+    # and writes evict the least recently used entries past max_bytes.
+    def __init__(
+        self, cache_dir: str, logger: Logger, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.cache_dir = cache_dir
+        self.logger = logger
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(samples, kind: str, **options) -> str:
+        payload = json.dumps(
+            {
+                "version": RENDER_VERSION,
+                "kind": kind,
+                "range": sample_range(samples),
+                "options": options,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+    def path(self, key: str, ext: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{ext}")
+
+    def get(self, key: str, ext: str) -> Optional[str]:
+        path = self.path(key, ext)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def put_file(self, key: str, ext: str, src: str, move: bool = False) -> str:
+        path = self.path(key, ext)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if move:
+            shutil.move(src, tmp_path)
+        else:
+            shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, path)
+        self._evict(keep=path)
+        return path
+
+    def put_bytes(self, key: str, ext: str, data: bytes) -> str:
+        path = self.path(key, ext)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._evict(keep=path)
+        return path
+
+    def get_text(self, key: str, ext: str) -> Optional[str]:
+        path = self.get(key, ext)
+        if path is None:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            # Evicted by another process between get() and open().
+            return None
+
+    def put_text(self, key: str, ext: str, text: str) -> str:
+        return self.put_bytes(key, ext, text.encode("utf-8"))
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.is_file() or entry.name.endswith(".tmp"):
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, entry.path))
+        return entries
+
+    def _evict(self, keep: str):
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                self.evictions += 1
+                self.logger.info(f"Render cache evicted {os.path.basename(path)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._entries()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+            }
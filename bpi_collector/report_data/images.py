@@ -1,5 +1,10 @@
 import os
 import base64
+import struct
+
+from typing import Optional, Tuple
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
 
 
 def encode_image_base64(image_path: str) -> str:
@@ -9,3 +14,13 @@ def encode_image_base64(image_path: str) -> str:
     with open(image_path, "rb") as image_file:
         encoded = base64.b64encode(image_file.read()).decode("utf-8")
         return f"data:image/png;base64,{encoded}"
+
+
+def png_size(image_path: str) -> Optional[Tuple[int, int]]:
+    # Width and height from the IHDR chunk, which always directly follows the
+    # signature; None when the file is not a PNG.
+    with open(image_path, "rb") as image_file:
+        head = image_file.read(24)
+    if len(head) < 24 or head[:8] != PNG_SIGNATURE or head[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", head[16:24])
@@ -0,0 +1,98 @@
+import os
+import string
+import threading
+
+from typing import Dict, Any, Callable, Iterable, Tuple
+
+from .styles import get_report_styles, get_table_styles
+
+TEMPLATES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "templates",
+)
+
+
+class CompiledTemplate:
+    # A str.format template whose fields are parsed (and syntax-checked) once
+    # at load; rendering goes straight to the C formatter, and a batch of rows
+    # is rendered with a single join.
+    def __init__(self, source: str, name: str = "<inline>"):
+        self.source = source
+        self.name = name
+        self.fields = frozenset(
+            field.split(".")[0].split("[")[0]
+            for _, field, _, _ in string.Formatter().parse(source)
+            if field
+        )
+
+    def render(self, **values) -> str:
+        # Names the template and every missing field at once, rather than the
+        # first KeyError format_map happens to hit.
+        missing = self.fields.difference(values)
+        if missing:
+            raise KeyError(f"{self.name} is missing {', '.join(sorted(missing))}")
+        return self.source.format_map(values)
+
+    def render_rows(self, rows: Iterable[Dict[str, Any]]) -> str:
+        return "".join(map(self.source.format_map, rows))
+
+
+class TemplateRegistry:
+    # Process-wide cache of report templates and ReportLab styles. File
+    # templates are reloaded when their mtime or size changes; templates and
+    # styles built in code are created once per process.
+    def __init__(self, directory: str = TEMPLATES_DIR):
+        self.directory = directory
+        self.loads = 0
+        self._lock = threading.Lock()
+        self._files: Dict[str, Tuple[Tuple[int, int], CompiledTemplate]] = {}
+        self._objects: Dict[Any, Any] = {}
+
+    def signature(self, name: str) -> Tuple[int, int]:
+        st = os.stat(os.path.join(self.directory, name))
+        return st.st_mtime_ns, st.st_size
+
+    def template(self, name: str) -> CompiledTemplate:
+        signature = self.signature(name)
+        entry = self._files.get(name)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        with self._lock:
+            with open(os.path.join(self.directory, name), "r", encoding="utf-8") as f:
+                compiled = CompiledTemplate(f.read(), name)
+            self._files[name] = (signature, compiled)
+            self.loads += 1
+        return compiled
+
+    def cached(self, key, build: Callable[[], Any]) -> Any:
+        value = self._objects.get(key)
+        if value is None:
+            with self._lock:
+                value = self._objects.get(key)
+                if value is None:
+                    value = self._objects[key] = build()
+                    self.loads += 1
+        return value
+
+    def inline(self, name: str, source: Callable[[], str]) -> CompiledTemplate:
+        return self.cached(("inline", name), lambda: CompiledTemplate(source(), name))
+
+    def report_styles(self):
+        return self.cached("report_styles", get_report_styles)
+
+    def table_style(self, name: str):
+        # TableStyle only copies its commands into a table, so one instance
+        # can style every table built from it.
+        from reportlab.platypus import TableStyle
+
+        return self.cached(
+            ("table", name), lambda: TableStyle(get_table_styles()[name])
+        )
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+            self._objects.clear()
+
+
+TEMPLATES = TemplateRegistry()
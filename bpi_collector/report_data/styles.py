@@ -1,8 +1,7 @@
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-
-
 def get_report_styles():
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
     styles = getSampleStyleSheet()
     styles.add(
         ParagraphStyle(
@@ -35,6 +34,8 @@ def get_report_styles():
 
 
 def get_table_styles():
+    from reportlab.lib import colors
+
     return {
         "info_table": [
             ("TEXTCOLOR", (0, 0), (-1, -1), colors.HexColor("#2c3e50")),
@@ -53,6 +54,19 @@ def get_table_styles():
             ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
             ("PADDING", (0, 0), (-1, -1), 8),
         ],
+        # Small type and tight padding so a page holds ~40 appendix rows.
+        "appendix_table": [
+            ("TEXTCOLOR", (0, 0), (-1, -1), colors.HexColor("#2c3e50")),
+            ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
+            ("FONTSIZE", (0, 0), (-1, -1), 7),
+            ("LINEBELOW", (0, 0), (-1, -1), 0.25, colors.HexColor("#e9ecef")),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#667eea")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("TOPPADDING", (0, 0), (-1, -1), 1),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 1),
+        ],
     }
 
 
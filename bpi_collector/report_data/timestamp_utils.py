@@ -1,6 +1,6 @@
 from zoneinfo import ZoneInfo
 from datetime import datetime, timezone
-from typing import Union, List, Dict, Any, Tuple
+from typing import Union
 
 
 def convert_timestamp_to_datetime(ts: Union[str, datetime]) -> datetime:
@@ -34,22 +34,3 @@ def format_datetime_local(
         return local_dt.strftime("%Y-%m-%d %I:%M:%S %p")
     else:
         return local_dt.strftime("%Y-%m-%d %I:%M %p")
-
-
-def extract_price_stats(
-    samples: List[Dict[str, Any]], pair: str
-) -> Tuple[float, float, float, float]:
-    prices = []
-    for s in samples:
-        if s.get("prices") and s.get("prices").get(pair) is not None:
-            prices.append(s["prices"][pair])
-
-    if not prices:
-        return 0, 0, 0, 0
-
-    min_price = min(prices)
-    max_price = max(prices)
-    current = prices[-1]
-    change = ((current - prices[0]) / prices[0] * 100) if prices[0] else 0
-
-    return min_price, max_price, current, change
@@ -1,11 +1,14 @@
 import os
+import io
+import itertools
 from pathlib import Path
 from datetime import datetime
-from PIL import Image as PILImage
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Iterable, Iterator
 
+from .stats import RunStats, compute_stats
+from .report_data.registry import TEMPLATES
 from .report_data.templates import get_price_row_template
-from .report_data.images import encode_image_base64
+from .report_data.images import encode_image_base64, png_size
 from .report_data.formatting import (
     format_timestamp,
     format_time_short,
@@ -13,7 +16,6 @@ from .report_data.formatting import (
 )
 from .report_data.timestamp_utils import (
     convert_timestamp_to_datetime,
-    extract_price_stats,
 )
 
 from .report_data.templates import (
@@ -22,31 +24,120 @@ from .report_data.templates import (
     get_graph_container_template,
 )
 from .report_data.styles import (
-    get_report_styles,
-    get_table_styles,
     get_fallback_html_template,
     get_simple_html_template,
 )
 
-from reportlab.lib.units import inch
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.platypus import (
-    SimpleDocTemplate,
-    Paragraph,
-    Spacer,
-    Image,
-    Table,
-    TableStyle,
-)
+HTML_TEMPLATE = "report_template_simple.html"
+# Graphs are embedded at this resolution for their width in the PDF; larger
+# PNGs are downsampled, smaller ones are embedded as they are.
+IMAGE_DPI = 150
+IMAGE_WIDTH_INCHES = 9
+# The appendix is emitted as one LongTable per chunk of rows (split across
+# pages with the header repeated) and at most this many price columns per
+# table; more pairs get further appendix sections.
+APPENDIX_CHUNK_ROWS = 200
+APPENDIX_MAX_PAIRS = 8
+APPENDIX_ROW_HEIGHT = 11
+# Rendered in place of the generation time when the HTML is going into the
+# render cache (whose key is the sample content, not the clock);
+# stamp_report_date fills it in each time the HTML is served.
+REPORT_DATE_PLACEHOLDER = "<!--bpi:report-date-->"
+
+
+def current_report_date() -> str:
+    # Ensure we're using the system timezone that's set via TZ environment variable
+    local_now = datetime.now().astimezone()
+    return local_now.strftime("%B %d, %Y at %I:%M %p") + " (Local Time)"
+
+
+def stamp_report_date(html: str) -> str:
+    return html.replace(REPORT_DATE_PLACEHOLDER, current_report_date())
+
+
+def _streaming_doc_template():
+    from reportlab.platypus import SimpleDocTemplate
+
+    class StreamingDocTemplate(SimpleDocTemplate):
+        # handle_flowable is ReportLab's per-flowable hook: it takes the next
+        # flowable off the front of a list (the story, or ReportLab's own
+        # queue of page actions). Topping the story up from `pending` around
+        # it means only the next few appendix tables exist at any time;
+        # build_streaming checks that nothing was left unbuilt.
+        # Relies on BaseDocTemplate.build looping `while len(flowables)` over
+        # the very list it hands to handle_flowable, as it does in ReportLab
+        # 5.0.1 (the version this was verified against); the completeness
+        # check turns any change there into an error, not a truncated PDF.
+        lookahead = 3
+
+        def __init__(self, filename: str, **kw):
+            super().__init__(filename, **kw)
+            self._story: list = []
+            self._pending: Iterator = iter(())
+
+        def _top_up(self, flowables: list):
+            if flowables is not self._story:
+                return
+            while len(flowables) < self.lookahead:
+                flowable = next(self._pending, None)
+                if flowable is None:
+                    break
+                flowables.append(flowable)
+
+        def handle_flowable(self, flowables):
+            self._top_up(flowables)
+            super().handle_flowable(flowables)
+            self._top_up(flowables)
+
+        def build_streaming(self, story: list, pending: Iterator):
+            self._story = list(story)
+            self._pending = pending
+            self._top_up(self._story)
+            self.build(self._story)
+            if next(self._pending, None) is not None:
+                raise RuntimeError("PDF build stopped before the appendix was complete")
+
+    return StreamingDocTemplate
+
+
+def streaming_doc_template():
+    # Built once per process so ReportLab is only imported for a PDF.
+    return TEMPLATES.cached("streaming_doc", _streaming_doc_template)
+
+
+def appendix_rows(samples: Iterable[Dict[str, Any]], pairs: List[str]) -> Iterator:
+    for s in samples:
+        prices = s.get("prices") or {}
+        row = [format_timestamp(s["ts"])]
+        for pair in pairs:
+            price = prices.get(pair)
+            row.append("" if price is None else f"{price:,.2f}")
+        yield row
 
 
 class ReportGenerator:
-    def __init__(self, output_path: str):
+    def __init__(
+        self, output_path: str, appendix: bool = False, image_dpi: int = IMAGE_DPI
+    ):
         self.output_path = output_path
+        # PDF only: append every sample as paginated tables
+        self.appendix = appendix
+        self.image_dpi = image_dpi
         self.html_template_path = (
             Path(__file__).parent.parent / "templates" / "report_template_new.html"
         )
-        self.styles = get_report_styles()
+
+    @property
+    def styles(self):
+        # ReportLab is only loaded once a PDF is actually built, and its
+        # stylesheet is shared by every generator in the process.
+        return TEMPLATES.report_styles()
+
+    @staticmethod
+    def html_signature():
+        # Changes whenever the HTML template file is edited; part of the
+        # render cache key of HTML reports.
+        return TEMPLATES.signature(HTML_TEMPLATE)
 
     @staticmethod
     def format_timestamp(ts) -> str:
@@ -65,63 +156,51 @@ class ReportGenerator:
         return encode_image_base64(image_path)
 
     def generate_html_report(
-        self, samples: List[Dict[str, Any]], graph_path: str = None
+        self,
+        samples: List[Dict[str, Any]],
+        graph_path: str = None,
+        stats: Optional[RunStats] = None,
+        report_date: Optional[str] = None,
     ) -> str:
         if not samples:
             return "No data available for report"
 
-        template_path = (
-            Path(__file__).parent.parent / "templates" / "report_template_simple.html"
-        )
-        with open(template_path, "r", encoding="utf-8") as f:
-            template = f.read()
+        template = TEMPLATES.template(HTML_TEMPLATE)
 
-        start_ts = samples[0]["ts"]
-        end_ts = samples[-1]["ts"]
+        stats = stats or compute_stats(samples)
+        start_time = convert_timestamp_to_datetime(stats.start_ts)
+        end_time = convert_timestamp_to_datetime(stats.end_ts)
 
-        start_time = convert_timestamp_to_datetime(start_ts)
-        end_time = convert_timestamp_to_datetime(end_ts)
-
-        pairs = (
-            list(samples[0].get("prices", {}).keys())
-            if samples[0].get("prices")
-            else []
-        )
-
-        price_rows = []
-
-        btc_prices = [
-            s["prices"].get("BTC-USD", 0)
-            for s in samples
-            if "BTC-USD" in s.get("prices", {})
-        ]
-
-        if btc_prices:
-            min_price = f"${min(btc_prices):,.2f}"
-            max_price = f"${max(btc_prices):,.2f}"
-            avg_price = f"${sum(btc_prices)/len(btc_prices):,.2f}"
+        btc = stats.get("BTC-USD")
+        if btc:
+            min_price = f"${btc.min:,.2f}"
+            max_price = f"${btc.max:,.2f}"
+            avg_price = f"${btc.mean:,.2f}"
         else:
             min_price = max_price = avg_price = "N/A"
 
-        for pair in pairs:
-            min_price, max_price, current, change = extract_price_stats(samples, pair)
-
-            if min_price or max_price or current:
-                color = (
-                    "#28a745" if change > 0 else "#dc3545" if change < 0 else "#6c757d"
-                )
-                change_text = f"{change:+.2f}%" if change != 0 else "0.00%"
-                price_row_template = get_price_row_template()
-                price_rows.append(
-                    price_row_template.format(
-                        pair=pair,
-                        min_price=min_price,
-                        max_price=max_price,
-                        current=current,
-                        color=color,
-                        change_text=change_text,
-                    )
-                )
+        rows = []
+        for pair_stats in stats.pairs.values():
+            if not (pair_stats.min or pair_stats.max or pair_stats.last):
+                continue
+            change = pair_stats.change_pct
+            rows.append(
+                {
+                    "pair": pair_stats.pair,
+                    "min_price": pair_stats.min,
+                    "max_price": pair_stats.max,
+                    "current": pair_stats.last,
+                    "color": (
+                        "#28a745"
+                        if change > 0
+                        else "#dc3545" if change < 0 else "#6c757d"
+                    ),
+                    "change_text": f"{change:+.2f}%" if change != 0 else "0.00%",
+                }
+            )
+        price_rows = TEMPLATES.inline("price_row", get_price_row_template).render_rows(
+            rows
+        )
 
         graph_content = ""
         if graph_path and os.path.exists(graph_path):
@@ -140,31 +219,30 @@ class ReportGenerator:
             duration_seconds = (end_time - start_time).total_seconds()
             interval = duration_seconds / (len(samples) - 1) if len(samples) > 1 else 0
 
-            # Ensure we're using the system timezone that's set via TZ environment variable
-            local_now = datetime.now().astimezone()
-            report_html = template.format(
-                report_date=local_now.strftime("%B %d, %Y at %I:%M %p")
-                + " (Local Time)",
+            report_html = template.render(
+                report_date=report_date or current_report_date(),
                 sample_count=len(samples),
                 collection_period=duration_str,
                 sample_interval=f"{interval:.1f}",
-                min_price=min_price if "min_price" in locals() else "N/A",
-                max_price=max_price if "max_price" in locals() else "N/A",
-                avg_price=avg_price if "avg_price" in locals() else "N/A",
-                price_rows="".join(price_rows),
+                min_price=min_price,
+                max_price=max_price,
+                avg_price=avg_price,
+                price_rows=price_rows,
             )
             return report_html
         except Exception as e:
             print(f"Template formatting failed: {e}")
 
-            template = get_fallback_price_row_template()
-            price_rows = "".join(
-                template.format(pair=pair, price=samples[-1]["prices"][pair])
-                for pair in samples[-1]["prices"]
+            price_rows = TEMPLATES.inline(
+                "fallback_price_row", get_fallback_price_row_template
+            ).render_rows(
+                {"pair": pair, "price": price}
+                for pair, price in samples[-1]["prices"].items()
             )
 
-            return get_fallback_html_template().format(
-                current_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC"),
+            return TEMPLATES.inline("fallback_html", get_fallback_html_template).render(
+                current_time=report_date
+                or datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC"),
                 sample_count=len(samples),
                 price_rows=price_rows,
             )
@@ -199,8 +277,75 @@ class ReportGenerator:
 
         return html
 
-    def generate_report(self, samples: list, graph_path: str = None) -> str:
-        doc = SimpleDocTemplate(
+    def _graph_flowable(self, graph_path: str):
+        from reportlab.lib.units import inch
+        from reportlab.platypus import Image
+
+        size = png_size(graph_path)
+        if size is None:
+            from PIL import Image as PILImage
+
+            with PILImage.open(graph_path) as img:
+                size = img.size
+        px_width, px_height = size
+        width = IMAGE_WIDTH_INCHES * inch
+        height = width * px_height / px_width
+
+        target_width = int(IMAGE_WIDTH_INCHES * self.image_dpi)
+        if px_width <= target_width:
+            return Image(graph_path, width=width, height=height)
+
+        # Only an oversized graph pays for decoding and resampling.
+        from PIL import Image as PILImage
+
+        target_height = max(1, round(target_width * px_height / px_width))
+        buffer = io.BytesIO()
+        with PILImage.open(graph_path) as img:
+            img.resize((target_width, target_height), PILImage.LANCZOS).save(
+                buffer, format="PNG"
+            )
+        buffer.seek(0)
+        return Image(buffer, width=width, height=height)
+
+    def _appendix_flowables(self, samples: list, pairs: List[str]) -> Iterator:
+        from reportlab.lib.units import inch
+        from reportlab.platypus import LongTable, PageBreak, Paragraph
+
+        style = TEMPLATES.table_style("appendix_table")
+        for start in range(0, len(pairs), APPENDIX_MAX_PAIRS):
+            group = pairs[start : start + APPENDIX_MAX_PAIRS]
+            header = ["Time", *group]
+            col_widths = [1.9 * inch] + [0.95 * inch] * len(group)
+            yield PageBreak()
+            yield Paragraph(
+                f"Appendix: All Samples ({', '.join(group)})",
+                self.styles["BPIHeading"],
+            )
+            rows = appendix_rows(samples, group)
+            while True:
+                chunk = list(itertools.islice(rows, APPENDIX_CHUNK_ROWS))
+                if not chunk:
+                    break
+                table = LongTable(
+                    [header, *chunk],
+                    colWidths=col_widths,
+                    rowHeights=[APPENDIX_ROW_HEIGHT] * (len(chunk) + 1),
+                    repeatRows=1,
+                )
+                table.setStyle(style)
+                yield table
+
+    def generate_report(
+        self,
+        samples: list,
+        graph_path: str = None,
+        stats: Optional[RunStats] = None,
+    ) -> str:
+        from reportlab.lib.units import inch
+        from reportlab.lib.pagesizes import letter, landscape
+        from reportlab.platypus import Paragraph, Spacer, Table
+
+        doc = streaming_doc_template()(
             self.output_path,
             pagesize=landscape(letter),
             rightMargin=50,
@@ -213,33 +358,26 @@ class ReportGenerator:
         story.append(Paragraph("Bitcoin Price Index Report", self.styles["BPITitle"]))
 
         if samples:
-            start_time = self.format_timestamp(samples[0]["ts"])
-            end_time = self.format_timestamp(samples[-1]["ts"])
+            stats = stats or compute_stats(samples)
+            start_time = self.format_timestamp(stats.start_ts)
+            end_time = self.format_timestamp(stats.end_ts)
 
-            pairs = (
-                list(samples[0].get("prices", {}).keys())
-                if samples[0].get("prices")
-                else []
-            )
+            pairs = list(stats.pairs)
             stats_data = []
 
-            for pair in pairs:
-                min_price, max_price, current, change = extract_price_stats(
-                    samples, pair
-                )
-
-                if min_price or max_price or current:
+            for pair_stats in stats.pairs.values():
+                if pair_stats.min or pair_stats.max or pair_stats.last:
                     stats_data.append(
                         [
-                            pair,
-                            f"${min_price:,.2f}",
-                            f"${max_price:,.2f}",
-                            f"${current:,.2f}",
-                            f"{change:+.2f}%",
+                            pair_stats.pair,
+                            f"${pair_stats.min:,.2f}",
+                            f"${pair_stats.max:,.2f}",
+                            f"${pair_stats.last:,.2f}",
+                            f"{pair_stats.change_pct:+.2f}%",
                         ]
                     )
 
-            duration = self.calculate_duration(samples[0]["ts"], samples[-1]["ts"])
+            duration = self.calculate_duration(stats.start_ts, stats.end_ts)
             info_data = [
                 ["Collection Period", f"{start_time} to {end_time}"],
                 ["Duration", duration],
@@ -248,7 +386,7 @@ class ReportGenerator:
             ]
 
             info_table = Table(info_data, colWidths=[2.5 * inch, 4 * inch])
-            info_table.setStyle(TableStyle(get_table_styles()["info_table"]))
+            info_table.setStyle(TEMPLATES.table_style("info_table"))
 
             story.append(Paragraph("Session Overview", self.styles["BPIHeading"]))
             story.append(info_table)
@@ -266,7 +404,7 @@ class ReportGenerator:
                         1.5 * inch,
                     ],
                 )
-                stats_table.setStyle(TableStyle(get_table_styles()["stats_table"]))
+                stats_table.setStyle(TEMPLATES.table_style("stats_table"))
 
                 story.append(Paragraph("Price Statistics", self.styles["BPIHeading"]))
                 story.append(stats_table)
@@ -274,12 +412,10 @@ class ReportGenerator:
 
         if graph_path and os.path.exists(graph_path):
             story.append(Paragraph("Price History", self.styles["BPIHeading"]))
-            img = PILImage.open(graph_path)
-            aspect = img.height / img.width
-            img_width = 9 * inch  # Max width
-            img_height = img_width * aspect
-
-            story.append(Image(graph_path, width=img_width, height=img_height))
+            story.append(self._graph_flowable(graph_path))
 
-        doc.build(story)
+        appendix = iter(())
+        if self.appendix and samples:
+            appendix = self._appendix_flowables(samples, list(stats.pairs))
+        doc.build_streaming(story, appendix)
         return self.output_path
@@ -0,0 +1,242 @@
+import os
+import re
+import json
+import time
+
+from logging import Logger
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+from .storage_backends.columns import EPOCH, iso_to_epoch_ns
+
+DEFAULT_RESOLUTIONS = ["1m", "5m", "1h"]
+# Open bars that only moved (no bar opened or closed) are snapshotted at most
+# this often; close() writes the final state.
+OPEN_FLUSH_SECONDS = 5.0
+UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def resolution_seconds(resolution: str) -> int:
+    match = re.fullmatch(r"(\d+)([smhd])", resolution.strip())
+    if not match:
+        raise ValueError(
+            f"Invalid rollup resolution {resolution!r}; use e.g. 30s, 1m, 1h"
+        )
+    return int(match.group(1)) * UNIT_SECONDS[match.group(2)]
+
+
+def rollup_paths(store_path: str) -> Tuple[str, str]:
+    stem = os.path.splitext(store_path)[0]
+    return f"{stem}.rollups.ndjson", f"{stem}.rollups.open.json"
+
+
+def _bucket_iso(bucket: int) -> str:
+    return datetime.fromtimestamp(bucket, timezone.utc).isoformat()
+
+
+def _read_open(open_path: str) -> Optional[Dict[str, Any]]:
+    # The open-bar snapshot also records the run's resolutions, sample count
+    # and time span, so readers can size a chart without reading the run.
+    if not os.path.exists(open_path):
+        return None
+    with open(open_path, "r", encoding="utf-8") as f:
+        snapshot = json.load(f)
+    if isinstance(snapshot, list):
+        # written before the snapshot carried the run summary
+        return {
+            "resolutions": [],
+            "samples": 0,
+            "first": None,
+            "last": None,
+            "bars": snapshot,
+        }
+    return snapshot
+
+
+class RollupStore:
+    # Keeps an open/high/low/close/count bar per (resolution, pair) and updates
+    # it as samples arrive. Closed bars are appended to <run>.rollups.ndjson;
+    # the still-open bars are snapshotted to <run>.rollups.open.json so readers
+    # see the current bucket too. The snapshot is rewritten when a bar opens or
+    # closes, and otherwise at most every `flush_seconds`.
+    def __init__(
+        self,
+        store_path: str,
+        logger: Logger,
+        resolutions: List[str] = None,
+        flush_seconds: float = OPEN_FLUSH_SECONDS,
+    ):
+        self.logger = logger
+        self.resolutions = {
+            r: resolution_seconds(r)
+            for r in (DEFAULT_RESOLUTIONS if resolutions is None else resolutions)
+        }
+        self.flush_seconds = flush_seconds
+        self.closed_path, self.open_path = rollup_paths(store_path)
+        self.samples = 0
+        self.first: Optional[str] = None
+        self.last: Optional[str] = None
+        self._bars: Dict[Tuple[str, str], Dict[str, Any]] = self._load_open()
+        self._dirty = False
+        self._written = time.monotonic()
+
+    def _load_open(self) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        try:
+            snapshot = _read_open(self.open_path)
+        except ValueError as err:
+            self.logger.warning(f"Ignoring unreadable rollup snapshot\n{err}")
+            return {}
+        if snapshot is None:
+            return {}
+        self.samples = snapshot["samples"]
+        self.first = snapshot["first"]
+        self.last = snapshot["last"]
+        return {
+            (b["res"], b["pair"]): b
+            for b in snapshot["bars"]
+            if b["res"] in self.resolutions
+        }
+
+    def _write_open(self):
+        tmp_path = f"{self.open_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "resolutions": list(self.resolutions),
+                    "samples": self.samples,
+                    "first": self.first,
+                    "last": self.last,
+                    "bars": list(self._bars.values()),
+                },
+                f,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_path, self.open_path)
+        self._dirty = False
+        self._written = time.monotonic()
+
+    def update(self, timestamp: datetime, prices: dict):
+        if not self.resolutions or not prices:
+            return
+
+        iso = timestamp.isoformat()
+        self.samples += 1
+        self.first = self.first or iso
+        self.last = iso
+        epoch = int((timestamp - EPOCH).total_seconds())
+        closed = []
+        opened = False
+        for res, seconds in self.resolutions.items():
+            bucket = epoch - epoch % seconds
+            start = _bucket_iso(bucket)
+            for pair, price in prices.items():
+                if price is None:
+                    continue
+                key = (res, pair)
+                bar = self._bars.get(key)
+                if bar is not None and bar["start"] != start:
+                    closed.append(bar)
+                    bar = None
+                if bar is None:
+                    opened = True
+                    self._bars[key] = {
+                        "res": res,
+                        "pair": pair,
+                        "start": start,
+                        "o": price,
+                        "h": price,
+                        "l": price,
+                        "c": price,
+                        "n": 1,
+                    }
+                else:
+                    bar["h"] = max(bar["h"], price)
+                    bar["l"] = min(bar["l"], price)
+                    bar["c"] = price
+                    bar["n"] += 1
+
+        if closed:
+            with open(self.closed_path, "a", encoding="utf-8") as f:
+                f.write(
+                    "".join(json.dumps(b, separators=(",", ":")) + "\n" for b in closed)
+                )
+        self._dirty = True
+        if opened or time.monotonic() - self._written >= self.flush_seconds:
+            self._write_open()
+
+    def close(self):
+        # Open bars stay in the snapshot; a resumed run continues them.
+        if self._dirty:
+            self._write_open()
+
+
+def load_rollup_summary(store_path: str) -> Optional[Dict[str, Any]]:
+    # {"resolutions", "samples", "first", "last"} of a run with rollups, from
+    # its open-bar snapshot; None when the run has none.
+    try:
+        snapshot = _read_open(rollup_paths(store_path)[1])
+    except ValueError:
+        return None
+    if snapshot is None:
+        return None
+    snapshot.pop("bars")
+    return snapshot
+
+
+def load_bars(
+    store_path: str,
+    resolution: str,
+    pair: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    closed_path, open_path = rollup_paths(store_path)
+    bars = []
+    if os.path.exists(closed_path):
+        with open(closed_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    bars.append(json.loads(line))
+                except ValueError:
+                    continue
+    try:
+        snapshot = _read_open(open_path)
+    except ValueError:
+        snapshot = None
+    if snapshot is not None:
+        bars.extend(snapshot["bars"])
+
+    start_ns = iso_to_epoch_ns(start) if start else None
+    end_ns = iso_to_epoch_ns(end) if end else None
+    result = []
+    for bar in bars:
+        if bar["res"] != resolution or (pair and bar["pair"] != pair):
+            continue
+        bar_ns = iso_to_epoch_ns(bar["start"])
+        if start_ns is not None and bar_ns < start_ns:
+            continue
+        if end_ns is not None and bar_ns > end_ns:
+            continue
+        result.append(bar)
+    result.sort(key=lambda b: (b["pair"], b["start"]))
+    return result
+
+
+def pick_resolution(
+    span_seconds: float,
+    sample_count: int,
+    max_points: int,
+    resolutions: List[str] = None,
+) -> Optional[str]:
+    # Finest resolution that keeps the chart under max_points bars per pair;
+    # None means the raw samples already fit.
+    if sample_count <= max_points:
+        return None
+    candidates = sorted(
+        DEFAULT_RESOLUTIONS if resolutions is None else resolutions,
+        key=resolution_seconds,
+    )
+    for res in candidates:
+        if span_seconds / resolution_seconds(res) <= max_points:
+            return res
+    return candidates[-1] if candidates else None
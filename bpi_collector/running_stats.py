@@ -0,0 +1,241 @@
+import os
+import math
+import json
+import time
+
+from logging import Logger
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from .stats import PairStats, RunStats
+
+DEFAULT_WINDOW = 60
+# The snapshot holds every pair's window deques, so it is rewritten at most
+# this often rather than on every sample; close() writes the final state.
+SNAPSHOT_SECONDS = 5.0
+
+
+def stats_path(store_path: str) -> str:
+    return f"{os.path.splitext(store_path)[0]}.stats.json"
+
+
+class PairAccumulator:
+    # Constant-memory summary of one pair: Welford mean/variance of prices and
+    # of log returns, running min/max, first/last, and min/max over the last
+    # `window` prices via monotonic deques of (index, price).
+    def __init__(self, window: int):
+        self.window = window
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.first = None
+        self.last = None
+        self.returns = 0
+        self.returns_mean = 0.0
+        self.returns_m2 = 0.0
+        self.window_min = deque()
+        self.window_max = deque()
+
+    def update(self, price: float):
+        if self.last is not None and self.last > 0 and price > 0:
+            r = math.log(price / self.last)
+            self.returns += 1
+            delta = r - self.returns_mean
+            self.returns_mean += delta / self.returns
+            self.returns_m2 += delta * (r - self.returns_mean)
+
+        i = self.count
+        self.count += 1
+        delta = price - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (price - self.mean)
+        self.min = min(self.min, price)
+        self.max = max(self.max, price)
+        if self.first is None:
+            self.first = price
+        self.last = price
+
+        # Each deque holds the window's candidates in order; anything that can
+        # no longer be the min (max) is dropped as the new price arrives.
+        while self.window_min and self.window_min[-1][1] >= price:
+            self.window_min.pop()
+        self.window_min.append((i, price))
+        while self.window_max and self.window_max[-1][1] <= price:
+            self.window_max.pop()
+        self.window_max.append((i, price))
+        expired = i - self.window
+        while self.window_min[0][0] <= expired:
+            self.window_min.popleft()
+        while self.window_max[0][0] <= expired:
+            self.window_max.popleft()
+
+    def stats(self, pair: str) -> PairStats:
+        first = self.first
+        return PairStats(
+            pair=pair,
+            count=self.count,
+            min=self.min,
+            max=self.max,
+            mean=self.mean,
+            std=math.sqrt(self.m2 / self.count) if self.count > 1 else 0.0,
+            first=first,
+            last=self.last,
+            change_pct=(self.last - first) / first * 100 if first else 0.0,
+            volatility=(
+                math.sqrt(self.returns_m2 / self.returns) if self.returns > 1 else 0.0
+            ),
+            window_min=self.window_min[0][1],
+            window_max=self.window_max[0][1],
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "n": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min,
+            "max": self.max,
+            "first": self.first,
+            "last": self.last,
+            "rn": self.returns,
+            "rmean": self.returns_mean,
+            "rm2": self.returns_m2,
+            "wmin": list(self.window_min),
+            "wmax": list(self.window_max),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], window: int) -> "PairAccumulator":
+        acc = cls(window)
+        acc.count = data["n"]
+        acc.mean = data["mean"]
+        acc.m2 = data["m2"]
+        acc.min = data["min"]
+        acc.max = data["max"]
+        acc.first = data["first"]
+        acc.last = data["last"]
+        acc.returns = data["rn"]
+        acc.returns_mean = data["rmean"]
+        acc.returns_m2 = data["rm2"]
+        acc.window_min = deque(tuple(e) for e in data["wmin"])
+        acc.window_max = deque(tuple(e) for e in data["wmax"])
+        return acc
+
+
+class RunningStats:
+    # Updated with every recorded sample and snapshotted to <run>.stats.json,
+    # so reports and the dashboard read summary statistics without scanning
+    # the run. A resumed run continues from the snapshot.
+    def __init__(
+        self,
+        store_path: str,
+        logger: Logger,
+        window: int = DEFAULT_WINDOW,
+        flush_seconds: float = SNAPSHOT_SECONDS,
+    ):
+        self.logger = logger
+        self.window = max(1, window)
+        self.flush_seconds = flush_seconds
+        self.path = stats_path(store_path)
+        self.samples = 0
+        self.start_ts = None
+        self.end_ts = None
+        self.pairs: Dict[str, PairAccumulator] = {}
+        self._written: Optional[float] = None
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except ValueError as err:
+            self.logger.warning(f"Ignoring unreadable stats snapshot\n{err}")
+            return
+        if data.get("window") != self.window:
+            self.logger.warning(
+                f"Stats snapshot window {data.get('window')} != {self.window}; starting over"
+            )
+            return
+        self.samples = data["samples"]
+        self.start_ts = data["start_ts"]
+        self.end_ts = data["end_ts"]
+        self.pairs = {
+            pair: PairAccumulator.from_dict(acc, self.window)
+            for pair, acc in data["pairs"].items()
+        }
+
+    def _write(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "window": self.window,
+                    "samples": self.samples,
+                    "start_ts": self.start_ts,
+                    "end_ts": self.end_ts,
+                    "pairs": {p: acc.to_dict() for p, acc in self.pairs.items()},
+                },
+                f,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_path, self.path)
+        self._written = time.monotonic()
+        self._dirty = False
+
+    def update(self, timestamp: datetime, prices: dict):
+        ts = timestamp.isoformat()
+        self.samples += 1
+        if self.start_ts is None:
+            self.start_ts = ts
+        self.end_ts = ts
+        for pair, price in prices.items():
+            if price is None:
+                continue
+            acc = self.pairs.get(pair)
+            if acc is None:
+                acc = self.pairs[pair] = PairAccumulator(self.window)
+            acc.update(price)
+        self._dirty = True
+        if (
+            self._written is None
+            or time.monotonic() - self._written >= self.flush_seconds
+        ):
+            self._write()
+
+    def close(self):
+        if self._dirty:
+            self._write()
+
+    def snapshot(self) -> RunStats:
+        return RunStats(
+            self.samples,
+            self.start_ts,
+            self.end_ts,
+            pairs={pair: acc.stats(pair) for pair, acc in self.pairs.items()},
+        )
+
+
+def load_run_stats(store_path: str) -> Optional[RunStats]:
+    path = stats_path(store_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except ValueError:
+        return None
+    return RunStats(
+        data["samples"],
+        data["start_ts"],
+        data["end_ts"],
+        pairs={
+            pair: PairAccumulator.from_dict(acc, data["window"]).stats(pair)
+            for pair, acc in data["pairs"].items()
+        },
+    )
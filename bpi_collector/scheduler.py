@@ -0,0 +1,187 @@
+import time
+import math
+import statistics
+import numpy as np
+
+from logging import Logger
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Tuple
+
+MISSED_TICK_POLICIES = ["skip", "catchup"]
+
+
+@dataclass
+class Tick:
+    index: int
+    # monotonic time the tick was due and how late it actually started
+    scheduled: float
+    lag: float
+    skipped: int = 0
+    # wall-clock time (epoch seconds) the tick was due; what samples are stamped with
+    wall: float = 0.0
+
+
+class DeadlineScheduler:
+    # Ticks are due at start + k * interval on the monotonic clock, so time
+    # spent fetching and writing never pushes later ticks back. With align the
+    # first tick waits for the next wall-clock multiple of the interval (e.g.
+    # :00 of every minute for 60s). A tick that starts a whole interval late or
+    # more has missed at least one slot: "skip" drops the missed slots and
+    # keeps the phase, "catchup" runs them back to back. start_at pins the
+    # first tick to a wall-clock time so separate processes tick together.
+    def __init__(
+        self,
+        interval_seconds: float,
+        logger: Logger,
+        align: bool = True,
+        policy: str = "skip",
+        start_at: Optional[float] = None,
+    ):
+        if policy not in MISSED_TICK_POLICIES:
+            raise ValueError(
+                f"Unknown missed tick policy {policy!r}; expected one of {MISSED_TICK_POLICIES}"
+            )
+        self.interval = interval_seconds
+        self.logger = logger
+        self.align = align
+        self.policy = policy
+        self.start_at = start_at
+        self.ticks: List[Tick] = []
+        self.skipped = 0
+        self._next: Optional[float] = None
+        self._origin: Tuple[float, float] = (0.0, 0.0)
+
+    def _first_deadline(self) -> Tuple[float, float]:
+        # (monotonic, wall-clock) time of the first tick
+        now = time.monotonic()
+        wall = time.time()
+        if self.start_at is not None:
+            delay = max(0.0, self.start_at - wall)
+            return now + delay, wall + delay
+        if not self.align or self.interval <= 0:
+            return now, wall
+        first = math.ceil(wall / self.interval) * self.interval
+        return now + (first - wall), first
+
+    def wait(self) -> Tick:
+        if self._next is None:
+            self._origin = self._first_deadline()
+            self._next = self._origin[0]
+
+        now = time.monotonic()
+        if now < self._next:
+            time.sleep(self._next - now)
+            now = time.monotonic()
+
+        skipped = 0
+        lag = now - self._next
+        if self.policy == "skip" and self.interval > 0 and lag >= self.interval:
+            skipped = int(lag // self.interval)
+            self._next += skipped * self.interval
+            lag = now - self._next
+            self.skipped += skipped
+            self.logger.warning(f"Skipped {skipped} missed tick(s)")
+
+        tick = Tick(
+            index=len(self.ticks),
+            scheduled=self._next,
+            lag=lag,
+            skipped=skipped,
+            wall=self._origin[1] + (self._next - self._origin[0]),
+        )
+        self.ticks.append(tick)
+        self._next += self.interval
+        return tick
+
+    def set_interval(self, interval_seconds: float):
+        # Applies from the next tick: its deadline is re-based on the last one.
+        if self._next is not None:
+            self._next += interval_seconds - self.interval
+        self.interval = interval_seconds
+
+    def summary(self) -> Dict[str, float]:
+        lags = [t.lag * 1000 for t in self.ticks]
+        if not lags:
+            return {"ticks": 0, "skipped": self.skipped}
+        return {
+            "ticks": len(lags),
+            "skipped": self.skipped,
+            "mean_lag_ms": round(statistics.fmean(lags), 1),
+            "max_lag_ms": round(max(lags), 1),
+            "jitter_ms": round(statistics.pstdev(lags), 1),
+        }
+
+
+class AdaptiveInterval:
+    # Chooses the next tick interval from recent price action. Log returns are
+    # scaled to the base interval (r * sqrt(base / dt)) so the thresholds mean
+    # the same thing whatever the current interval is. When the largest move
+    # or the rolling volatility of any pair crosses its threshold the interval
+    # halves; once both are under half their threshold it grows by half again.
+    # The floor is min_seconds or whatever keeps requests_per_hour, if tighter.
+    def __init__(
+        self,
+        base_seconds: float,
+        logger: Logger,
+        min_seconds: Optional[float] = None,
+        max_seconds: Optional[float] = None,
+        move_threshold: float = 0.002,
+        vol_threshold: float = 0.001,
+        window: int = 20,
+        requests_per_tick: int = 1,
+        requests_per_hour: Optional[int] = None,
+    ):
+        self.base = base_seconds
+        self.logger = logger
+        self.floor = min_seconds if min_seconds is not None else base_seconds / 4
+        if requests_per_hour:
+            self.floor = max(self.floor, 3600 * requests_per_tick / requests_per_hour)
+        self.ceiling = max(
+            self.floor, max_seconds if max_seconds is not None else base_seconds * 4
+        )
+        self.move_threshold = move_threshold
+        self.vol_threshold = vol_threshold
+        self.window = window
+        self.interval = min(max(base_seconds, self.floor), self.ceiling)
+        self._returns: Dict[str, deque] = {}
+        self._last: Dict[str, float] = {}
+        self._last_at: Optional[float] = None
+
+    def _measure(self, prices: Dict[str, float], dt: float):
+        pairs = [p for p in prices if self._last.get(p, 0) > 0 and (prices[p] or 0) > 0]
+        if not pairs or dt <= 0:
+            return None
+        current = np.array([prices[p] for p in pairs], dtype=np.float64)
+        previous = np.array([self._last[p] for p in pairs], dtype=np.float64)
+        returns = np.log(current / previous) * math.sqrt(self.base / dt)
+        vol = 0.0
+        for pair, r in zip(pairs, returns.tolist()):
+            window = self._returns.setdefault(pair, deque(maxlen=self.window))
+            window.append(r)
+            if len(window) >= 2:
+                vol = max(vol, float(np.std(window)))
+        return float(np.max(np.abs(returns))), vol
+
+    def observe(self, prices: Dict[str, float], now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        measured = None
+        if self._last_at is not None:
+            measured = self._measure(prices, now - self._last_at)
+        self._last.update({p: v for p, v in prices.items() if v is not None})
+        self._last_at = now
+        if measured is None:
+            return self.interval
+
+        move, vol = measured
+        previous = self.interval
+        if move >= self.move_threshold or vol >= self.vol_threshold:
+            self.interval = max(self.floor, self.interval / 2)
+        elif move < self.move_threshold / 2 and vol < self.vol_threshold / 2:
+            self.interval = min(self.ceiling, self.interval * 1.5)
+        if self.interval != previous:
+            self.logger.info(
+                f"Interval {previous:g}s -> {self.interval:g}s "
+                f"(move={move:.5f} vol={vol:.5f})"
+            )
+        return self.interval
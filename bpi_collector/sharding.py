@@ -0,0 +1,323 @@
+import os
+import json
+import math
+import time
+import queue
+import multiprocessing
+
+from logging import Logger
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from .config import Config
+from .storage import Storage
+from .logger import BusinessLogicLogger
+from .collector import BPICollector
+from .storage_backends.columns import iso_to_epoch_ns, epoch_ns_to_iso
+
+# Spawned workers re-import the package and numpy before their first tick.
+SPAWN_GRACE_SECONDS = 3.0
+POLL_SECONDS = 0.25
+
+
+def split_pairs(pairs: List[str], shards: int) -> List[List[str]]:
+    # Round-robin so every shard gets a similar number of pairs.
+    shards = max(1, min(shards, len(pairs)))
+    return [pairs[i::shards] for i in range(shards)]
+
+
+def shard_path(store_path: str, shard: int) -> str:
+    stem, ext = os.path.splitext(store_path)
+    return f"{stem}.shard{shard}{ext}"
+
+
+def shard_health_path(store_path: str) -> str:
+    return f"{os.path.splitext(store_path)[0]}.shards.json"
+
+
+def load_shard_health(store_path: str) -> Optional[Dict[str, Any]]:
+    path = shard_health_path(store_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ShardCollector(BPICollector):
+    # Collects one shard's pairs into its own segment and reports every tick
+    # to the coordinator over the health queue.
+    def __init__(self, config: Config, logger: Logger, shard: int, health):
+        super().__init__(config, logger)
+        self.shard = shard
+        self.health = health
+        self.ticks = 0
+        self.missing_total = 0
+
+    def report(self, status: str, **fields):
+        self.health.put(
+            {
+                "shard": self.shard,
+                "pid": os.getpid(),
+                "status": status,
+                "ticks": self.ticks,
+                "missing_total": self.missing_total,
+                "updated": datetime.now(timezone.utc).isoformat(),
+                **fields,
+            }
+        )
+
+    def run_once(self, scheduled: Optional[datetime] = None) -> dict:
+        started = time.monotonic()
+        try:
+            prices = super().run_once(scheduled)
+        except Exception as e:
+            self.report("error", error=str(e))
+            raise
+        missing = len(self.config.currencies) - len(prices)
+        self.ticks += 1
+        self.missing_total += missing
+        self.report(
+            "running",
+            fetched=len(prices),
+            missing=missing,
+            elapsed_ms=round((time.monotonic() - started) * 1000, 1),
+        )
+        return prices
+
+
+def run_shard(config: Config, shard: int, health):
+    logger = BusinessLogicLogger(f"bpi_collector.shard{shard}").logger
+    logger.propagate = False
+    collector = ShardCollector(config, logger, shard, health)
+    collector.report("starting")
+    try:
+        collector.collect()
+    except BaseException as e:
+        collector.report("failed", error=repr(e))
+        raise
+    collector.report("done")
+
+
+class ShardMerger:
+    # Shards tick on the same wall-clock slots (start_at + k * interval), so a
+    # sample's slot is derived from its timestamp. A slot is written once every
+    # running shard has moved on to it or past it, or once it is overdue,
+    # which keeps a stalled shard from holding up the merged run.
+    def __init__(self, shards: int, start_at: float, interval: float, grace: float):
+        self.start_at = start_at
+        self.interval = interval
+        self.grace = grace
+        self.buckets: Dict[int, Dict[str, Any]] = {}
+        self.watermarks = [-1] * shards
+        self.counts = [0] * shards
+        self.emitted = -1
+        self.late = 0
+
+    def _slot(self, shard: int, sample: Dict[str, Any], ts_ns: int) -> int:
+        if self.interval <= 0:
+            return self.counts[shard]
+        if sample.get("scheduled"):
+            # The tick the sample was taken for is on the slot grid up to
+            # float/microsecond rounding.
+            scheduled = iso_to_epoch_ns(sample["scheduled"]) / 1e9
+            return round((scheduled - self.start_at) / self.interval)
+        # Otherwise the observation time, which lands after its tick.
+        return math.floor((ts_ns / 1e9 - self.start_at) / self.interval)
+
+    def add(self, shard: int, sample: Dict[str, Any]):
+        ts_ns = iso_to_epoch_ns(sample["ts"])
+        slot = self._slot(shard, sample, ts_ns)
+        self.counts[shard] += 1
+        if slot <= self.emitted:
+            # Already written; fold into the next open slot rather than drop it.
+            self.late += 1
+            slot = self.emitted + 1
+        bucket = self.buckets.setdefault(slot, {"ts": ts_ns, "prices": {}})
+        bucket["ts"] = min(bucket["ts"], ts_ns)
+        bucket["prices"].update(sample.get("prices") or {})
+        self.watermarks[shard] = max(self.watermarks[shard], slot)
+
+    def ready(
+        self, finished: Set[int], now: float, final: bool = False
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        live = [w for i, w in enumerate(self.watermarks) if i not in finished]
+        complete = min(live) if live else max(self.buckets, default=-1)
+        out = []
+        for slot in sorted(self.buckets):
+            overdue = (
+                self.interval > 0
+                and now >= self.start_at + (slot + 1) * self.interval + self.grace
+            )
+            if not (final or slot <= complete or overdue):
+                break
+            out.append((slot, self.buckets.pop(slot)))
+            self.emitted = slot
+        return out
+
+
+class ShardedCollector(BPICollector):
+    # Coordinator: splits currencies across worker processes that each run the
+    # normal collection loop into their own segment (<stem>.shard<N><ext>),
+    # tails those segments and merges them slot by slot into config.store_path
+    # so graphing, rollups, the live ring and reporting see one logical run.
+    # Per-shard health is logged and kept in <stem>.shards.json.
+    supports_adaptive = False
+
+    def __init__(self, config: Config, logger: Logger):
+        super().__init__(config, logger)
+        pairs = list(config.currencies or ["BTC-USD"])
+        self.shard_pairs = split_pairs(pairs, config.shards)
+        self.health: Dict[int, Dict[str, Any]] = {
+            i: {"shard": i, "pairs": len(p), "status": "pending", "ticks": 0}
+            for i, p in enumerate(self.shard_pairs)
+        }
+
+    def _shard_config(self, shard: int, start_at: float) -> Config:
+        # Shards commit every sample so the coordinator sees it on its next
+        # poll; batching, rollups and derived pairs (whose legs may sit in
+        # different shards) apply to the merged run only.
+        return replace(
+            self.config,
+            currencies=self.shard_pairs[shard],
+            store_path=shard_path(self.config.store_path, shard),
+            start_at=start_at,
+            storage_batch_size=1,
+            storage_flush_ms=0,
+            rollup_resolutions=[],
+            running_stats=False,
+            shm_ring_name=None,
+            live_graph_every=0,
+            render_cache_dir=None,
+            derived_pairs=None,
+            adaptive_interval=False,
+            shards=1,
+        )
+
+    def _write_health(self):
+        path = shard_health_path(self.config.store_path)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"shards": list(self.health.values())}, f)
+        os.replace(tmp_path, path)
+
+    def _drain_health(self, health, timeout: float) -> bool:
+        changed = False
+        try:
+            while True:
+                report = health.get(timeout=timeout)
+                timeout = 0
+                state = self.health[report["shard"]]
+                if report["status"] != state["status"]:
+                    self.logger.info(
+                        f"Shard {report['shard']} {state['status']} -> {report['status']}"
+                    )
+                if report.get("missing"):
+                    self.logger.warning(
+                        f"Shard {report['shard']} missing {report['missing']} price(s)"
+                    )
+                state.update(report)
+                changed = True
+        except queue.Empty:
+            pass
+        return changed
+
+    def _check_exits(self, processes) -> Set[int]:
+        finished = set()
+        for i, process in enumerate(processes):
+            if process.is_alive():
+                continue
+            finished.add(i)
+            state = self.health[i]
+            if "exitcode" in state:
+                continue
+            state["exitcode"] = process.exitcode
+            # A clean exit's final report may still be in the queue.
+            if process.exitcode != 0:
+                state["status"] = "failed"
+                self.logger.error(f"Shard {i} exited with code {process.exitcode}")
+        return finished
+
+    def _merge(self, merger: ShardMerger, readers, finished, final=False):
+        for i, reader in enumerate(readers):
+            for sample in reader.read_new():
+                merger.add(i, sample)
+        for slot, bucket in merger.ready(finished, time.time(), final):
+            now = datetime.fromisoformat(epoch_ns_to_iso(bucket["ts"]))
+            self.record(now, bucket["prices"])
+            self.logger.info(
+                f"Merged slot {slot} pairs={len(bucket['prices'])} "
+                f"from {len(self.shard_pairs)} shards"
+            )
+
+    def collect(self) -> list:
+        interval = self.config.interval_seconds
+        start_at = time.time() + SPAWN_GRACE_SECONDS
+        if self.config.align_ticks and interval > 0:
+            start_at = math.ceil(start_at / interval) * interval
+        self.logger.info(
+            f"Starting {len(self.shard_pairs)} shards "
+            + ", ".join(f"{i}:{len(p)} pairs" for i, p in enumerate(self.shard_pairs))
+        )
+
+        ctx = multiprocessing.get_context("spawn")
+        health = ctx.Queue()
+        processes = [
+            ctx.Process(
+                target=run_shard,
+                args=(self._shard_config(i, start_at), i, health),
+                name=f"bpi-shard-{i}",
+            )
+            for i in range(len(self.shard_pairs))
+        ]
+        readers = [
+            Storage(
+                shard_path(self.config.store_path, i),
+                self.logger,
+                self.config.storage_format,
+            ).tail_reader()
+            for i in range(len(processes))
+        ]
+        merger = ShardMerger(
+            len(processes),
+            start_at,
+            interval,
+            grace=POLL_SECONDS * 2 + self.config.fetch_timeout_seconds,
+        )
+        # Only processes that actually started can be terminated and joined; a
+        # failed start() must surface its own error, not join()'s.
+        started = []
+        try:
+            for process in processes:
+                process.start()
+                started.append(process)
+            exited = 0
+            while True:
+                changed = self._drain_health(health, POLL_SECONDS)
+                finished = self._check_exits(processes)
+                if changed or len(finished) != exited:
+                    exited = len(finished)
+                    self._write_health()
+                if len(finished) == len(processes):
+                    self._drain_health(health, 0)
+                    self._merge(merger, readers, finished, final=True)
+                    break
+                self._merge(merger, readers, finished)
+        finally:
+            for process in started:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+            self._write_health()
+            self.close()
+
+        if merger.late:
+            self.logger.warning(f"{merger.late} late shard sample(s) merged forward")
+        self.logger.info(
+            "Shard stats "
+            + ", ".join(
+                f"{s['shard']}:{s['status']} ticks={s['ticks']} missing={s.get('missing_total', 0)}"
+                for s in self.health.values()
+            )
+        )
+        return self.storage.read_samples()
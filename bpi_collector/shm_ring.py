@@ -0,0 +1,340 @@
+import os
+import sys
+import json
+import time
+import numpy as np
+
+from logging import Logger
+from datetime import datetime
+from dataclasses import dataclass
+from multiprocessing import shared_memory, resource_tracker
+from typing import List, Dict, Any, Optional, Tuple
+
+from .storage_backends.columns import datetime_to_epoch_ns, epoch_ns_to_iso
+
+MAGIC = 0x42504952  # "BPIR"
+HEADER_SLOTS = 8
+NAME_BYTES = 32
+RUN_NAME_BYTES = 256
+# extra_len value for a sample the ring could not hold in full (a pair past
+# max_pairs, or extra fields past extra_bytes); readers go to disk for it.
+INCOMPLETE = -1
+# A reader that keeps landing on a write in progress backs off this long
+# between attempts, and gives up after `retries` of them.
+RETRY_SLEEP = 0.0005
+
+# header slots
+H_MAGIC, H_SEQ, H_TOTAL, H_CAPACITY, H_MAX_PAIRS, H_PAIRS, H_EXTRA_BYTES = range(7)
+
+
+def _layout(
+    capacity: int, max_pairs: int, extra_bytes: int
+) -> Dict[str, Tuple[int, int]]:
+    # (offset, nbytes) of each region; everything stays 8-byte aligned.
+    regions = {}
+    offset = 0
+    for name, nbytes in (
+        ("header", HEADER_SLOTS * 8),
+        ("run", RUN_NAME_BYTES),
+        ("names", max_pairs * NAME_BYTES),
+        # the last `capacity` observations of each pair
+        ("pair_count", max_pairs * 8),
+        ("pair_ts", max_pairs * capacity * 8),
+        ("pair_price", max_pairs * capacity * 8),
+        ("pair_index", max_pairs * capacity * 8),
+        # the last `capacity` samples: which pairs they had, and their extras
+        ("sample_ts", capacity * 8),
+        ("extra_len", capacity * 8),
+        ("sample_pairs", capacity * max_pairs),
+        ("extra", capacity * extra_bytes),
+    ):
+        regions[name] = (offset, nbytes)
+        offset += -(-nbytes // 8) * 8
+    regions["size"] = (offset, 0)
+    return regions
+
+
+class _RingViews:
+    def __init__(
+        self,
+        shm: shared_memory.SharedMemory,
+        capacity: int,
+        max_pairs: int,
+        extra_bytes: int,
+    ):
+        layout = _layout(capacity, max_pairs, extra_bytes)
+        buf = shm.buf
+
+        def view(name, shape, dtype):
+            return np.ndarray(shape, dtype, buf, layout[name][0])
+
+        self.header = view("header", (HEADER_SLOTS,), np.int64)
+        self.run = view("run", (RUN_NAME_BYTES,), np.uint8)
+        self.names = view("names", (max_pairs, NAME_BYTES), np.uint8)
+        self.pair_count = view("pair_count", (max_pairs,), np.int64)
+        self.pair_ts = view("pair_ts", (max_pairs, capacity), np.int64)
+        self.pair_price = view("pair_price", (max_pairs, capacity), np.float64)
+        self.pair_index = view("pair_index", (max_pairs, capacity), np.int64)
+        self.sample_ts = view("sample_ts", (capacity,), np.int64)
+        self.extra_len = view("extra_len", (capacity,), np.int64)
+        self.sample_pairs = view("sample_pairs", (capacity, max_pairs), np.uint8)
+        self.extra = view("extra", (capacity, extra_bytes), np.uint8)
+
+
+@dataclass
+class RingSnapshot:
+    run: str
+    # samples published so far in this run
+    total: int
+    # the most recent samples, oldest first, shaped like the run file's
+    samples: List[Dict[str, Any]]
+    # the last `capacity` (ts, price) observations of each pair; a window
+    # shorter than that holds every observation of the pair in the run
+    windows: Dict[str, List[Tuple[str, Optional[float]]]]
+    capacity: int
+
+
+def _encode(text: str, size: int) -> np.ndarray:
+    raw = text.encode("utf-8")[:size]
+    out = np.zeros(size, dtype=np.uint8)
+    out[: len(raw)] = np.frombuffer(raw, dtype=np.uint8)
+    return out
+
+
+def _decode(raw: np.ndarray) -> str:
+    return bytes(raw).rstrip(b"\0").decode("utf-8", errors="replace")
+
+
+def _retire(shm: shared_memory.SharedMemory):
+    # Clear the magic so readers still mapping this segment let go of it and
+    # pick up the next run's segment.
+    header = np.ndarray((HEADER_SLOTS,), np.int64, shm.buf, 0)
+    header[H_MAGIC] = 0
+    del header
+    shm.close()
+
+
+class SampleRingWriter:
+    # Fixed-size windows of the most recent observations of each pair in
+    # shared memory, so a pair sampled often (the async engine records one
+    # pair per sample) cannot push a slower pair's history out. The last
+    # `capacity` samples are kept too, with their extra fields, so readers can
+    # rebuild them exactly as the run file has them. A seqlock guards each
+    # write: the sequence counter is odd while a sample is being written and
+    # even otherwise, so readers never need a lock.
+    def __init__(
+        self,
+        name: str,
+        logger: Logger,
+        run_name: str = "",
+        capacity: int = 1024,
+        max_pairs: int = 64,
+        extra_bytes: int = 1024,
+    ):
+        self.name = name
+        self.logger = logger
+        self.capacity = capacity
+        self.max_pairs = max_pairs
+        self.extra_bytes = extra_bytes
+        size = _layout(capacity, max_pairs, extra_bytes)["size"][0]
+
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a collector that did not shut down cleanly.
+            stale = shared_memory.SharedMemory(name=name)
+            _retire(stale)
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        self.views = _RingViews(self.shm, capacity, max_pairs, extra_bytes)
+        self.views.header[:] = 0
+        self.views.header[H_CAPACITY] = capacity
+        self.views.header[H_MAX_PAIRS] = max_pairs
+        self.views.header[H_EXTRA_BYTES] = extra_bytes
+        self.views.pair_count[:] = 0
+        self.views.run[:] = _encode(run_name, RUN_NAME_BYTES)
+        self.views.header[H_MAGIC] = MAGIC
+        self._slots: Dict[str, int] = {}
+        self.logger.info(f"Publishing live samples to shared memory {name}")
+
+    def _slot(self, pair: str) -> Optional[int]:
+        slot = self._slots.get(pair)
+        if slot is None:
+            if len(self._slots) >= self.max_pairs:
+                self.logger.warning(
+                    f"Shared memory ring is full; not publishing {pair}"
+                )
+                return None
+            slot = len(self._slots)
+            self.views.names[slot] = _encode(pair, NAME_BYTES)
+            self._slots[pair] = slot
+        return slot
+
+    def publish(self, timestamp: datetime, prices: dict, extra: Optional[dict] = None):
+        views = self.views
+        header = views.header
+        index = int(header[H_TOTAL])
+        row = index % self.capacity
+        ts = datetime_to_epoch_ns(timestamp)
+        encoded = json.dumps(extra).encode("utf-8") if extra else b""
+        complete = len(encoded) <= self.extra_bytes
+
+        header[H_SEQ] += 1
+        views.sample_ts[row] = ts
+        views.sample_pairs[row] = 0
+        for pair, price in prices.items():
+            slot = self._slot(pair)
+            if slot is None:
+                complete = False
+                continue
+            count = int(views.pair_count[slot])
+            col = count % self.capacity
+            views.pair_ts[slot, col] = ts
+            views.pair_price[slot, col] = np.nan if price is None else price
+            views.pair_index[slot, col] = index
+            views.pair_count[slot] = count + 1
+            views.sample_pairs[row, slot] = 1
+        if complete:
+            views.extra[row, : len(encoded)] = np.frombuffer(encoded, np.uint8)
+            views.extra_len[row] = len(encoded)
+        else:
+            views.extra_len[row] = INCOMPLETE
+        header[H_PAIRS] = len(self._slots)
+        header[H_TOTAL] += 1
+        header[H_SEQ] += 1
+
+    def close(self):
+        self.views = None
+        _retire(self.shm)
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _open_untracked(name: str) -> shared_memory.SharedMemory:
+    # The collector owns the segment, so this process's resource tracker must
+    # not unlink it when the dashboard exits. Python 3.13 can open it
+    # untracked; before that, opening registers it on POSIX under the
+    # "/"-prefixed name the tracker uses, which shm.name leaves off.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    if os.name == "posix":
+        resource_tracker.unregister("/" + shm.name.lstrip("/"), "shared_memory")
+    return shm
+
+
+def _value(price: float) -> Optional[float]:
+    return None if price != price else float(price)
+
+
+class SampleRingReader:
+    def __init__(self, name: str, logger: Logger):
+        self.name = name
+        self.logger = logger
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self.views: Optional[_RingViews] = None
+
+    def _attach(self) -> bool:
+        if self.shm is not None:
+            return True
+        try:
+            shm = _open_untracked(self.name)
+        except FileNotFoundError:
+            return False
+
+        header = np.ndarray((HEADER_SLOTS,), np.int64, shm.buf, 0)
+        if int(header[H_MAGIC]) != MAGIC:
+            del header
+            shm.close()
+            return False
+        capacity = int(header[H_CAPACITY])
+        max_pairs = int(header[H_MAX_PAIRS])
+        extra_bytes = int(header[H_EXTRA_BYTES])
+        del header
+        self.shm = shm
+        self.views = _RingViews(shm, capacity, max_pairs, extra_bytes)
+        return True
+
+    def detach(self):
+        if self.shm is not None:
+            self.views = None
+            self.shm.close()
+            self.shm = None
+
+    def _copy(self, retries: int) -> Optional[Dict[str, Any]]:
+        views = self.views
+        header = views.header
+        for attempt in range(retries):
+            if attempt:
+                time.sleep(RETRY_SLEEP)
+            seq = int(header[H_SEQ])
+            if seq % 2:
+                continue
+            n_pairs = int(header[H_PAIRS])
+            copy = {
+                "total": int(header[H_TOTAL]),
+                "capacity": int(header[H_CAPACITY]),
+                "run": views.run.copy(),
+                "names": views.names[:n_pairs].copy(),
+                "pair_count": views.pair_count[:n_pairs].copy(),
+                "pair_ts": views.pair_ts[:n_pairs].copy(),
+                "pair_price": views.pair_price[:n_pairs].copy(),
+                "pair_index": views.pair_index[:n_pairs].copy(),
+                "sample_ts": views.sample_ts.copy(),
+                "extra_len": views.extra_len.copy(),
+                "sample_pairs": views.sample_pairs[:, :n_pairs].copy(),
+                "extra": views.extra.copy(),
+            }
+            if int(header[H_SEQ]) == seq:
+                return copy
+        return None
+
+    def snapshot(self, retries: int = 50) -> Optional[RingSnapshot]:
+        # None when there is no ring, or the collector kept it mid-write for
+        # every attempt; callers fall back to the run file either way.
+        if not self._attach():
+            return None
+        if int(self.views.header[H_MAGIC]) != MAGIC:
+            self.detach()
+            if not self._attach():
+                return None
+
+        copy = self._copy(retries)
+        if copy is None:
+            return None
+        total, capacity = copy["total"], copy["capacity"]
+        pairs = [_decode(n) for n in copy["names"]]
+
+        windows = {}
+        observed = []
+        for slot, pair in enumerate(pairs):
+            count = int(copy["pair_count"][slot])
+            cols = [k % capacity for k in range(max(0, count - capacity), count)]
+            ts = copy["pair_ts"][slot, cols]
+            prices = copy["pair_price"][slot, cols]
+            windows[pair] = [
+                (epoch_ns_to_iso(int(t)), _value(p)) for t, p in zip(ts, prices)
+            ]
+            observed.append(dict(zip(copy["pair_index"][slot, cols].tolist(), prices)))
+
+        # Walk back from the newest sample while every pair it had is still
+        # in that pair's window, so the samples served are contiguous.
+        samples = []
+        for index in range(total - 1, max(0, total - capacity) - 1, -1):
+            row = index % capacity
+            length = int(copy["extra_len"][row])
+            slots = np.flatnonzero(copy["sample_pairs"][row])
+            if length == INCOMPLETE or any(index not in observed[s] for s in slots):
+                break
+            sample = {
+                "ts": epoch_ns_to_iso(int(copy["sample_ts"][row])),
+                "prices": {pairs[s]: _value(observed[s][index]) for s in slots},
+            }
+            if length:
+                sample.update(json.loads(bytes(copy["extra"][row, :length])))
+            samples.append(sample)
+        samples.reverse()
+        return RingSnapshot(_decode(copy["run"]), total, samples, windows, capacity)
@@ -0,0 +1,136 @@
+import numpy as np
+
+from dataclasses import dataclass, field, asdict
+from typing import List, Dict, Any, Optional, Union
+
+from .storage_backends.columns import SampleColumns, epoch_ns_to_iso
+
+
+@dataclass
+class PairStats:
+    pair: str
+    count: int
+    min: float
+    max: float
+    mean: float
+    std: float
+    first: float
+    last: float
+    # (last - first) / first * 100, 0 when the first price is 0
+    change_pct: float
+    # standard deviation of log returns between consecutive prices
+    volatility: float
+    # min/max over the last `window` prices; only tracked by RunningStats
+    window_min: Optional[float] = None
+    window_max: Optional[float] = None
+
+
+@dataclass
+class RunStats:
+    samples: int = 0
+    start_ts: Optional[str] = None
+    end_ts: Optional[str] = None
+    # first-seen order, pairs without any price are left out
+    pairs: Dict[str, PairStats] = field(default_factory=dict)
+
+    def get(self, pair: str) -> Optional[PairStats]:
+        return self.pairs.get(pair)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _price_matrix(samples: List[Dict[str, Any]]):
+    # One pass over the samples collecting (row, column, price) triplets, then
+    # a single scatter into a samples x pairs float64 matrix (NaN = missing).
+    index: Dict[str, int] = {}
+    rows, cols, values = [], [], []
+    for i, s in enumerate(samples):
+        for pair, price in (s.get("prices") or {}).items():
+            if price is None:
+                continue
+            col = index.get(pair)
+            if col is None:
+                col = index[pair] = len(index)
+            rows.append(i)
+            cols.append(col)
+            values.append(price)
+    matrix = np.full((len(samples), len(index)), np.nan)
+    matrix[rows, cols] = values
+    return list(index), matrix
+
+
+def _nanstd(values: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    # Population std per column ignoring NaN; 0 for columns with < 2 values.
+    safe = np.maximum(counts, 1)
+    mean = np.nansum(values, axis=0) / safe
+    var = np.nansum((values - mean) ** 2, axis=0) / safe
+    return np.where(counts > 1, np.sqrt(var), 0.0)
+
+
+def compute_stats(samples: Union[List[Dict[str, Any]], SampleColumns]) -> RunStats:
+    # min/max/mean/std/first/last/change/volatility for every pair at once;
+    # each statistic is one column-wise numpy reduction over the matrix.
+    if isinstance(samples, SampleColumns):
+        pairs = samples.pairs
+        matrix = (
+            np.column_stack([samples.prices[p] for p in pairs])
+            if pairs
+            else np.empty((len(samples), 0))
+        )
+        bounds = (
+            (epoch_ns_to_iso(int(samples.ts[0])), epoch_ns_to_iso(int(samples.ts[-1])))
+            if len(samples)
+            else (None, None)
+        )
+    else:
+        pairs, matrix = _price_matrix(samples)
+        bounds = (samples[0]["ts"], samples[-1]["ts"]) if samples else (None, None)
+
+    n = len(matrix)
+    valid = ~np.isnan(matrix)
+    counts = valid.sum(axis=0)
+    keep = counts > 0
+    pairs = [pair for pair, k in zip(pairs, keep.tolist()) if k]
+    matrix, valid, counts = matrix[:, keep], valid[:, keep], counts[keep]
+    if not pairs:
+        return RunStats(n, *bounds)
+
+    columns = np.arange(len(pairs))
+    mins = np.nanmin(matrix, axis=0)
+    maxs = np.nanmax(matrix, axis=0)
+    means = np.nansum(matrix, axis=0) / counts
+    stds = _nanstd(matrix, counts)
+    firsts = matrix[valid.argmax(axis=0), columns]
+    lasts = matrix[n - 1 - valid[::-1].argmax(axis=0), columns]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        changes = np.where(firsts != 0, (lasts - firsts) / firsts * 100, 0.0)
+
+        # Forward-fill so each price's return is taken against the pair's
+        # previous price even when samples in between miss the pair.
+        last_seen = np.where(valid, np.arange(n)[:, None], 0)
+        np.maximum.accumulate(last_seen, axis=0, out=last_seen)
+        filled = matrix[last_seen, columns]
+        returns = np.log(filled[1:] / filled[:-1])
+    returns[~valid[1:] | ~np.isfinite(returns)] = np.nan
+    volatility = _nanstd(returns, (~np.isnan(returns)).sum(axis=0))
+
+    return RunStats(
+        n,
+        *bounds,
+        pairs={
+            pair: PairStats(pair, *values)
+            for pair, *values in zip(
+                pairs,
+                counts.tolist(),
+                mins.tolist(),
+                maxs.tolist(),
+                means.tolist(),
+                stds.tolist(),
+                firsts.tolist(),
+                lasts.tolist(),
+                changes.tolist(),
+                volatility.tolist(),
+            )
+        },
+    )
@@ -1,37 +1,137 @@
-import os
-import json
+import time
+import atexit
+import threading
 
 from logging import Logger
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Union
+
+from .storage_backends import (
+    DURABILITY_LEVELS,
+    SampleColumns,
+    get_backend,
+    storage_format_for_path,
+)
+from .storage_backends.columns import iso_to_epoch_ns
 
 
 class Storage:
-    def __init__(self, path: str, logger: Logger):
+    def __init__(
+        self,
+        path: str,
+        logger: Logger,
+        storage_format: Optional[str] = None,
+        batch_size: int = 1,
+        flush_interval_ms: int = 0,
+        durability: str = "flush",
+    ):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(
+                f"Unknown durability {durability!r}; expected one of {DURABILITY_LEVELS}"
+            )
         self.path = path
         self.logger = logger
+        self.storage_format = storage_format or storage_format_for_path(path)
+        self.backend = get_backend(self.storage_format)(
+            path, logger, durability=durability
+        )
+
+        # Group commit: samples are buffered and handed to the backend together
+        # once batch_size of them are pending or flush_interval_ms has passed
+        # since the first one arrived.
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_ms = flush_interval_ms
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._batching = self.batch_size > 1 or self.flush_interval_ms > 0
+        if self._batching:
+            atexit.register(self.flush)
 
-    def append_sample(self, timestamp: datetime, prices: dict):
+    def append_sample(
+        self, timestamp: datetime, prices: dict, extra: Optional[dict] = None
+    ):
         entry = {"ts": timestamp.isoformat(), "prices": prices}
-        data = []
-        if os.path.exists(self.path):
-            try:
-                with open(self.path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-            except Exception as err:
-                self.logger.error(
-                    f"Failed to read existing storage file; starting fresh\n{err}"
-                )
-                data = []
+        if extra:
+            entry.update(extra)
+        if self._batching:
+            self.logger.info(f"Buffered sample {entry}")
+        with self._lock:
+            self._pending.append(entry)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+            elif self.flush_interval_ms > 0 and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval_ms / 1000, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
 
-        data.append(entry)
-        with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            started = time.monotonic()
+            self.backend.append_many(pending)
+            if not self._batching:
+                self.logger.info(f"Appended sample {pending[0]}")
+            else:
+                self.logger.info(
+                    f"Committed {len(pending)} samples in {(time.monotonic() - started) * 1000:.1f}ms"
+                )
 
-        self.logger.info(f"Appended sample {entry}")
+    def iter_samples(self) -> Iterator[Dict[str, Any]]:
+        self.flush()
+        return self.backend.iter_samples()
 
     def read_all(self) -> List[Dict[str, Any]]:
-        if not os.path.exists(self.path):
-            return []
-        with open(self.path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        self.flush()
+        return self.backend.read_all()
+
+    @property
+    def columnar(self) -> bool:
+        return hasattr(self.backend, "read_columns")
+
+    def read_samples(self) -> Union[List[Dict[str, Any]], SampleColumns]:
+        # Columnar runs come back as their memory-mapped columns, which graphing
+        # and stats use directly; every other format as a list of dicts.
+        if self.columnar:
+            return self.read_columns()
+        return self.read_all()
+
+    def tail_reader(self):
+        return self.backend.tail_reader()
+
+    def read_columns(self) -> SampleColumns:
+        self.flush()
+        if self.columnar:
+            return self.backend.read_columns()
+        return SampleColumns.from_samples(self.read_all())
+
+    def query_range(
+        self, pair: str, start: Optional[str] = None, end: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        self.flush()
+        if hasattr(self.backend, "query_range"):
+            return self.backend.query_range(pair, start, end)
+
+        start_ns = iso_to_epoch_ns(start) if start else None
+        end_ns = iso_to_epoch_ns(end) if end else None
+        result = []
+        for s in self.iter_samples():
+            price = (s.get("prices") or {}).get(pair)
+            if price is None:
+                continue
+            ts_ns = iso_to_epoch_ns(s["ts"])
+            if start_ns is not None and ts_ns < start_ns:
+                continue
+            if end_ns is not None and ts_ns > end_ns:
+                continue
+            result.append((s["ts"], price))
+        return result
+
+    def close(self):
+        self.flush()
+        self.backend.close()
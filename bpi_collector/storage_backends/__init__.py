@@ -0,0 +1,34 @@
+import os
+
+from .json_file import JsonFileBackend
+from .ndjson import NdjsonBackend
+from .columnar import ColumnarBackend
+from .columns import SampleColumns
+from .sqlite import SqliteBackend
+from .durability import DURABILITY_LEVELS
+
+BACKENDS = {
+    "json": JsonFileBackend,
+    "ndjson": NdjsonBackend,
+    "columnar": ColumnarBackend,
+    "sqlite": SqliteBackend,
+}
+
+STORAGE_FORMATS = list(BACKENDS)
+
+
+def get_backend(storage_format: str):
+    try:
+        return BACKENDS[storage_format]
+    except KeyError:
+        raise ValueError(
+            f"Unknown storage format {storage_format!r}; expected one of {STORAGE_FORMATS}"
+        )
+
+
+def storage_format_for_path(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    for name, backend in BACKENDS.items():
+        if backend.extension == ext:
+            return name
+    return "json"
@@ -0,0 +1,218 @@
+import os
+import re
+import json
+import struct
+import numpy as np
+
+from logging import Logger
+from typing import List, Dict, Any, Iterator, BinaryIO, Iterable
+
+from .columns import SampleColumns, iso_to_epoch_ns, sample_extra
+from .tail import ColumnarTailReader
+from .durability import close_handle, sync_handle
+
+TS_FILE = "ts.i64"
+META_FILE = "pairs.json"
+EXTRA_FILE = "extra.ndjson"
+TS_DTYPE = np.dtype("<i8")
+PRICE_DTYPE = np.dtype("<f8")
+NAN_BYTES = struct.pack("<d", float("nan"))
+
+
+def _column_file(pair: str, taken: Iterable[str]) -> str:
+    # Sanitizing can map different pairs ("BTC/USD", "BTC_USD") to one name,
+    # so later ones get a ~N suffix; pairs.json records which file is whose.
+    # Compared case-insensitively for case-insensitive filesystems.
+    taken = {name.lower() for name in taken}
+    stem = re.sub(r"[^A-Za-z0-9_.-]", "_", pair)
+    filename, n = f"{stem}.f64", 1
+    while filename.lower() in taken:
+        n += 1
+        filename = f"{stem}~{n}.f64"
+    return filename
+
+
+class ColumnarBackend:
+    # A run is a directory holding an int64 epoch-ns timestamp column plus one
+    # float64 column per pair (NaN = missing). Rows are committed by writing the
+    # timestamp last, so the ts column length is the authoritative row count.
+    extension = ".cols"
+
+    def __init__(self, path: str, logger: Logger, durability: str = "flush"):
+        self.path = path
+        self.logger = logger
+        self.durability = durability
+        self._columns: Dict[str, str] = {}
+        self._handles: Dict[str, BinaryIO] = {}
+        self._rows = 0
+        self._opened = False
+
+    def _load_meta(self) -> Dict[str, str]:
+        meta_path = os.path.join(self.path, META_FILE)
+        if not os.path.exists(meta_path):
+            return {}
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)["columns"]
+
+    def _write_meta(self):
+        meta_path = os.path.join(self.path, META_FILE)
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"columns": self._columns}, f)
+        os.replace(tmp_path, meta_path)
+
+    def _load_extra(self, rows: int) -> Dict[int, Dict[str, Any]]:
+        # Non-price fields live in a sparse sidecar, one {"row": n, ...} line per
+        # sample that has any. Lines past the committed row count are ignored.
+        extra_path = os.path.join(self.path, EXTRA_FILE)
+        if not os.path.exists(extra_path):
+            return {}
+        extra = {}
+        with open(extra_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    fields = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                row = fields.pop("row", None)
+                if isinstance(row, int) and row < rows:
+                    extra[row] = fields
+        return extra
+
+    def _row_count(self) -> int:
+        ts_path = os.path.join(self.path, TS_FILE)
+        if not os.path.exists(ts_path):
+            return 0
+        return os.path.getsize(ts_path) // TS_DTYPE.itemsize
+
+    def _open(self):
+        if self._opened:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        self._columns = self._load_meta()
+        self._rows = self._row_count()
+
+        # Trim anything written past the last committed row by a crashed writer.
+        expected = self._rows * PRICE_DTYPE.itemsize
+        ts_path = os.path.join(self.path, TS_FILE)
+        if os.path.exists(ts_path):
+            os.truncate(ts_path, self._rows * TS_DTYPE.itemsize)
+        for filename in self._columns.values():
+            col_path = os.path.join(self.path, filename)
+            size = os.path.getsize(col_path) if os.path.exists(col_path) else 0
+            if size > expected:
+                os.truncate(col_path, expected)
+                self.logger.warning(f"Trimmed partial row from {col_path}")
+            elif size < expected:
+                with open(col_path, "ab") as f:
+                    f.write(NAN_BYTES * ((expected - size) // PRICE_DTYPE.itemsize))
+
+        extra_path = os.path.join(self.path, EXTRA_FILE)
+        if os.path.exists(extra_path):
+            extra = self._load_extra(self._rows)
+            tmp_path = f"{extra_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for row, fields in sorted(extra.items()):
+                    f.write(json.dumps({"row": row, **fields}) + "\n")
+            os.replace(tmp_path, extra_path)
+        self._handles[EXTRA_FILE] = open(extra_path, "a", encoding="utf-8")
+
+        self._handles[TS_FILE] = open(ts_path, "ab")
+        for filename in self._columns.values():
+            self._handles[filename] = open(os.path.join(self.path, filename), "ab")
+        self._opened = True
+
+    def _add_column(self, pair: str):
+        filename = _column_file(pair, self._columns.values())
+        f = open(os.path.join(self.path, filename), "ab")
+        # A file of this name that pairs.json does not list was left by a
+        # writer that crashed before recording it; start it over.
+        f.truncate(0)
+        f.write(NAN_BYTES * self._rows)
+        self._handles[filename] = f
+        self._columns[pair] = filename
+        self._write_meta()
+
+    def append_many(self, entries: List[Dict[str, Any]]):
+        self._open()
+        for entry in entries:
+            for pair in entry.get("prices") or {}:
+                if pair not in self._columns:
+                    self._add_column(pair)
+
+        for pair, filename in self._columns.items():
+            values = [(e.get("prices") or {}).get(pair) for e in entries]
+            f = self._handles[filename]
+            f.write(
+                b"".join(
+                    NAN_BYTES if v is None else struct.pack("<d", v) for v in values
+                )
+            )
+            # Price columns must reach the OS before the timestamps commit the rows.
+            sync_handle(f, self.durability)
+
+        lines = []
+        for i, entry in enumerate(entries):
+            fields = sample_extra(entry)
+            if fields:
+                lines.append(json.dumps({"row": self._rows + i, **fields}) + "\n")
+        if lines:
+            extra = self._handles[EXTRA_FILE]
+            extra.write("".join(lines))
+            sync_handle(extra, self.durability)
+
+        ts = self._handles[TS_FILE]
+        ts.write(
+            b"".join(struct.pack("<q", iso_to_epoch_ns(e["ts"])) for e in entries)
+        )
+        sync_handle(ts, self.durability)
+        self._rows += len(entries)
+
+    def append(self, entry: Dict[str, Any]):
+        self.append_many([entry])
+
+    def _map(self, filename: str, dtype: np.dtype, rows: int) -> np.ndarray:
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        col_path = os.path.join(self.path, filename)
+        try:
+            available = os.path.getsize(col_path) // dtype.itemsize
+        except FileNotFoundError:
+            # listed in pairs.json before the writer created it
+            available = 0
+        if available < rows:
+            padded = np.full(rows, np.nan, dtype=dtype)
+            if available:
+                padded[:available] = np.memmap(
+                    col_path, dtype=dtype, mode="r", shape=(available,)
+                )
+            return padded
+        return np.memmap(col_path, dtype=dtype, mode="r", shape=(rows,))
+
+    def read_columns(self) -> SampleColumns:
+        if not os.path.isdir(self.path):
+            return SampleColumns(ts=np.empty(0, dtype=TS_DTYPE))
+
+        rows = self._row_count()
+        columns = self._load_meta()
+        ts = self._map(TS_FILE, TS_DTYPE, rows)
+        prices = {
+            pair: self._map(filename, PRICE_DTYPE, rows)
+            for pair, filename in columns.items()
+        }
+        return SampleColumns(ts=ts, prices=prices, extra=self._load_extra(rows))
+
+    def iter_samples(self) -> Iterator[Dict[str, Any]]:
+        return self.read_columns().iter_samples()
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        return list(self.iter_samples())
+
+    def tail_reader(self):
+        return ColumnarTailReader(self, self.logger)
+
+    def close(self):
+        for f in self._handles.values():
+            close_handle(f, self.durability)
+        self._handles = {}
+        self._opened = False
@@ -0,0 +1,155 @@
+import numpy as np
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone, timedelta
+from typing import List, Dict, Any, Iterator, Optional
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+SAMPLE_KEYS = ("ts", "prices")
+
+
+def datetime_to_epoch_ns(dt: datetime) -> int:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1000
+
+
+def iso_to_epoch_ns(ts: str) -> int:
+    return datetime_to_epoch_ns(datetime.fromisoformat(ts.replace("Z", "+00:00")))
+
+
+def _naive_utc(ts: str) -> Optional[str]:
+    if ts.endswith("+00:00"):
+        return ts[:-6]
+    if ts.endswith("Z"):
+        return ts[:-1]
+    if len(ts) > 6 and ts[-6] in "+-" and ts[-3] == ":":
+        return None
+    return ts
+
+
+def iso_to_epoch_ns_array(values: List[str]) -> np.ndarray:
+    # numpy parses naive ISO-8601 in C, so UTC timestamps (everything this
+    # package writes) only need their suffix stripped; other offsets fall back
+    # to fromisoformat one by one.
+    naive = [_naive_utc(ts) for ts in values]
+    if None not in naive:
+        try:
+            return np.array(naive, dtype="datetime64[ns]").astype(np.int64)
+        except ValueError:
+            pass
+    return np.fromiter(
+        (iso_to_epoch_ns(ts) for ts in values), dtype=np.int64, count=len(values)
+    )
+
+
+def epoch_ns_to_iso(ns: int) -> str:
+    return (EPOCH + timedelta(microseconds=ns // 1000)).isoformat()
+
+
+def sample_extra(entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in entry.items() if k not in SAMPLE_KEYS}
+
+
+@dataclass
+class SampleColumns:
+    # ts holds epoch nanoseconds; each price column is float64 with NaN for
+    # "pair missing in this sample".
+    ts: np.ndarray
+    prices: Dict[str, np.ndarray] = field(default_factory=dict)
+    # Optional non-price fields (e.g. high/low, derived flags) keyed by row.
+    extra: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    @property
+    def pairs(self) -> List[str]:
+        return list(self.prices)
+
+    def valid(self, pair: str) -> np.ndarray:
+        return ~np.isnan(self.prices[pair])
+
+    def series(self, pair: str):
+        col = self.prices[pair]
+        mask = ~np.isnan(col)
+        return self.ts[mask], col[mask]
+
+    def row(self, i: int) -> Dict[str, Any]:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("sample index out of range")
+        prices = {}
+        for pair, col in self.prices.items():
+            value = float(col[i])
+            if value == value:
+                prices[pair] = value
+        sample = {"ts": epoch_ns_to_iso(int(self.ts[i])), "prices": prices}
+        if i in self.extra:
+            sample.update(self.extra[i])
+        return sample
+
+    # Reads like the list of samples it holds, so report and dashboard code
+    # written against dicts also takes columns: an index builds that one
+    # sample, a slice is a window over the same arrays and iterating yields
+    # sample dicts.
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("SampleColumns slices must be contiguous")
+            return self.window(start, max(start, stop))
+        return self.row(key)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.iter_samples()
+
+    def iter_samples(self) -> Iterator[Dict[str, Any]]:
+        pairs = self.pairs
+        columns = [self.prices[p].tolist() for p in pairs]
+        for i, ns in enumerate(self.ts.tolist()):
+            prices = {}
+            for pair, col in zip(pairs, columns):
+                value = col[i]
+                if value == value:
+                    prices[pair] = value
+            sample = {"ts": epoch_ns_to_iso(ns), "prices": prices}
+            if i in self.extra:
+                sample.update(self.extra[i])
+            yield sample
+
+    def window(self, start: int, stop: int) -> "SampleColumns":
+        return SampleColumns(
+            ts=self.ts[start:stop],
+            prices={pair: col[start:stop] for pair, col in self.prices.items()},
+            extra={
+                i - start: fields
+                for i, fields in self.extra.items()
+                if start <= i < stop
+            },
+        )
+
+    @classmethod
+    def from_samples(cls, samples: List[Dict[str, Any]]) -> "SampleColumns":
+        pairs: Dict[str, None] = {}
+        for s in samples:
+            for pair in s.get("prices") or {}:
+                pairs.setdefault(pair)
+
+        ts = iso_to_epoch_ns_array([s["ts"] for s in samples])
+        prices = {}
+        for pair in pairs:
+            values = ((s.get("prices") or {}).get(pair) for s in samples)
+            prices[pair] = np.fromiter(
+                (np.nan if v is None else v for v in values),
+                dtype=np.float64,
+                count=len(samples),
+            )
+        extra = {}
+        for i, s in enumerate(samples):
+            fields = sample_extra(s)
+            if fields:
+                extra[i] = fields
+        return cls(ts=ts, prices=prices, extra=extra)
@@ -0,0 +1,33 @@
+import os
+
+from typing import IO
+
+# none:  hand each group commit to the OS, never fsync (survives a process
+#        crash; sqlite: synchronous=OFF)
+# flush: as none, and force the run to disk once when it is closed, so a run
+#        that shut down cleanly survives a power loss (sqlite syncs the WAL at
+#        checkpoints)
+# fsync: force each group commit to disk (survives a power loss mid-run)
+DURABILITY_LEVELS = ["none", "flush", "fsync"]
+
+
+def sync_handle(f: IO, durability: str):
+    # Always flushed: readers (tail readers, the final read of a run, the
+    # dashboard) only ever see what has reached the OS.
+    f.flush()
+    if durability == "fsync":
+        os.fsync(f.fileno())
+
+
+def close_handle(f: IO, durability: str):
+    f.flush()
+    if durability != "none":
+        os.fsync(f.fileno())
+    f.close()
+
+
+def sync_path(path: str, durability: str):
+    # close_handle for a file that is not kept open between commits
+    if durability != "none" and os.path.exists(path):
+        with open(path, "rb") as f:
+            os.fsync(f.fileno())
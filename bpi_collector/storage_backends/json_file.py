@@ -0,0 +1,52 @@
+import os
+import json
+
+from logging import Logger
+from typing import List, Dict, Any, Iterator
+
+from .tail import IndexTailReader, load_json_array
+from .durability import sync_handle, sync_path
+
+
+class JsonFileBackend:
+    extension = ".json"
+
+    def __init__(self, path: str, logger: Logger, durability: str = "flush"):
+        self.path = path
+        self.logger = logger
+        self.durability = durability
+
+    def append_many(self, entries: List[Dict[str, Any]]):
+        data = []
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception as err:
+                self.logger.error(
+                    f"Failed to read existing storage file; starting fresh\n{err}"
+                )
+                data = []
+
+        data.extend(entries)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            sync_handle(f, self.durability)
+
+    def append(self, entry: Dict[str, Any]):
+        self.append_many([entry])
+
+    def iter_samples(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.read_all())
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def tail_reader(self):
+        return IndexTailReader(self.path, self.logger, load_json_array)
+
+    def close(self):
+        sync_path(self.path, self.durability)
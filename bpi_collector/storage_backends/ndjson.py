@@ -0,0 +1,118 @@
+import os
+import json
+
+from logging import Logger
+from typing import List, Dict, Any, Iterator, Optional, TextIO
+
+from .tail import NdjsonTailReader
+from .durability import close_handle, sync_handle
+
+
+def _is_legacy_array(path: str) -> bool:
+    with open(path, "rb") as f:
+        head = f.read(64).lstrip()
+    return head.startswith(b"[")
+
+
+class NdjsonBackend:
+    extension = ".ndjson"
+
+    def __init__(self, path: str, logger: Logger, durability: str = "flush"):
+        self.path = path
+        self.logger = logger
+        self.durability = durability
+        self._handle: Optional[TextIO] = None
+
+    def _migrate_legacy(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in data:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        os.replace(tmp_path, self.path)
+        self.logger.info(f"Converted legacy JSON run file to NDJSON {self.path}")
+
+    def _recover_tail(self):
+        # A crash mid-write leaves a final line without its newline. Keep it if it
+        # still parses, otherwise cut the file back to the last complete line.
+        with open(self.path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+
+            chunk = min(size, 64 * 1024)
+            while True:
+                f.seek(size - chunk)
+                buf = f.read(chunk)
+                cut = buf.rfind(b"\n")
+                if cut != -1 or chunk == size:
+                    break
+                chunk = min(size, chunk * 2)
+
+            line_start = size - chunk + cut + 1
+            f.seek(line_start)
+            partial = f.read()
+            try:
+                json.loads(partial)
+                f.seek(0, os.SEEK_END)
+                f.write(b"\n")
+            except ValueError:
+                f.truncate(line_start)
+                self.logger.warning(
+                    f"Dropped incomplete trailing sample ({len(partial)} bytes) from {self.path}"
+                )
+
+    def _open(self) -> TextIO:
+        if self._handle is None:
+            if os.path.exists(self.path):
+                if _is_legacy_array(self.path):
+                    self._migrate_legacy()
+                else:
+                    self._recover_tail()
+            self._handle = open(self.path, "a", encoding="utf-8")
+        return self._handle
+
+    def append_many(self, entries: List[Dict[str, Any]]):
+        f = self._open()
+        f.write("".join(json.dumps(e, separators=(",", ":")) + "\n" for e in entries))
+        sync_handle(f, self.durability)
+
+    def append(self, entry: Dict[str, Any]):
+        self.append_many([entry])
+
+    def iter_samples(self) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return
+
+        if _is_legacy_array(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                yield from json.load(f)
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # Only the tail can be torn; the writer is still mid-line.
+                    self.logger.warning(f"Skipping unreadable sample line in {self.path}")
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        return list(self.iter_samples())
+
+    def tail_reader(self):
+        return NdjsonTailReader(self.path, self.logger)
+
+    def close(self):
+        if self._handle is not None:
+            close_handle(self._handle, self.durability)
+            self._handle = None
@@ -0,0 +1,183 @@
+import os
+import json
+import sqlite3
+
+from logging import Logger
+from typing import List, Dict, Any, Iterator, Iterable, Optional, Tuple
+
+from .columns import iso_to_epoch_ns, sample_extra
+from .tail import file_identity
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    id INTEGER PRIMARY KEY,
+    ts TEXT NOT NULL,
+    ts_ns INTEGER NOT NULL,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS prices (
+    sample_id INTEGER NOT NULL REFERENCES samples(id),
+    pair TEXT NOT NULL,
+    ts_ns INTEGER NOT NULL,
+    price REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS prices_pair_ts ON prices(pair, ts_ns);
+CREATE INDEX IF NOT EXISTS prices_sample ON prices(sample_id);
+"""
+
+INSERT_SAMPLE = "INSERT INTO samples (ts, ts_ns, extra) VALUES (?, ?, ?)"
+INSERT_PRICE = "INSERT INTO prices (sample_id, pair, ts_ns, price) VALUES (?, ?, ?, ?)"
+SELECT_SINCE = (
+    "SELECT s.id, s.ts, s.extra, p.pair, p.price FROM samples s "
+    "LEFT JOIN prices p ON p.sample_id = s.id "
+    "WHERE s.id > ? ORDER BY s.id"
+)
+SELECT_RANGE = (
+    "SELECT s.ts, p.price FROM prices p JOIN samples s ON s.id = p.sample_id "
+    "WHERE p.pair = ? AND p.ts_ns >= ? AND p.ts_ns <= ? ORDER BY p.ts_ns"
+)
+MAX_TS_NS = 2**63 - 1
+SYNCHRONOUS = {"none": "OFF", "flush": "NORMAL", "fsync": "FULL"}
+
+
+def _group_rows(rows: Iterable[Tuple]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    current_id = None
+    current = None
+    for sample_id, ts, extra, pair, price in rows:
+        if sample_id != current_id:
+            if current is not None:
+                yield current_id, current
+            current_id = sample_id
+            current = {"ts": ts, "prices": {}}
+            if extra:
+                current.update(json.loads(extra))
+        if pair is not None:
+            current["prices"][pair] = price
+    if current is not None:
+        yield current_id, current
+
+
+class SqliteBackend:
+    # One writer connection in WAL mode; every read opens its own read-only
+    # connection so the dashboard never sees a half-written sample and never
+    # blocks the collector.
+    extension = ".sqlite"
+
+    def __init__(self, path: str, logger: Logger, durability: str = "flush"):
+        self.path = path
+        self.logger = logger
+        self.durability = durability
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _writer(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={SYNCHRONOUS[self.durability]}")
+            conn.executescript(SCHEMA)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(samples)")]
+            if "extra" not in columns:
+                conn.execute("ALTER TABLE samples ADD COLUMN extra TEXT")
+            self._conn = conn
+        return self._conn
+
+    def _reader(self) -> Optional[sqlite3.Connection]:
+        if not os.path.exists(self.path):
+            return None
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        conn.execute("PRAGMA query_only=ON")
+        return conn
+
+    def append_many(self, entries: List[Dict[str, Any]]):
+        conn = self._writer()
+        with conn:
+            for entry in entries:
+                ts_ns = iso_to_epoch_ns(entry["ts"])
+                extra = sample_extra(entry)
+                cur = conn.execute(
+                    INSERT_SAMPLE,
+                    (entry["ts"], ts_ns, json.dumps(extra) if extra else None),
+                )
+                sample_id = cur.lastrowid
+                conn.executemany(
+                    INSERT_PRICE,
+                    [
+                        (sample_id, pair, ts_ns, price)
+                        for pair, price in (entry.get("prices") or {}).items()
+                        if price is not None
+                    ],
+                )
+
+    def append(self, entry: Dict[str, Any]):
+        self.append_many([entry])
+
+    def read_since(self, last_id: int) -> List[Tuple[int, Dict[str, Any]]]:
+        conn = self._reader()
+        if conn is None:
+            return []
+        try:
+            return list(_group_rows(conn.execute(SELECT_SINCE, (last_id,))))
+        except sqlite3.OperationalError as err:
+            # A brand-new file may not have its schema yet.
+            self.logger.warning(f"Failed to read {self.path}\n{err}")
+            return []
+        finally:
+            conn.close()
+
+    def query_range(
+        self, pair: str, start: Optional[str] = None, end: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        conn = self._reader()
+        if conn is None:
+            return []
+        start_ns = iso_to_epoch_ns(start) if start else 0
+        end_ns = iso_to_epoch_ns(end) if end else MAX_TS_NS
+        try:
+            return conn.execute(SELECT_RANGE, (pair, start_ns, end_ns)).fetchall()
+        finally:
+            conn.close()
+
+    def iter_samples(self) -> Iterator[Dict[str, Any]]:
+        return (sample for _, sample in self.read_since(0))
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        return list(self.iter_samples())
+
+    def tail_reader(self):
+        return SqliteTailReader(self, self.logger)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class SqliteTailReader:
+    def __init__(self, backend: SqliteBackend, logger: Logger):
+        self.backend = backend
+        self.logger = logger
+        self.last_id = 0
+        self.samples_read = 0
+        self.rewound = False
+        self._identity = None
+
+    def reset(self):
+        self.last_id = 0
+        self.samples_read = 0
+        self._identity = None
+
+    def read_new(self) -> List[Dict[str, Any]]:
+        self.rewound = False
+        identity = file_identity(self.backend.path)
+        if identity != self._identity and self._identity is not None:
+            self.reset()
+            self.rewound = True
+        self._identity = identity
+        if identity is None:
+            return []
+
+        rows = self.backend.read_since(self.last_id)
+        if rows:
+            self.last_id = rows[-1][0]
+            self.samples_read += len(rows)
+        return [sample for _, sample in rows]
@@ -0,0 +1,185 @@
+import os
+import json
+
+from logging import Logger
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+
+def file_identity(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_dev, st.st_ino
+
+
+class NdjsonTailReader:
+    # Keeps a byte offset into an NDJSON run file and only parses what was
+    # appended since the previous call. `rewound` is set when the file was
+    # truncated, replaced or removed and the reader started over, so callers
+    # holding accumulated samples know to drop them.
+    def __init__(self, path: str, logger: Logger):
+        self.path = path
+        self.logger = logger
+        self.offset = 0
+        self.samples_read = 0
+        self.rewound = False
+        self._identity = None
+        self._legacy: Optional[IndexTailReader] = None
+
+    def reset(self):
+        self.offset = 0
+        self.samples_read = 0
+        self._identity = None
+        self._legacy = None
+
+    def read_new(self) -> List[Dict[str, Any]]:
+        self.rewound = False
+        identity = file_identity(self.path)
+        if identity is None:
+            if self._identity is not None:
+                self.reset()
+                self.rewound = True
+            return []
+
+        if self._identity is not None and identity != self._identity:
+            self.logger.info(f"Run file replaced; rereading {self.path}")
+            self.reset()
+            self.rewound = True
+        self._identity = identity
+
+        if self._legacy is not None:
+            return self._read_legacy()
+
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size < self.offset:
+                self.logger.info(f"Run file truncated; rereading {self.path}")
+                self.offset = 0
+                self.samples_read = 0
+                self.rewound = True
+            if size == self.offset:
+                return []
+
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+
+        if self.offset == 0 and chunk.lstrip().startswith(b"["):
+            self._legacy = IndexTailReader(self.path, self.logger, load_json_array)
+            return self._read_legacy()
+
+        # Leave a torn trailing line for the next call.
+        end = chunk.rfind(b"\n") + 1
+        samples = []
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                samples.append(json.loads(line))
+            except ValueError:
+                self.logger.warning(f"Skipping unreadable sample line in {self.path}")
+
+        self.offset += end
+        self.samples_read += len(samples)
+        return samples
+
+    def _read_legacy(self) -> List[Dict[str, Any]]:
+        samples = self._legacy.read_new()
+        self.rewound = self.rewound or self._legacy.rewound
+        self.samples_read = self._legacy.samples_read
+        return samples
+
+
+def load_json_array(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class IndexTailReader:
+    # Fallback for formats without an appendable layout (the legacy JSON array):
+    # skips the parse entirely while size/mtime are unchanged and otherwise
+    # returns samples past the last seen index.
+    def __init__(
+        self,
+        path: str,
+        logger: Logger,
+        load: Callable[[str], List[Dict[str, Any]]],
+    ):
+        self.path = path
+        self.logger = logger
+        self.load = load
+        self.samples_read = 0
+        self.rewound = False
+        self._stamp = None
+
+    def reset(self):
+        self.samples_read = 0
+        self._stamp = None
+
+    def read_new(self) -> List[Dict[str, Any]]:
+        self.rewound = False
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            if self._stamp is not None:
+                self.reset()
+                self.rewound = True
+            return []
+
+        stamp = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if stamp == self._stamp:
+            return []
+
+        try:
+            data = self.load(self.path)
+        except ValueError:
+            # Caught the writer mid-rewrite; try again on the next poll.
+            return []
+        self._stamp = stamp
+
+        if len(data) < self.samples_read:
+            self.samples_read = 0
+            self.rewound = True
+
+        new = data[self.samples_read :]
+        self.samples_read = len(data)
+        return new
+
+
+class ColumnarTailReader:
+    # Keeps a row index into a columnar run; new rows are sliced straight out
+    # of the memory-mapped columns.
+    def __init__(self, backend, logger: Logger):
+        self.backend = backend
+        self.logger = logger
+        self.samples_read = 0
+        self.rewound = False
+        self._identity = None
+
+    def reset(self):
+        self.samples_read = 0
+        self._identity = None
+
+    def read_new(self) -> List[Dict[str, Any]]:
+        self.rewound = False
+        identity = file_identity(os.path.join(self.backend.path, "ts.i64"))
+        if identity != self._identity and self._identity is not None:
+            self.reset()
+            self.rewound = True
+        self._identity = identity
+        if identity is None:
+            return []
+
+        columns = self.backend.read_columns()
+        rows = len(columns)
+        if rows < self.samples_read:
+            self.samples_read = 0
+            self.rewound = True
+        if rows == self.samples_read:
+            return []
+
+        start = self.samples_read
+        window = columns.window(start, rows)
+        self.samples_read = rows
+        return list(window.iter_samples())
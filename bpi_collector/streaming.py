@@ -0,0 +1,154 @@
+import json
+import math
+import asyncio
+import websockets
+
+from logging import Logger
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+from .config import Config
+from .async_engine import AsyncEngine
+from .resilience import backoff_delay
+
+
+def parse_ticker(message: str) -> Optional[Tuple[str, float]]:
+    # Coinbase Exchange "ticker" channel: {"type": "ticker", "product_id": ..., "price": ...}
+    try:
+        data = json.loads(message)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("type") != "ticker":
+        return None
+    try:
+        pair, price = data["product_id"], float(data["price"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not isinstance(pair, str) or not math.isfinite(price):
+        return None
+    return pair, price
+
+
+class TickCoalescer:
+    # Folds every tick seen during an interval into last/high/low per pair.
+    # A pair that did not tick carries its last price forward with ticks=0.
+    def __init__(self):
+        self._bars: Dict[str, List[float]] = {}
+        self._last: Dict[str, float] = {}
+
+    def add(self, pair: str, price: float):
+        bar = self._bars.get(pair)
+        if bar is None:
+            self._bars[pair] = [price, price, price, 1]
+        else:
+            bar[0] = price
+            bar[1] = max(bar[1], price)
+            bar[2] = min(bar[2], price)
+            bar[3] += 1
+
+    def drain(self) -> Tuple[Dict[str, float], Dict[str, Any]]:
+        bars, self._bars = self._bars, {}
+        for pair, bar in bars.items():
+            self._last[pair] = bar[0]
+        prices = dict(self._last)
+        high, low, ticks = {}, {}, {}
+        for pair, price in prices.items():
+            bar = bars.get(pair)
+            high[pair] = bar[1] if bar else price
+            low[pair] = bar[2] if bar else price
+            ticks[pair] = int(bar[3]) if bar else 0
+        return prices, {"high": high, "low": low, "ticks": ticks}
+
+
+class StreamingBPICollector(AsyncEngine):
+    # Subscribes to a ticker WebSocket instead of polling the spot endpoint.
+    # Ticks are coalesced in memory and every interval_seconds one sample is
+    # written with the last price per pair plus the interval's high/low, so
+    # the run file keeps the same schema as the polling engines.
+    def __init__(self, config: Config, logger: Logger):
+        super().__init__(config, logger)
+        self.pairs = list(config.currencies or ["BTC-USD"])
+        self.coalescer = TickCoalescer()
+        self.ticks_received = 0
+        self.bad_messages = 0
+        self.reconnects = 0
+
+    def _subscribe_message(self) -> str:
+        return json.dumps(
+            {"type": "subscribe", "product_ids": self.pairs, "channels": ["ticker"]}
+        )
+
+    async def _consume(self):
+        attempt = 0
+        while True:
+            try:
+                async with websockets.connect(
+                    self.config.stream_url,
+                    open_timeout=self.config.fetch_timeout_seconds,
+                ) as ws:
+                    await ws.send(self._subscribe_message())
+                    self.logger.info(
+                        f"Subscribed to {self.config.stream_url} {', '.join(self.pairs)}"
+                    )
+                    async for message in ws:
+                        # One bad message is skipped, not allowed to drop
+                        # the connection.
+                        try:
+                            tick = parse_ticker(message)
+                            if tick is None:
+                                continue
+                            self.coalescer.add(*tick)
+                        except Exception as e:
+                            self.bad_messages += 1
+                            self.logger.warning(f"Skipping stream message {e!r}")
+                            continue
+                        attempt = 0
+                        self.ticks_received += 1
+                    self.logger.warning(f"Stream closed by {self.config.stream_url}")
+            except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as e:
+                self.logger.warning(f"Stream error {self.config.stream_url} {e!r}")
+            except Exception as e:
+                # Anything else is a bug, but the stream is the only source of
+                # prices for this run: log it and reconnect rather than end the
+                # consumer and write empty samples until the run is over.
+                self.logger.error(
+                    f"Unexpected stream error {self.config.stream_url} {e!r}",
+                    exc_info=True,
+                )
+
+            delay = backoff_delay(
+                attempt,
+                self.config.retry_backoff_seconds,
+                self.config.stream_reconnect_max_seconds,
+            )
+            attempt += 1
+            self.reconnects += 1
+            self.logger.info(f"Reconnecting in {delay:.2f}s (attempt {attempt})")
+            await asyncio.sleep(delay)
+
+    async def run_async(self):
+        loop = asyncio.get_running_loop()
+        consumer = asyncio.create_task(self._consume())
+        next_tick = loop.time()
+        try:
+            for i in range(self.config.samples):
+                next_tick += self.config.interval_seconds
+                await asyncio.sleep(max(0.0, next_tick - loop.time()))
+                prices, extra = self.coalescer.drain()
+                if not prices:
+                    self.logger.warning(f"Tick {i} no prices streamed yet")
+                    continue
+                now = datetime.now(timezone.utc)
+                await loop.run_in_executor(
+                    self._writer, self.record, now, prices, extra
+                )
+        finally:
+            consumer.cancel()
+            try:
+                await consumer
+            except asyncio.CancelledError:
+                pass
+        self.logger.info(
+            f"Stream stats ticks={self.ticks_received} "
+            f"bad_messages={self.bad_messages} reconnects={self.reconnects}"
+        )
@@ -1,8 +1,12 @@
 from typing import List, Dict, Any, Optional, Tuple
 
+from .stats import RunStats, compute_stats
+
 
 def get_price_statistics(
-    samples: List[Dict[str, Any]], currencies: Optional[list] = None
+    samples: List[Dict[str, Any]],
+    currencies: Optional[list] = None,
+    stats: Optional[RunStats] = None,
 ) -> Tuple[str, Optional[float]]:
     if not samples:
         return "BTC-USD", None
@@ -14,13 +18,8 @@ def get_price_statistics(
     else:
         first_pair = currencies[0] if currencies else "BTC-USD"
 
-    vals = [
-        s.get("prices", {}).get(first_pair)
-        for s in samples
-        if s.get("prices") and s.get("prices").get(first_pair) is not None
-    ]
-
-    max_price = max(vals, default=None)
+    pair_stats = (stats or compute_stats(samples)).get(first_pair)
+    max_price = pair_stats.max if pair_stats else None
     return first_pair, max_price
 
 
@@ -1,19 +1,48 @@
 import os
+import re
 import glob
 import json
+import threading
 import configparser
 
 # from zoneinfo import ZoneInfo
 # from datetime import datetime, timezone, timedelta
-from flask import Flask, render_template, send_file, jsonify
+from flask import Flask, render_template, send_file, jsonify, request
+
+from bpi_collector.storage import Storage
+from bpi_collector.storage_backends import BACKENDS
+from bpi_collector.storage_backends.columns import iso_to_epoch_ns
+from bpi_collector.rollups import (
+    load_bars,
+    load_rollup_summary,
+    pick_resolution,
+    resolution_seconds,
+)
+from bpi_collector.shm_ring import SampleRingReader
+from bpi_collector.sharding import load_shard_health
+from bpi_collector.render_cache import RenderCache
+from bpi_collector.report_generator import (
+    ReportGenerator,
+    REPORT_DATE_PLACEHOLDER,
+    stamp_report_date,
+)
+from bpi_collector.stats import compute_stats
+from bpi_collector.running_stats import load_run_stats
 
 app = Flask(__name__, static_folder="static", template_folder="templates")
 
 DATA_DIR = os.path.join(os.getcwd(), "data")
+RUN_FILE_EXTENSIONS = {backend.extension for backend in BACKENDS.values()}
+# bpi_data_<ts><ext> only; sidecars such as bpi_data_<ts>.rollups.ndjson are skipped
+RUN_FILE_PATTERN = re.compile(r"^bpi_data_[^.]+(\.[a-z]+)$")
 
 
 def latest_run_files():
-    files = glob.glob(os.path.join(DATA_DIR, "bpi_data_*.json"))
+    files = []
+    for path in glob.glob(os.path.join(DATA_DIR, "bpi_data_*")):
+        match = RUN_FILE_PATTERN.match(os.path.basename(path))
+        if match and match.group(1) in RUN_FILE_EXTENSIONS:
+            files.append(path)
     if not files:
         return None, None
     files.sort()
@@ -23,14 +52,78 @@ def latest_run_files():
     return latest_json, graph
 
 
-def get_collection_progress():
-    latest_json, _ = latest_run_files()
-    if not latest_json:
-        return {"in_progress": False, "samples_collected": 0, "total_samples": 0}
+class RunCache:
+    # Samples of the run currently on screen, grown incrementally by a tail
+    # reader so each poll only parses what was appended since the last one.
+    # Columnar runs are re-mapped instead, which costs the same as a poll and
+    # keeps them as columns for graphing, stats and the render cache key.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.path = None
+        self.storage = None
+        self.reader = None
+        self.samples = []
+
+    def get(self, path):
+        with self.lock:
+            if path != self.path:
+                self.path = path
+                self.storage = Storage(path, app.logger)
+                self.reader = (
+                    None if self.storage.columnar else self.storage.tail_reader()
+                )
+                self.samples = []
+
+            if self.storage.columnar:
+                return self.storage.read_columns()
+
+            new_samples = self.reader.read_new()
+            if self.reader.rewound:
+                self.samples = []
+            self.samples.extend(new_samples)
+            return self.samples
+
+
+run_cache = RunCache()
+# Same directory as the collector's default --render-cache, so a report the
+# collector already rendered for the email is served without re-rendering.
+render_cache = RenderCache(
+    os.getenv("RENDER_CACHE_DIR", os.path.join(DATA_DIR, "render_cache")),
+    app.logger,
+    int(float(os.getenv("RENDER_CACHE_MB", "64")) * 1024 * 1024),
+)
+
+
+def read_run(path):
+    return run_cache.get(path)
 
-    with open(latest_json, "r", encoding="utf-8") as f:
-        data = json.load(f)
-        samples_collected = len(data)
+
+class LiveRing:
+    # Most recent samples and per-pair windows published by the collector in
+    # shared memory (SHM_RING); lets live polls skip the data directory.
+    def __init__(self, name):
+        self.lock = threading.Lock()
+        self.reader = SampleRingReader(name, app.logger) if name else None
+
+    def snapshot(self):
+        if self.reader is None:
+            return None
+        with self.lock:
+            return self.reader.snapshot()
+
+
+live_ring = LiveRing(os.getenv("SHM_RING"))
+
+
+def get_collection_progress():
+    live = live_ring.snapshot()
+    if live:
+        samples_collected = live.total
+    else:
+        latest_json, _ = latest_run_files()
+        if not latest_json:
+            return {"in_progress": False, "samples_collected": 0, "total_samples": 0}
+        samples_collected = len(read_run(latest_json))
 
     total_samples = int(os.getenv("SAMPLES", "0"))
 
@@ -57,13 +150,117 @@ def index():
     return render_template("index.html", has_run=bool(latest_json))
 
 
+def samples_response(samples, run_name, since):
+    response = jsonify(samples)
+    response.headers["X-Run-File"] = run_name
+    response.headers["X-Sample-Start"] = str(since)
+    return response
+
+
 @app.route("/latest/data")
 def latest_data():
+    # ?since=N lets a polling client fetch only samples it has not seen yet.
+    since = request.args.get("since", default=0, type=int)
+
+    live = live_ring.snapshot()
+    if live:
+        window_start = live.total - len(live.samples)
+        if window_start <= since <= live.total:
+            return samples_response(
+                live.samples[since - window_start :], live.run, since
+            )
+
     latest_json, _ = latest_run_files()
     if not latest_json:
         return jsonify([])
-    with open(latest_json, "r", encoding="utf-8") as f:
-        return jsonify(json.load(f))
+
+    samples = read_run(latest_json)
+    if since < 0 or since > len(samples):
+        since = 0
+    return samples_response(list(samples[since:]), os.path.basename(latest_json), since)
+
+
+@app.route("/latest/range")
+def latest_range():
+    latest_json, _ = latest_run_files()
+    pair = request.args.get("pair")
+    if not latest_json or not pair:
+        return jsonify([])
+
+    start = request.args.get("start")
+    end = request.args.get("end")
+    try:
+        rows = live_range(os.path.basename(latest_json), pair, start, end)
+        if rows is None:
+            rows = Storage(latest_json, app.logger).query_range(pair, start, end)
+    except ValueError:
+        return jsonify({"error": "start/end must be ISO-8601 timestamps"}), 400
+    return jsonify([{"ts": ts, "price": price} for ts, price in rows])
+
+
+def live_range(run_name, pair, start, end):
+    # Served from the pair's shared-memory window when that window reaches
+    # back to `start`; None sends the caller to the run file.
+    live = live_ring.snapshot()
+    if not live or live.run != run_name or not start:
+        return None
+    window = live.windows.get(pair)
+    start_ns = iso_to_epoch_ns(start)
+    if window is None:
+        return None
+    if len(window) == live.capacity and iso_to_epoch_ns(window[0][0]) > start_ns:
+        return None
+    end_ns = iso_to_epoch_ns(end) if end else None
+    return [
+        (ts, price)
+        for ts, price in window
+        if price is not None
+        and iso_to_epoch_ns(ts) >= start_ns
+        and (end_ns is None or iso_to_epoch_ns(ts) <= end_ns)
+    ]
+
+
+@app.route("/latest/rollups")
+def latest_rollups():
+    latest_json, _ = latest_run_files()
+    if not latest_json:
+        return jsonify({"resolution": None, "bars": []})
+
+    pair = request.args.get("pair")
+    start = request.args.get("start")
+    end = request.args.get("end")
+    resolution = request.args.get("resolution", "auto")
+
+    if resolution == "auto":
+        # Pick the finest bar size the collector keeps (--rollups) that holds
+        # the chart under `points` bars; the rollup snapshot has the run's
+        # sample count and span, so the run itself is not read.
+        summary = load_rollup_summary(latest_json)
+        if not summary or not summary["resolutions"] or not summary["samples"]:
+            return jsonify({"resolution": None, "bars": []})
+        max_points = request.args.get("points", default=500, type=int)
+        try:
+            span_start = iso_to_epoch_ns(start or summary["first"])
+            span_end = iso_to_epoch_ns(end or summary["last"])
+        except ValueError:
+            return jsonify({"error": "start/end must be ISO-8601 timestamps"}), 400
+        resolutions = summary["resolutions"]
+        resolution = pick_resolution(
+            (span_end - span_start) / 1e9, summary["samples"], max_points, resolutions
+        ) or min(resolutions, key=resolution_seconds)
+
+    try:
+        bars = load_bars(latest_json, resolution, pair, start, end)
+    except ValueError:
+        return jsonify({"error": "start/end must be ISO-8601 timestamps"}), 400
+    return jsonify({"resolution": resolution, "bars": bars})
+
+
+@app.route("/latest/shards")
+def latest_shards():
+    latest_json, _ = latest_run_files()
+    health = load_shard_health(latest_json) if latest_json else None
+    return jsonify(health or {"shards": []})
 
 
 @app.route("/latest/graph")
@@ -74,6 +271,41 @@ def latest_graph():
     return send_file(graph, mimetype="image/png")
 
 
+@app.route("/latest/stats")
+def latest_stats():
+    latest_json, _ = latest_run_files()
+    if not latest_json:
+        return jsonify(compute_stats([]).to_dict())
+    # The collector keeps <run>.stats.json current; scan only older runs.
+    stats = load_run_stats(latest_json) or compute_stats(read_run(latest_json))
+    return jsonify(stats.to_dict())
+
+
+@app.route("/latest/report")
+def latest_report():
+    latest_json, _ = latest_run_files()
+    samples = read_run(latest_json) if latest_json else []
+    if not samples:
+        return ("", 404)
+
+    key = render_cache.key(samples, "html", template=ReportGenerator.html_signature())
+    html = render_cache.get_text(key, ".html")
+    if html is None:
+        stats = load_run_stats(latest_json)
+        if stats is None or stats.samples != len(samples):
+            stats = compute_stats(samples)
+        html = ReportGenerator("").generate_html_report(
+            samples, stats=stats, report_date=REPORT_DATE_PLACEHOLDER
+        )
+        render_cache.put_text(key, ".html", html)
+    return stamp_report_date(html)
+
+
+@app.route("/cache/stats")
+def cache_stats():
+    return jsonify(render_cache.stats())
+
+
 @app.route("/progress")
 def collection_progress():
     return jsonify(get_collection_progress())
@@ -1,4 +1,6 @@
 let chart = null;
+let runFile = null;
+let samples = [];
 
 function fmtTime(iso) {
   // Convert UTC ISO string to local time
@@ -34,10 +36,30 @@ function fmtDateTime(iso) {
   });
 }
 
+async function fetchSamples(since) {
+  const res = await fetch(`/latest/data?since=${since}`);
+  return {
+    fresh: await res.json(),
+    file: res.headers.get('X-Run-File'),
+    start: parseInt(res.headers.get('X-Sample-Start') || '0', 10)
+  };
+}
+
 async function refresh() {
   try {
-    const res = await fetch('/latest/data');
-    const data = await res.json();
+    // Only ask for samples we have not seen; the server tells us where the
+    // returned slice starts so a new or rewritten run resets the cache.
+    let page = await fetchSamples(samples.length);
+    if (page.file !== runFile && page.start > 0) {
+      // A new run answered from our old run's offset: fetch it from the start.
+      page = await fetchSamples(0);
+    }
+    if (page.file !== runFile) {
+      runFile = page.file;
+      samples = [];
+    }
+    samples = samples.slice(0, page.start).concat(page.fresh);
+    const data = samples;
     // prepare times and detect pairs
     const times = data.map(s => fmtTime(s.ts));
     const pairs = (data[0] && data[0].prices) ? Object.keys(data[0].prices) : ['BTC-USD'];
@@ -0,0 +1,17 @@
+import logging
+
+import pytest
+
+from bpi_collector.mock_api import MockPriceAPI
+
+
+@pytest.fixture
+def logger():
+    return logging.getLogger("bpi_collector.tests")
+
+
+@pytest.fixture
+def api():
+    api = MockPriceAPI(seed=1).start()
+    yield api
+    api.stop()
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from bpi_collector.config import Config
+from bpi_collector.collector import BPICollector
+from bpi_collector.storage_backends import DURABILITY_LEVELS
+
+
+def _config(api, tmp_path, **overrides) -> Config:
+    values = dict(
+        api_url_template=api.url_template,
+        store_path=str(tmp_path / "run"),
+        graph_path=str(tmp_path / "graph.png"),
+        currencies=["BTC-USD", "ETH-USD"],
+        interval_seconds=0.05,
+        samples=3,
+        align_ticks=False,
+        rollup_resolutions=[],
+    )
+    values.update(overrides)
+    return Config(**values)
+
+
+@pytest.mark.parametrize("durability", DURABILITY_LEVELS)
+@pytest.mark.parametrize("storage_format", ["ndjson", "columnar", "sqlite", "json"])
+def test_run_loop_sees_every_sample(api, tmp_path, logger, storage_format, durability):
+    config = _config(
+        api,
+        tmp_path,
+        store_path=str(tmp_path / f"run.{storage_format}"),
+        storage_format=storage_format,
+        storage_durability=durability,
+        storage_batch_size=2,
+    )
+    samples = BPICollector(config, logger).run_loop()
+
+    assert len(samples) == 3
+    assert all(set(s["prices"]) == {"BTC-USD", "ETH-USD"} for s in samples)
+    assert os.path.exists(config.graph_path)
+
+
+def test_adaptive_interval_only_on_engines_that_support_it(tmp_path, logger):
+    from bpi_collector.async_collector import AsyncBPICollector
+    from bpi_collector.streaming import StreamingBPICollector
+    from bpi_collector.sharding import ShardedCollector
+
+    config = Config(
+        store_path=str(tmp_path / "run.ndjson"),
+        adaptive_interval=True,
+        rollup_resolutions=[],
+    )
+    assert BPICollector(config, logger).adaptive is not None
+    for engine in (AsyncBPICollector, StreamingBPICollector, ShardedCollector):
+        assert not engine.supports_adaptive
+        assert engine(config, logger).adaptive is None
@@ -0,0 +1,116 @@
+import re
+
+import numpy as np
+
+from bpi_collector.config import Config
+from bpi_collector.collector import BPICollector
+from bpi_collector.render_cache import sample_range
+from bpi_collector.report_generator import ReportGenerator
+from bpi_collector.stats import compute_stats
+from bpi_collector.storage import Storage
+from bpi_collector.storage_backends import SampleColumns
+from bpi_collector.utils import get_price_statistics
+
+
+def _samples():
+    return [
+        {"ts": "2026-01-01T00:00:00+00:00", "prices": {"BTC-USD": 100.0}},
+        {
+            "ts": "2026-01-01T00:01:00+00:00",
+            "prices": {"BTC-USD": 101.5, "ETH-USD": 10.0},
+            "interval": 60,
+        },
+        {"ts": "2026-01-01T00:02:00+00:00", "prices": {"ETH-USD": 10.5}},
+    ]
+
+
+def test_sample_columns_read_like_a_list_of_samples():
+    samples = _samples()
+    columns = SampleColumns.from_samples(samples)
+
+    assert list(columns) == samples
+    assert columns[0] == samples[0]
+    assert columns[-1] == samples[-1]
+    assert list(columns[1:]) == samples[1:]
+    assert len(columns[5:]) == 0
+
+
+def test_columnar_run_loop_returns_columns(api, tmp_path, logger):
+    config = Config(
+        api_url_template=api.url_template,
+        store_path=str(tmp_path / "run.cols"),
+        graph_path=str(tmp_path / "graph.png"),
+        storage_format="columnar",
+        currencies=["BTC-USD", "ETH-USD"],
+        interval_seconds=0.05,
+        samples=3,
+        align_ticks=False,
+        rollup_resolutions=[],
+    )
+    collector = BPICollector(config, logger)
+    samples = collector.run_loop()
+
+    assert isinstance(samples, SampleColumns)
+    assert isinstance(samples.ts, np.memmap)
+    assert len(samples) == 3
+    stats = collector.run_stats(samples)
+    assert get_price_statistics(samples, config.currencies, stats)[0] == "BTC-USD"
+
+
+def test_reports_match_for_columns_and_dicts(tmp_path, logger):
+    storage = Storage(str(tmp_path / "run.cols"), logger, "columnar")
+    storage.backend.append_many(_samples())
+    columns = storage.read_samples()
+    samples = Storage(str(tmp_path / "run.cols"), logger).read_all()
+
+    assert isinstance(columns, SampleColumns)
+    assert sample_range(columns) == sample_range(samples)
+    assert compute_stats(columns) == compute_stats(samples)
+
+    generator = ReportGenerator(str(tmp_path / "report.pdf"), appendix=True)
+    undated = lambda html: re.sub(r"\w+ \d\d, \d{4} at [^<]*", "", html)
+    assert undated(generator.generate_html_report(columns)) == undated(
+        generator.generate_html_report(samples)
+    )
+    generator.generate_report(columns)
+
+
+def _columnar(tmp_path, logger):
+    return Storage(str(tmp_path / "run.cols"), logger, storage_format="columnar")
+
+
+def test_pairs_that_sanitize_alike_keep_their_own_columns(tmp_path, logger):
+    storage = _columnar(tmp_path, logger)
+    for i, prices in enumerate(
+        [{"BTC/USD": 1.0, "BTC_USD": 2.0}, {"BTC/USD": 3.0, "btc_usd": 4.0}]
+    ):
+        storage.backend.append({"ts": f"2026-01-01T00:0{i}:00+00:00", "prices": prices})
+    storage.close()
+
+    prices = storage.read_columns().prices
+    assert prices["BTC/USD"].tolist() == [1.0, 3.0]
+    assert prices["BTC_USD"][0] == 2.0 and np.isnan(prices["BTC_USD"][1])
+    assert np.isnan(prices["btc_usd"][0]) and prices["btc_usd"][1] == 4.0
+
+
+def test_stale_column_file_is_started_over(tmp_path, logger):
+    storage = _columnar(tmp_path, logger)
+    storage.backend.append({"ts": "2026-01-01T00:00:00+00:00", "prices": {"A": 1.0}})
+    storage.close()
+    # a column a crashed writer created but never recorded in pairs.json
+    (tmp_path / "run.cols" / "B.f64").write_bytes(b"\x00" * 8 * 5)
+
+    storage = _columnar(tmp_path, logger)
+    storage.backend.append({"ts": "2026-01-01T00:01:00+00:00", "prices": {"B": 2.0}})
+    storage.close()
+
+    prices = storage.read_columns().prices
+    assert np.isnan(prices["B"][0]) and prices["B"][1] == 2.0
+    assert (tmp_path / "run.cols" / "B.f64").stat().st_size == 16
+
+
+def test_reader_before_the_writer_has_created_files(tmp_path, logger):
+    (tmp_path / "run.cols").mkdir()
+    (tmp_path / "run.cols" / "pairs.json").write_text('{"columns": {"A": "A.f64"}}')
+    columns = _columnar(tmp_path, logger).read_columns()
+    assert len(columns) == 0
@@ -0,0 +1,51 @@
+import pytest
+
+from bpi_collector.derived import CrossRates, DerivedPair, infer_legs, parse_derived
+
+FETCHED = ["ETH-USD", "BTC-USD", "EUR-USD", "USD-JPY"]
+
+
+def test_legs_are_inferred_through_a_shared_currency():
+    assert infer_legs("ETH-BTC", FETCHED) == DerivedPair(
+        "ETH-BTC", "ETH-USD", "BTC-USD", "/"
+    )
+    # quoted the other way round: the leg is inverted by dividing by it...
+    assert infer_legs("BTC-EUR", FETCHED) == DerivedPair(
+        "BTC-EUR", "BTC-USD", "EUR-USD", "/"
+    )
+    # ...or multiplied in when it already points the right way
+    assert infer_legs("BTC-JPY", FETCHED) == DerivedPair(
+        "BTC-JPY", "BTC-USD", "USD-JPY", "*"
+    )
+    assert infer_legs("SOL-BTC", FETCHED) is None
+
+
+def test_explicit_formulas_must_use_fetched_legs():
+    assert parse_derived("X=ETH-USD*USD-JPY", FETCHED).op == "*"
+    with pytest.raises(ValueError, match="SOL-USD is not fetched"):
+        parse_derived("SOL-BTC=SOL-USD/BTC-USD", FETCHED)
+    with pytest.raises(ValueError, match="Cannot derive SOL-BTC"):
+        parse_derived("SOL-BTC", FETCHED)
+
+
+def test_cross_rates_match_the_legs():
+    rates = CrossRates(["ETH-BTC", "BTC-EUR", "BTC-JPY"], FETCHED)
+    prices = {"ETH-USD": 3000.0, "BTC-USD": 60000.0, "EUR-USD": 1.2, "USD-JPY": 150.0}
+
+    assert rates.compute(prices) == pytest.approx(
+        {"ETH-BTC": 0.05, "BTC-EUR": 50000.0, "BTC-JPY": 9_000_000.0}
+    )
+
+
+def test_cross_rate_with_a_missing_or_zero_leg_is_left_out():
+    rates = CrossRates(["ETH-BTC", "BTC-EUR"], FETCHED)
+
+    assert rates.compute({"ETH-USD": 3000.0, "EUR-USD": 1.2}) == {}
+    assert rates.compute({"ETH-USD": 3000.0, "BTC-USD": 0.0, "EUR-USD": 1.2}) == {
+        "BTC-EUR": 0.0
+    }
+
+
+def test_a_pair_cannot_be_both_fetched_and_derived():
+    with pytest.raises(ValueError, match="both fetched and derived"):
+        CrossRates(["ETH-USD=ETH-USD/BTC-USD"], FETCHED)
@@ -0,0 +1,29 @@
+import numpy as np
+
+from bpi_collector.downsample import lttb
+
+
+def test_lttb_keeps_the_endpoints_and_the_point_count():
+    rng = np.random.default_rng(1)
+    x = np.arange(10_000, dtype=np.float64)
+    y = np.cumsum(rng.normal(size=x.size))
+    for threshold in (3, 50, 500, 9_999):
+        kept = lttb(x, y, threshold)
+        assert len(kept) == threshold
+        assert (kept[0], kept[-1]) == (0, x.size - 1)
+        # one point per bucket, in order
+        assert np.all(np.diff(kept) > 0)
+
+
+def test_lttb_keeps_a_spike():
+    x = np.arange(1_000, dtype=np.float64)
+    y = np.zeros(x.size)
+    y[437] = 50.0
+    assert 437 in lttb(x, y, 20)
+
+
+def test_lttb_leaves_short_series_alone():
+    x = np.arange(10, dtype=np.float64)
+    assert lttb(x, x, 10).tolist() == list(range(10))
+    assert lttb(x, x, 50).tolist() == list(range(10))
+    assert lttb(x, x, 2).tolist() == list(range(10))
@@ -0,0 +1,130 @@
+import time
+
+import pytest
+
+from bpi_collector.config import Config
+from bpi_collector.fetcher import DataFetcher
+from bpi_collector.mock_api import MockPriceAPI
+
+
+@pytest.fixture
+def make_api():
+    servers = []
+
+    def start(pair_latency=None):
+        servers.append(MockPriceAPI(pair_latency=pair_latency, seed=1).start())
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+def _fetcher(server, pairs, logger, **overrides):
+    config = Config(
+        api_url_template=server.url_template,
+        currencies=pairs,
+        fetch_retries=0,
+        **overrides,
+    )
+    return DataFetcher(config, logger)
+
+
+def test_session_reuses_connections_across_samples(make_api, logger):
+    server = make_api()
+    fetcher = _fetcher(server, ["BTC-USD", "ETH-USD"], logger, fetch_workers=2)
+    for _ in range(5):
+        assert set(fetcher.fetch_prices()) == {"BTC-USD", "ETH-USD"}
+    sent, opened = fetcher.connection_stats()
+    fetcher.close()
+
+    assert server.requests == sent == 10
+    assert server.connections == opened <= 2
+
+
+def test_pool_log_reports_each_sample_on_its_own(make_api, logger, caplog):
+    server = make_api()
+    fetcher = _fetcher(server, ["BTC-USD"], logger)
+    with caplog.at_level("INFO", logger=logger.name):
+        for _ in range(3):
+            fetcher.fetch_prices()
+    fetcher.close()
+
+    pool_lines = [r.message for r in caplog.records if r.message.startswith("HTTP")]
+    assert pool_lines == [
+        "HTTP pool requests=1 connections=1 reused=0%",
+        "HTTP pool requests=1 connections=0 reused=100%",
+        "HTTP pool requests=1 connections=0 reused=100%",
+    ]
+
+
+def test_deadline_leaves_out_slow_pairs(make_api, logger):
+    server = make_api({"SLOW-USD": "fixed:3"})
+    fetcher = _fetcher(
+        server, ["BTC-USD", "SLOW-USD"], logger, sample_deadline_seconds=0.3
+    )
+    started = time.monotonic()
+    prices = fetcher.fetch_prices()
+    elapsed = time.monotonic() - started
+    fetcher.close()
+
+    assert set(prices) == {"BTC-USD"}
+    assert elapsed < 1
+
+
+def test_pairs_are_fetched_concurrently(make_api, logger):
+    pairs = ["BTC-USD", "ETH-USD", "SOL-USD", "LTC-USD"]
+    server = make_api({pair: "fixed:0.3" for pair in pairs})
+    fetcher = _fetcher(server, pairs, logger, fetch_workers=4)
+    started = time.monotonic()
+    prices = fetcher.fetch_prices()
+    elapsed = time.monotonic() - started
+    fetcher.close()
+
+    assert set(prices) == set(pairs)
+    assert server.max_in_flight == len(pairs)
+    # max(RTT) rather than sum(RTT)
+    assert elapsed < 0.3 * len(pairs) * 0.75
+
+
+def test_late_request_times_out_with_the_sample_deadline(make_api, logger):
+    server = make_api({"SLOW-USD": "fixed:3"})
+    fetcher = _fetcher(
+        server,
+        ["BTC-USD", "SLOW-USD"],
+        logger,
+        sample_deadline_seconds=0.3,
+        fetch_timeout_seconds=10,
+    )
+    started = time.monotonic()
+    assert set(fetcher.fetch_prices()) == {"BTC-USD"}
+    # the request gave up with the sample, not after fetch_timeout_seconds
+    while fetcher.stragglers() and time.monotonic() - started < 2:
+        time.sleep(0.05)
+    fetcher.close()
+    assert fetcher.stragglers() == 0
+    assert time.monotonic() - started < 1
+
+
+def test_stragglers_are_tracked_until_they_finish(make_api, logger, caplog):
+    server = make_api()
+    fetcher = _fetcher(
+        server, ["BTC-USD", "SLOW-USD"], logger, sample_deadline_seconds=0.2
+    )
+    fetch_pair = fetcher._fetch_pair
+
+    def ignores_deadline(pair, deadline):
+        if pair == "SLOW-USD":
+            time.sleep(0.6)
+        return fetch_pair(pair, deadline)
+
+    fetcher._fetch_pair = ignores_deadline
+    assert set(fetcher.fetch_prices()) == {"BTC-USD"}
+    assert fetcher.stragglers() == 1
+    with caplog.at_level("WARNING", logger=logger.name):
+        fetcher.fetch_prices()
+    assert "1 fetches from earlier samples still hold 1 of 8" in caplog.text
+
+    time.sleep(0.8)
+    assert fetcher.stragglers() == 0
+    fetcher.close()
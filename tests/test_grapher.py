@@ -0,0 +1,44 @@
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+
+from bpi_collector.grapher import LiveGraph
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_importing_the_grapher_does_not_load_matplotlib():
+    code = (
+        "import sys, bpi_collector.collector, bpi_collector.grapher\n"
+        "print('matplotlib' in sys.modules)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == "False"
+
+
+def test_live_graph_renders_every_n_samples_into_the_same_figure(
+    tmp_path, logger, monkeypatch
+):
+    path = tmp_path / "live.png"
+    graph = LiveGraph(str(path), logger, every=5, max_points=10)
+    renders = []
+    render = graph.render
+    monkeypatch.setattr(graph, "render", lambda: renders.append(render()))
+
+    for i in range(4):
+        graph.add(T0 + timedelta(seconds=i), {"BTC-USD": 1.0 + i, "ETH-USD": None})
+    assert renders == [] and not path.exists()
+
+    for i in range(4, 50):
+        graph.add(T0 + timedelta(seconds=i), {"BTC-USD": 1.0 + i, "ETH-USD": 2.0})
+    assert len(renders) == 10
+    assert path.read_bytes().startswith(b"\x89PNG")
+    # one line per pair, updated in place and downsampled to max_points
+    assert sorted(graph._lines) == ["BTC-USD", "ETH-USD"]
+    assert len(graph.ax.get_lines()) == 2
+    x, y = graph._lines["BTC-USD"].get_data()
+    assert len(x) == 10
+    assert (y[0], y[-1]) == (1.0, 50.0)
+    assert len(graph._lines["ETH-USD"].get_data()[0]) == 10
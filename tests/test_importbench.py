@@ -0,0 +1,11 @@
+from bpi_collector.importbench import DEFAULT_BUDGET_MS, run_benchmark
+
+
+def test_entry_points_import_within_budget():
+    results = run_benchmark(repeat=3, budget_ms=DEFAULT_BUDGET_MS)
+    assert {r["target"]: r["heavy"] for r in results if r["heavy"]} == {}
+    assert {
+        r["target"]: r["median_ms"]
+        for r in results
+        if r["median_ms"] > DEFAULT_BUDGET_MS
+    } == {}
@@ -0,0 +1,42 @@
+import random
+import statistics
+
+import pytest
+
+from bpi_collector.loadtest import percentile
+from bpi_collector.mock_api import parse_latency
+
+
+def _draws(spec: str, count: int = 2000):
+    sample = parse_latency(spec, random.Random(1))
+    return [sample() for _ in range(count)]
+
+
+def test_latency_distributions_stay_in_their_shape():
+    assert set(_draws("fixed:0.25", 10)) == {0.25}
+    uniform = _draws("uniform:0.1,0.3")
+    assert 0.1 <= min(uniform) and max(uniform) <= 0.3
+    # a wide normal is clamped rather than going negative
+    normal = _draws("normal:0.05,0.1")
+    assert min(normal) == 0.0
+    lognormal = _draws("lognormal:0.2,0.5")
+    assert min(lognormal) > 0
+    assert statistics.median(lognormal) == pytest.approx(0.2, rel=0.1)
+
+
+@pytest.mark.parametrize(
+    "spec", ["fixed", "fixed:1,2", "uniform:1", "gamma:1,2", "normal:a,b"]
+)
+def test_invalid_latency_spec_is_rejected(spec):
+    with pytest.raises(ValueError):
+        parse_latency(spec, random.Random(1))
+
+
+def test_percentile_interpolates_between_ranks():
+    values = [40.0, 10.0, 30.0, 20.0]
+    assert percentile(values, 0) == 10.0
+    assert percentile(values, 100) == 40.0
+    assert percentile(values, 50) == pytest.approx(25.0)
+    assert percentile(values, 90) == pytest.approx(37.0)
+    assert percentile([5.0], 99) == 5.0
+    assert percentile([], 50) == 0.0
@@ -0,0 +1,11 @@
+import pytest
+
+from bpi_collector.report_data.registry import CompiledTemplate
+
+
+def test_render_names_every_missing_field():
+    template = CompiledTemplate("{title}: {price:,.2f} {rows[0]}", "row.html")
+    assert template.fields == {"title", "price", "rows"}
+    assert template.render(title="BTC", price=1234.5, rows=["x"]) == "BTC: 1,234.50 x"
+    with pytest.raises(KeyError, match="row.html is missing price, rows"):
+        template.render(title="BTC")
@@ -0,0 +1,25 @@
+from bpi_collector import report_generator
+from bpi_collector.emailer import EmailSender
+from bpi_collector.render_cache import RenderCache
+
+
+def _samples():
+    return [
+        {"ts": "2026-01-01T00:00:00+00:00", "prices": {"BTC-USD": 100.0}},
+        {"ts": "2026-01-01T00:01:00+00:00", "prices": {"BTC-USD": 101.0}},
+    ]
+
+
+def test_cached_html_report_carries_the_serving_time(tmp_path, logger, monkeypatch):
+    cache = RenderCache(str(tmp_path / "cache"), logger)
+    sender = EmailSender("smtp", 25, "u", "p", logger, render_cache=cache)
+
+    monkeypatch.setattr(report_generator, "current_report_date", lambda: "FIRST")
+    first = sender._generate_html_report(_samples())
+    monkeypatch.setattr(report_generator, "current_report_date", lambda: "SECOND")
+    second = sender._generate_html_report(_samples())
+
+    assert cache.hits == 1
+    assert "Report generated on FIRST" in first
+    assert "Report generated on SECOND" in second
+    assert first.replace("FIRST", "SECOND") == second
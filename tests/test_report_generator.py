@@ -0,0 +1,87 @@
+import re
+import zlib
+import base64
+
+import pytest
+
+from bpi_collector.pdfbench import synthetic_samples
+from bpi_collector.report_generator import (
+    APPENDIX_MAX_PAIRS,
+    ReportGenerator,
+    appendix_rows,
+    streaming_doc_template,
+)
+
+PAGE = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+STREAM = re.compile(rb"stream\r?\n(.*?)endstream", re.S)
+
+
+def _content(pdf: bytes) -> bytes:
+    # ReportLab writes page content as ASCII85 + Flate streams.
+    content = []
+    for data in STREAM.findall(pdf):
+        data = data.strip()
+        if data.endswith(b"~>"):
+            data = base64.a85decode(data[:-2])
+        try:
+            content.append(zlib.decompress(data))
+        except zlib.error:
+            continue
+    return b"".join(content)
+
+
+def _build(tmp_path, rows: int, appendix: bool = True, pairs: int = 2):
+    samples = synthetic_samples(rows, pairs=pairs)
+    path = tmp_path / f"report_{rows}_{appendix}.pdf"
+    ReportGenerator(str(path), appendix=appendix).generate_report(samples)
+    return path.read_bytes(), samples
+
+
+def test_appendix_page_count_grows_with_rows(tmp_path):
+    pages = {}
+    for rows in (50, 500, 2000):
+        pdf, _ = _build(tmp_path, rows)
+        pages[rows] = len(PAGE.findall(pdf))
+    summary, _ = _build(tmp_path, 2000, appendix=False)
+
+    assert len(PAGE.findall(summary)) == 1
+    assert pages[50] < pages[500] < pages[2000]
+    # at most ~45 rows fit a landscape letter page at the appendix row height
+    assert pages[2000] - pages[500] >= (2000 - 500) // 46
+
+
+def test_appendix_contains_every_row(tmp_path):
+    pdf, samples = _build(tmp_path, 1200)
+    pairs = list(samples[0]["prices"])
+    for row in (0, 599, 1199):
+        timestamp = next(appendix_rows(samples[row : row + 1], pairs))[0]
+        assert timestamp.encode() in _content(pdf)
+
+
+def test_unfinished_appendix_is_an_error(tmp_path, monkeypatch):
+    doc_template = streaming_doc_template()
+    # A build that stops pulling appendix tables must not pass silently.
+    monkeypatch.setattr(doc_template, "_top_up", lambda self, flowables: None)
+    with pytest.raises(RuntimeError, match="appendix"):
+        _build(tmp_path, 300)
+
+
+def test_multi_page_appendix_renders_start_to_finish(tmp_path):
+    # More pairs than fit one table: every row appears once per pair group,
+    # in order, across many pages.
+    rows, pairs = 600, APPENDIX_MAX_PAIRS + 2
+    pdf, samples = _build(tmp_path, rows, pairs=pairs)
+    content = _content(pdf)
+    names = list(samples[0]["prices"])
+    groups = [names[:APPENDIX_MAX_PAIRS], names[APPENDIX_MAX_PAIRS:]]
+
+    assert len(PAGE.findall(pdf)) > 2 * rows // 46
+    position = 0
+    for group in groups:
+        # the heading wraps, so look for its first and last pair nearby
+        position = content.index(b"Appendix: All Samples", position)
+        heading = content[position : position + 200]
+        assert group[0].encode() in heading and group[-1].encode() in heading
+        for row in appendix_rows(samples, group):
+            position = content.index(row[0].encode(), position)
+            assert row[-1].encode() in content[position : position + 2000]
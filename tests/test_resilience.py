@@ -0,0 +1,78 @@
+import time
+
+import pytest
+import requests
+
+from bpi_collector.config import Config
+from bpi_collector.fetcher import DataFetcher
+from bpi_collector.resilience import CircuitOpenError, RateLimitedError
+
+
+@pytest.fixture
+def fetcher(api, logger):
+    config = Config(
+        api_url_template=api.url_template,
+        currencies=["BTC-USD"],
+        breaker_failure_threshold=1,
+        breaker_reset_seconds=0.05,
+    )
+    fetcher = DataFetcher(config, logger)
+    yield fetcher
+    fetcher.close()
+
+
+def _half_open(fetcher):
+    # Trip the breaker and wait out reset_seconds so the next allow() hands
+    # out the half-open trial.
+    url = fetcher.config.api_url_template.format(pair="BTC-USD")
+    host, port = fetcher.config.api_url_template.split("/")[2].split(":")
+    breaker, limiter = fetcher._guards(f"{host}:{port}")
+    breaker.record_failure()
+    assert breaker.state == "open"
+    time.sleep(0.06)
+    return url, breaker, limiter
+
+
+def test_rate_limited_trial_does_not_wedge_breaker(fetcher):
+    url, breaker, limiter = _half_open(fetcher)
+    limiter.pause(0.3)
+    with pytest.raises(RateLimitedError):
+        fetcher._request(url, time.monotonic() + 0.1)
+
+    # Waits out the pause, then the trial goes through and closes the breaker.
+    assert fetcher._request(url, time.monotonic() + 5) > 0
+    assert breaker.state == "closed"
+
+
+def test_expired_deadline_does_not_wedge_breaker(fetcher):
+    url, breaker, _ = _half_open(fetcher)
+    with pytest.raises(TimeoutError):
+        fetcher._request(url, time.monotonic() - 1)
+
+    assert fetcher._request(url, time.monotonic() + 5) > 0
+    assert breaker.state == "closed"
+
+
+def test_unexpected_request_error_resolves_trial(fetcher, monkeypatch):
+    url, breaker, _ = _half_open(fetcher)
+    session = fetcher._http()
+
+    def broken_get(*args, **kwargs):
+        raise requests.exceptions.ChunkedEncodingError("truncated body")
+
+    monkeypatch.setattr(session, "get", broken_get)
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        fetcher._request(url, time.monotonic() + 5)
+    assert breaker.state == "open"
+
+    monkeypatch.undo()
+    time.sleep(0.06)
+    assert fetcher._request(url, time.monotonic() + 5) > 0
+    assert breaker.state == "closed"
+
+
+def test_open_breaker_fails_fast(fetcher):
+    url, breaker, _ = _half_open(fetcher)
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        fetcher._request(url, time.monotonic() + 5)
@@ -0,0 +1,112 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from bpi_collector.rollups import (
+    RollupStore,
+    load_bars,
+    load_rollup_summary,
+    pick_resolution,
+    rollup_paths,
+)
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _feed(store, prices):
+    # one sample every 20s, starting on a minute boundary
+    for i, price in enumerate(prices):
+        store.update(T0 + timedelta(seconds=20 * i), {"BTC-USD": price})
+
+
+def test_bars_close_on_bucket_boundaries(tmp_path, logger):
+    path = str(tmp_path / "run.ndjson")
+    store = RollupStore(path, logger, ["1m", "5m"])
+    _feed(store, [10.0, 12.0, 9.0, 11.0, 15.0, 8.0, 13.0])
+    store.close()
+
+    minute = load_bars(path, "1m")
+    assert [b["start"] for b in minute] == [
+        T0.isoformat(),
+        (T0 + timedelta(minutes=1)).isoformat(),
+        (T0 + timedelta(minutes=2)).isoformat(),
+    ]
+    # open, high, low, close and count of each minute's samples
+    assert [(b["o"], b["h"], b["l"], b["c"], b["n"]) for b in minute] == [
+        (10.0, 12.0, 9.0, 9.0, 3),
+        (11.0, 15.0, 8.0, 8.0, 3),
+        (13.0, 13.0, 13.0, 13.0, 1),
+    ]
+    # the last bar is still open: it is only in the snapshot
+    closed_path, _ = rollup_paths(path)
+    with open(closed_path, encoding="utf-8") as f:
+        assert [json.loads(line)["res"] for line in f] == ["1m", "1m"]
+    (five,) = load_bars(path, "5m")
+    assert (five["o"], five["h"], five["l"], five["c"], five["n"]) == (
+        10.0,
+        15.0,
+        8.0,
+        13.0,
+        7,
+    )
+
+
+def test_resumed_store_continues_open_bars(tmp_path, logger):
+    path = str(tmp_path / "run.ndjson")
+    first = RollupStore(path, logger, ["5m"])
+    _feed(first, [10.0, 12.0])
+    first.close()
+    second = RollupStore(path, logger, ["5m"])
+    second.update(T0 + timedelta(seconds=60), {"BTC-USD": 7.0})
+    second.close()
+
+    (bar,) = load_bars(path, "5m")
+    assert (bar["o"], bar["h"], bar["l"], bar["c"], bar["n"]) == (
+        10.0,
+        12.0,
+        7.0,
+        7.0,
+        3,
+    )
+    assert load_rollup_summary(path)["samples"] == 3
+
+
+def test_open_snapshot_is_not_rewritten_for_every_sample(tmp_path, logger, monkeypatch):
+    path = str(tmp_path / "run.ndjson")
+    store = RollupStore(path, logger, ["1h"], flush_seconds=60)
+    writes = []
+    write_open = store._write_open
+    monkeypatch.setattr(store, "_write_open", lambda: writes.append(write_open()))
+
+    _feed(store, [float(i) for i in range(100)])
+    # only when the hour's bar opened; the rest wait for the flush interval
+    assert len(writes) == 1
+    store.close()
+    assert len(writes) == 2
+    assert load_bars(path, "1h")[0]["n"] == 100
+
+
+def test_summary_records_resolutions_count_and_span(tmp_path, logger):
+    path = str(tmp_path / "run.ndjson")
+    store = RollupStore(path, logger, ["15m", "1m"])
+    _feed(store, [1.0, 2.0, 3.0])
+    store.close()
+
+    assert load_rollup_summary(path) == {
+        "resolutions": ["15m", "1m"],
+        "samples": 3,
+        "first": T0.isoformat(),
+        "last": (T0 + timedelta(seconds=40)).isoformat(),
+    }
+    assert load_rollup_summary(str(tmp_path / "other.ndjson")) is None
+
+
+def test_pick_resolution_uses_the_configured_bar_sizes():
+    day = 86400
+    # raw samples already fit
+    assert pick_resolution(day, 400, 500, ["1m", "1h"]) is None
+    # finest size under the point budget, whatever order they were given in
+    assert pick_resolution(day, 5000, 500, ["1h", "1m", "5m"]) == "5m"
+    assert pick_resolution(day, 5000, 50, ["1h", "1m", "15m"]) == "1h"
+    # nothing small enough: the coarsest there is
+    assert pick_resolution(30 * day, 50000, 100, ["1m", "15m"]) == "15m"
+    assert pick_resolution(day, 5000, 500, []) is None
@@ -0,0 +1,88 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from bpi_collector.running_stats import RunningStats, load_run_stats
+from bpi_collector.stats import compute_stats
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _samples(count: int):
+    rng = random.Random(3)
+    prices = {"BTC-USD": 60000.0, "ETH-USD": 3000.0}
+    samples = []
+    for i in range(count):
+        for pair in prices:
+            prices[pair] *= 1 + rng.gauss(0, 0.01)
+        sample = dict(prices)
+        if i % 7 == 3:
+            sample["ETH-USD"] = None  # a missed fetch
+        samples.append(
+            {"ts": (T0 + timedelta(seconds=i)).isoformat(), "prices": sample}
+        )
+    return samples
+
+
+def _feed(running, samples):
+    for s in samples:
+        running.update(datetime.fromisoformat(s["ts"]), s["prices"])
+
+
+def test_running_stats_agree_with_a_full_scan(tmp_path, logger):
+    samples = _samples(200)
+    running = RunningStats(str(tmp_path / "run.ndjson"), logger, window=20)
+    _feed(running, samples)
+
+    streamed = running.snapshot()
+    scanned = compute_stats(samples)
+    assert (streamed.samples, streamed.start_ts, streamed.end_ts) == (
+        scanned.samples,
+        scanned.start_ts,
+        scanned.end_ts,
+    )
+    assert list(streamed.pairs) == list(scanned.pairs)
+    for pair, expected in scanned.pairs.items():
+        got = streamed.pairs[pair]
+        for field in ("count", "min", "max", "first", "last"):
+            assert getattr(got, field) == getattr(expected, field)
+        for field in ("mean", "std", "change_pct", "volatility"):
+            assert getattr(got, field) == pytest.approx(getattr(expected, field))
+        recent = [s["prices"][pair] for s in samples if s["prices"][pair] is not None]
+        assert (got.window_min, got.window_max) == (
+            min(recent[-20:]),
+            max(recent[-20:]),
+        )
+
+
+def test_resumed_stats_continue_from_the_snapshot(tmp_path, logger):
+    samples = _samples(60)
+    path = str(tmp_path / "run.ndjson")
+    first = RunningStats(path, logger, window=10)
+    _feed(first, samples[:25])
+    first.close()
+    second = RunningStats(path, logger, window=10)
+    _feed(second, samples[25:])
+    second.close()
+
+    whole = RunningStats(str(tmp_path / "whole.ndjson"), logger, window=10)
+    _feed(whole, samples)
+    assert second.snapshot() == whole.snapshot()
+    assert load_run_stats(path) == whole.snapshot()
+
+
+def test_snapshot_is_not_rewritten_for_every_sample(tmp_path, logger, monkeypatch):
+    path = str(tmp_path / "run.ndjson")
+    running = RunningStats(path, logger, flush_seconds=60)
+    writes = []
+    write = running._write
+    monkeypatch.setattr(running, "_write", lambda: writes.append(write()))
+
+    _feed(running, _samples(50))
+    # the first sample, so the file exists; then only on close
+    assert len(writes) == 1
+    assert load_run_stats(path).samples == 1
+    running.close()
+    assert len(writes) == 2
+    assert load_run_stats(path).samples == 50
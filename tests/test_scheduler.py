@@ -0,0 +1,35 @@
+from bpi_collector.config import Config
+from bpi_collector.collector import BPICollector
+from bpi_collector.mock_api import MockPriceAPI
+from bpi_collector.storage_backends.columns import iso_to_epoch_ns
+
+
+def test_aligned_samples_record_their_tick_and_lag(tmp_path, logger):
+    api = MockPriceAPI(latency="uniform:0.01,0.08", seed=1).start()
+    try:
+        config = Config(
+            api_url_template=api.url_template,
+            store_path=str(tmp_path / "run.ndjson"),
+            graph_path=str(tmp_path / "graph.png"),
+            currencies=["BTC-USD"],
+            interval_seconds=0.2,
+            samples=4,
+            align_ticks=True,
+            rollup_resolutions=[],
+        )
+        samples = BPICollector(config, logger).run_loop()
+    finally:
+        api.stop()
+
+    interval_us = 200_000
+    ticks = [iso_to_epoch_ns(s["scheduled"]) // 1000 for s in samples]
+    stamps = [iso_to_epoch_ns(s["ts"]) // 1000 for s in samples]
+    assert len(ticks) == 4
+    # ticks on wall-clock multiples of the interval, however long each fetch took
+    assert all(abs(t - round(t / interval_us) * interval_us) <= 1 for t in ticks)
+    assert all(abs(b - a - interval_us) <= 1 for a, b in zip(ticks, ticks[1:]))
+    # stamped when the prices came back, which is after the fetch
+    for s, tick, ts in zip(samples, ticks, stamps):
+        assert s["fetch_ms"] >= 10
+        assert s["lag_ms"] >= s["fetch_ms"]
+        assert abs((ts - tick) / 1000 - s["lag_ms"]) <= 0.1
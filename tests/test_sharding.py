@@ -0,0 +1,88 @@
+import multiprocessing
+
+import pytest
+
+from bpi_collector.config import Config
+from bpi_collector.storage_backends.columns import epoch_ns_to_iso, iso_to_epoch_ns
+from bpi_collector.sharding import ShardMerger, ShardedCollector, load_shard_health
+
+
+def test_failed_shard_start_surfaces_its_own_error(tmp_path, logger, monkeypatch):
+    ctx = multiprocessing.get_context("spawn")
+    process_class = type(ctx.Process(target=print))
+    started = []
+    real_start = process_class.start
+
+    def start(self):
+        if started:
+            raise RuntimeError("cannot spawn shard")
+        real_start(self)
+        started.append(self)
+
+    monkeypatch.setattr(process_class, "start", start)
+    config = Config(
+        store_path=str(tmp_path / "run.ndjson"),
+        graph_path=str(tmp_path / "graph.png"),
+        currencies=["BTC-USD", "ETH-USD"],
+        api_url_template="http://127.0.0.1:9/v2/prices/{pair}/spot",
+        interval_seconds=0.1,
+        samples=1,
+        shards=2,
+        fetch_timeout_seconds=0.5,
+        rollup_resolutions=[],
+    )
+    with pytest.raises(RuntimeError, match="cannot spawn shard"):
+        ShardedCollector(config, logger).collect()
+    assert not started[0].is_alive()
+
+
+def test_two_shards_merge_into_one_run(api, tmp_path, logger):
+    pairs = [f"P{i}-USD" for i in range(5)]
+    config = Config(
+        api_url_template=api.url_template,
+        store_path=str(tmp_path / "run.ndjson"),
+        graph_path=str(tmp_path / "graph.png"),
+        currencies=pairs,
+        interval_seconds=0.3,
+        samples=4,
+        shards=2,
+        rollup_resolutions=[],
+    )
+    samples = ShardedCollector(config, logger).run_loop()
+
+    # one merged sample per tick carrying every pair, in time order
+    assert len(samples) == 4
+    assert all(set(s["prices"]) == set(pairs) for s in samples)
+    stamps = [iso_to_epoch_ns(s["ts"]) for s in samples]
+    assert stamps == sorted(stamps)
+    assert all(0.15e9 < b - a < 0.45e9 for a, b in zip(stamps, stamps[1:]))
+    assert api.requests == 4 * len(pairs)
+
+    health = load_shard_health(config.store_path)
+    assert [h["shard"] for h in health["shards"]] == [0, 1]
+    assert sorted(h["pairs"] for h in health["shards"]) == [2, 3]
+    for shard in health["shards"]:
+        assert (shard["status"], shard["ticks"], shard["exitcode"]) == ("done", 4, 0)
+        assert shard["missing_total"] == 0
+
+
+def test_merger_slots_samples_by_their_scheduled_tick():
+    merger = ShardMerger(2, start_at=1000.0, interval=1.0, grace=5.0)
+
+    def sample(observed, scheduled, pair):
+        return {
+            "ts": epoch_ns_to_iso(int(observed * 1e9)),
+            "scheduled": epoch_ns_to_iso(int(scheduled * 1e9)),
+            "prices": {pair: 1.0},
+        }
+
+    # shard 1 came back most of an interval late; still the same tick
+    merger.add(0, sample(1003.05, 1003.0, "BTC-USD"))
+    merger.add(1, sample(1003.8, 1003.0, "ETH-USD"))
+    merger.add(1, sample(1004.1, 1004.0, "ETH-USD"))
+    # without a scheduled tick, the observation falls in the slot it follows
+    merger.add(0, {"ts": epoch_ns_to_iso(int(1004.9 * 1e9)), "prices": {"BTC": 2.0}})
+
+    (slot, bucket), (next_slot, _) = merger.ready(set(), now=1004.5, final=True)
+    assert (slot, next_slot) == (3, 4)
+    assert bucket["prices"] == {"BTC-USD": 1.0, "ETH-USD": 1.0}
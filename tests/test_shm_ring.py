@@ -0,0 +1,66 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from bpi_collector.shm_ring import SampleRingReader, SampleRingWriter
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def ring(logger):
+    name = f"bpi_test_ring_{os.getpid()}"
+    writer = SampleRingWriter(name, logger, run_name="run.ndjson", capacity=4)
+    reader = SampleRingReader(name, logger)
+    yield writer, reader
+    reader.detach()
+    writer.close()
+
+
+def _at(seconds: int) -> datetime:
+    return T0 + timedelta(seconds=seconds)
+
+
+def test_fast_pair_does_not_evict_slow_pair(ring):
+    writer, reader = ring
+    writer.publish(_at(0), {"SLOW": 1.0})
+    for i in range(10):
+        writer.publish(_at(i + 1), {"FAST": float(i)})
+
+    live = reader.snapshot()
+    assert live.total == 11
+    assert live.windows["SLOW"] == [(_at(0).isoformat(), 1.0)]
+    assert [price for _, price in live.windows["FAST"]] == [6.0, 7.0, 8.0, 9.0]
+    assert [s["prices"] for s in live.samples] == [
+        {"FAST": float(i)} for i in range(6, 10)
+    ]
+
+
+def test_samples_keep_their_extra_fields(ring):
+    writer, reader = ring
+    extra = {"fetch_ms": 12.5, "high": {"BTC-USD": 2.0}, "derived": ["ETH-BTC"]}
+    writer.publish(_at(0), {"BTC-USD": 1.5, "ETH-BTC": None}, extra)
+
+    assert reader.snapshot().samples == [
+        {"ts": _at(0).isoformat(), "prices": {"BTC-USD": 1.5, "ETH-BTC": None}, **extra}
+    ]
+
+
+def test_sample_too_large_for_the_ring_is_left_to_disk(ring):
+    writer, reader = ring
+    writer.publish(_at(0), {"BTC-USD": 1.0})
+    writer.publish(_at(1), {"BTC-USD": 2.0}, {"note": "x" * 2000})
+    writer.publish(_at(2), {"BTC-USD": 3.0})
+
+    live = reader.snapshot()
+    # only the samples after the incomplete one, so the slice stays contiguous
+    assert live.total == 3
+    assert [s["prices"]["BTC-USD"] for s in live.samples] == [3.0]
+
+
+def test_snapshot_gives_up_on_a_write_in_progress(ring):
+    writer, reader = ring
+    writer.publish(_at(0), {"BTC-USD": 1.0})
+    writer.views.header[1] += 1  # H_SEQ odd: a write that never finishes
+    assert reader.snapshot(retries=3) is None
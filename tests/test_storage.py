@@ -0,0 +1,61 @@
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from bpi_collector.storage import Storage
+from bpi_collector.storage_backends import durability
+
+FORMATS = {"ndjson": "run.ndjson", "json": "run.json", "columnar": "run.cols"}
+
+
+@pytest.fixture
+def fsyncs(monkeypatch):
+    calls = []
+    real_fsync = os.fsync
+
+    def fsync(fd):
+        calls.append(fd)
+        real_fsync(fd)
+
+    monkeypatch.setattr(durability.os, "fsync", fsync)
+    return calls
+
+
+@pytest.mark.parametrize("storage_format", FORMATS)
+@pytest.mark.parametrize(
+    "level, during_run, at_close",
+    [("none", False, False), ("flush", False, True), ("fsync", True, True)],
+)
+def test_durability_levels_differ(
+    tmp_path, logger, fsyncs, storage_format, level, during_run, at_close
+):
+    storage = Storage(
+        str(tmp_path / FORMATS[storage_format]),
+        logger,
+        storage_format=storage_format,
+        durability=level,
+    )
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for _ in range(3):
+        storage.append_sample(now, {"BTC-USD": 1.0})
+    assert bool(fsyncs) == during_run
+    # what was committed is readable either way
+    assert len(storage.read_all()) == 3
+
+    fsyncs.clear()
+    storage.close()
+    assert bool(fsyncs) == at_close
+
+
+def test_sample_is_logged_once_written(tmp_path, logger, caplog):
+    storage = Storage(str(tmp_path / "run.ndjson"), logger, batch_size=2)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with caplog.at_level("INFO", logger=logger.name):
+        storage.append_sample(now, {"BTC-USD": 1.0})
+        storage.append_sample(now, {"BTC-USD": 2.0})
+    storage.close()
+
+    messages = [r.message for r in caplog.records]
+    assert [m.split(" {")[0] for m in messages[:2]] == ["Buffered sample"] * 2
+    assert messages[2].startswith("Committed 2 samples")
@@ -0,0 +1,159 @@
+import socket
+
+import pytest
+
+from bpi_collector import streaming
+from bpi_collector.config import Config
+from bpi_collector.mock_api import MockTickerFeed
+from bpi_collector.streaming import StreamingBPICollector, TickCoalescer, parse_ticker
+
+
+class RecordingCoalescer(TickCoalescer):
+    # Remembers the last tick of every pair at each drain, i.e. the price
+    # each sample should carry.
+    def __init__(self):
+        super().__init__()
+        self.latest = {}
+        self.expected = []
+
+    def add(self, pair, price):
+        super().add(pair, price)
+        self.latest[pair] = price
+
+    def drain(self):
+        self.expected.append(dict(self.latest))
+        return super().drain()
+
+
+@pytest.fixture
+def feed():
+    feeds = []
+
+    def start(**kwargs):
+        feeds.append(MockTickerFeed(tick_seconds=0.02, seed=1, **kwargs).start())
+        return feeds[-1]
+
+    yield start
+    for f in feeds:
+        f.stop()
+
+
+def _collector(url, tmp_path, logger, **overrides) -> StreamingBPICollector:
+    values = dict(
+        stream_url=url,
+        store_path=str(tmp_path / "run.ndjson"),
+        graph_path=str(tmp_path / "graph.png"),
+        currencies=["BTC-USD", "ETH-USD"],
+        interval_seconds=0.3,
+        samples=3,
+        rollup_resolutions=[],
+        retry_backoff_seconds=0.05,
+    )
+    values.update(overrides)
+    return StreamingBPICollector(Config(**values), logger)
+
+
+def test_ticks_within_an_interval_make_one_sample(feed, tmp_path, logger):
+    collector = _collector(feed().url, tmp_path, logger)
+    collector.coalescer = RecordingCoalescer()
+    samples = collector.run_loop()
+
+    assert len(samples) == 3
+    assert collector.ticks_received > len(samples) * 2
+    for sample, expected in zip(samples, collector.coalescer.expected):
+        assert sample["prices"] == expected
+        for pair, price in sample["prices"].items():
+            assert sample["ticks"][pair] > 1
+            assert sample["low"][pair] <= price <= sample["high"][pair]
+
+
+def test_reconnects_after_the_feed_drops(feed, tmp_path, logger):
+    server = feed(disconnect_after=4)
+    collector = _collector(server.url, tmp_path, logger)
+    samples = collector.run_loop()
+
+    assert len(samples) == 3
+    assert collector.reconnects >= 2
+    assert server.connections >= 3
+    # every interval saw fresh ticks, so each drop was followed by a reconnect
+    assert all(sum(s["ticks"].values()) > 0 for s in samples)
+
+
+def test_reconnect_backs_off_while_the_feed_is_down(tmp_path, logger, monkeypatch):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    attempts = []
+
+    def record_backoff(attempt, base, cap):
+        attempts.append((attempt, base, cap))
+        return 0.01
+
+    monkeypatch.setattr(streaming, "backoff_delay", record_backoff)
+    collector = _collector(f"ws://127.0.0.1:{port}", tmp_path, logger, samples=1)
+    collector.run_loop()
+
+    assert len(attempts) >= 3
+    assert [a for a, _, _ in attempts] == list(range(len(attempts)))
+    assert {(base, cap) for _, base, cap in attempts} == {
+        (0.05, collector.config.stream_reconnect_max_seconds)
+    }
+
+
+class FlakyCoalescer(TickCoalescer):
+    # Fails on the third tick, as a malformed message would.
+    def __init__(self):
+        super().__init__()
+        self.adds = 0
+
+    def add(self, pair, price):
+        self.adds += 1
+        if self.adds == 3:
+            raise ValueError("bad tick")
+        super().add(pair, price)
+
+
+def test_bad_message_is_skipped_without_reconnecting(feed, tmp_path, logger):
+    server = feed()
+    collector = _collector(server.url, tmp_path, logger, samples=2)
+    collector.coalescer = FlakyCoalescer()
+    samples = collector.run_loop()
+
+    assert len(samples) == 2
+    assert collector.bad_messages == 1
+    assert collector.reconnects == 0
+    assert server.connections == 1
+
+
+def test_unexpected_error_restarts_the_stream(feed, tmp_path, logger, monkeypatch):
+    server = feed()
+    collector = _collector(server.url, tmp_path, logger, samples=2)
+    subscribe = collector._subscribe_message
+    calls = []
+
+    def failing_once():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("bug")
+        return subscribe()
+
+    monkeypatch.setattr(collector, "_subscribe_message", failing_once)
+    samples = collector.run_loop()
+
+    assert collector.reconnects == 1
+    assert len(samples) == 2
+    assert all(sum(s["ticks"].values()) > 0 for s in samples)
+
+
+def test_parse_ticker_rejects_unusable_prices():
+    assert parse_ticker(
+        '{"type": "ticker", "product_id": "BTC-USD", "price": "1.5"}'
+    ) == (
+        "BTC-USD",
+        1.5,
+    )
+    for price in ('"nan"', '"inf"', "null", '"x"'):
+        message = f'{{"type": "ticker", "product_id": "BTC-USD", "price": {price}}}'
+        assert parse_ticker(message) is None
+    assert parse_ticker('{"type": "ticker", "product_id": 5, "price": "1"}') is None
+    assert parse_ticker("[[[") is None